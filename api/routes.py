@@ -33,7 +33,10 @@ from database.models import (
 )
 from service.getAllResultService import fetch_all_results
 from service.getBacklogsService import fetch_backlogs
-from service.getClassResults import fetch_class_results
+from service.getClassResults import (
+    fetch_class_results,
+    fetch_class_results_progress,
+)
 from service.getCMMService import fetch_cmm
 from service.getRequiredCreditsService import fetch_required_credits
 from service.getResultContrastService import fetch_result_contrast
@@ -350,14 +353,38 @@ def create_routes(app: FastAPI):
             "mark sheet (same shape as getAcademicResult), `allresult` → full attempt "
             "history (same as getAllResult), `backlog` → backlogs-only (same as "
             "getBacklogs). Returns HTTP 423 LOCKED if the scrape queue is over "
-            "capacity. Cached in Redis under `<class>Results+<type>` for 10 minutes."
+            "capacity. Cached in Redis under `<class>Results+<type>` for 10 minutes. "
+            "`format=ndjson` streams the same entries as newline-delimited JSON, one "
+            "student per line, as each chunk of students is read."
         ),
         tags=["Results"],
     )
     async def get_class_result(
-        roll_number: str = Depends(validateRollNo), type="academicresult"
+        roll_number: str = Depends(validateRollNo),
+        type="academicresult",
+        format: str = Query(default="json", pattern="^(json|ndjson)$"),
+    ):
+        return await fetch_class_results(app, roll_number, type, format)
+
+    @router.get(
+        "/api/getClassResultsProgress",
+        operation_id="get_class_results_progress",
+        summary="Report progress of a background class refresh",
+        description=(
+            "Returns the progress of the background scrape that getClassResults "
+            "queues for a class section: `status` (`running`, `completed` or "
+            "`aborted`), `total` roll numbers in the sweep, `processed` roll "
+            "numbers with a final outcome, and `withResults` students found. The "
+            "class is the first 8 characters of the roll number; the paired "
+            "day/evening cohort is checked too. Returns HTTP 404 when no refresh "
+            "has run for the class in the last 24 hours."
+        ),
+        tags=["Results"],
+    )
+    async def get_class_results_progress(
+        roll_number: str = Depends(validateRollNo),
     ):
-        return await fetch_class_results(app, roll_number, type)
+        return await fetch_class_results_progress(roll_number)
 
     @router.get(
         "/api/hardRefresh",
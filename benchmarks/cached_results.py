@@ -0,0 +1,82 @@
+"""Time the CPU one cached `getAcademicResult` request costs, before and after.
+
+Takes a synthetic student's consolidated result (from the class results
+benchmark's cohort) and serves it from a cache hit both ways. Before: the
+entry was `json.dumps`-ed, so a Redis hit ran `json.loads`, the payload was
+copied to add `serverStatus`, and FastAPI ran `jsonable_encoder` and
+`JSONResponse` over the dict. An L1 hit skipped only the `json.loads`. After:
+the entry holds orjson bytes, the payload is cut out of the envelope,
+`serverStatus` is spliced onto the end and the bytes go out in a `Response`.
+Both bodies are checked to decode to the same JSON. Redis and the network
+are left out; only the per-request Python work is timed.
+
+    python -m benchmarks.cached_results --requests 20000
+"""
+
+import argparse
+import json
+import time
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from benchmarks.class_results import synthetic_cohort
+from database.cohortModels import cohortResultViews
+from service.getResultsService import with_server_status
+from utils.caching import (
+    _SWR_HEAD,
+    _SWR_VALUE,
+    _split_swr_envelope,
+    encode,
+    json_response,
+)
+
+
+def sheet():
+    students, rows = synthetic_cohort(1)
+    (view,) = cohortResultViews(students, rows)
+    return {"details": view["details"], "results": view["results"]}
+
+
+def before_redis(envelope: str):
+    cached = json.loads(envelope)["value"]
+    return before_l1(cached)
+
+
+def before_l1(cached: dict):
+    return JSONResponse(content=jsonable_encoder({**cached, "serverStatus": True}))
+
+
+def after(envelope: bytes):
+    body, _ = _split_swr_envelope(envelope)
+    return json_response(with_server_status(body, True))
+
+
+def _time(label, serve, cached, requests):
+    start = time.process_time()
+    for _ in range(requests):
+        response = serve(cached)
+    elapsed = time.process_time() - start
+    print(f"{label:<16} {elapsed / requests * 1e6:9.1f} us CPU/request")
+    return response
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=20000)
+    args = parser.parse_args()
+
+    value = sheet()
+    soft_expires_at = time.time() + 1200
+    old_entry = json.dumps({"value": value, "softExpiresAt": soft_expires_at})
+    new_entry = _SWR_HEAD + encode(soft_expires_at) + _SWR_VALUE + encode(value) + b"}"
+    print(f"payload {len(encode(value))} bytes")
+
+    expected = _time("before (Redis)", before_redis, old_entry, args.requests)
+    _time("before (L1)", before_l1, value, args.requests)
+    actual = _time("after", after, new_entry, args.requests)
+    assert json.loads(actual.body) == json.loads(expected.body)
+
+
+if __name__ == "__main__":
+    main()
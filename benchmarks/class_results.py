@@ -0,0 +1,154 @@
+"""Time the cohort result engine against one `studentResultViews` per student.
+
+Builds a synthetic cohort (eight semesters of eight subjects, with failed
+subjects retaken in a later exam and the odd RCRV), then computes every
+student's result views both ways: per student from mark objects shaped like
+Prisma's, as `get_class_result_views` did, and all at once from flat rows
+with `cohortResultViews`. Each size also checks the two agree. The stand-in
+mark objects are plain namespaces, so the Prisma model hydration the raw
+query also avoids is not part of the per-student time.
+
+    python -m benchmarks.class_results --students 100 1000 10000
+"""
+
+import argparse
+import gc
+import random
+import time
+from collections import defaultdict
+from types import SimpleNamespace
+
+from config.settings import SEMESTERS
+from database.cohortModels import cohortResultViews
+from database.models import studentResultViews
+from utils.helpers import isbpharmacyr22
+
+GRADES = ["O", "A+", "A", "B+", "B", "C", "F", "Ab"]
+GRADE_WEIGHTS = [8, 14, 18, 18, 14, 10, 12, 6]
+
+
+def synthetic_cohort(size: int, seed: int = 0):
+    """Students and their mark rows, in `COHORT_MARK_ROWS_QUERY` order."""
+    rng = random.Random(seed)
+    students, rows = [], []
+    for number in range(size):
+        roll_number = f"20J21A{number:04d}"
+        students.append(
+            SimpleNamespace(
+                id=f"s{number}",
+                name=f"STUDENT {number}",
+                rollNumber=roll_number,
+                collegeCode="J2",
+                fatherName=f"FATHER {number}",
+            )
+        )
+        for semester_index, semester in enumerate(SEMESTERS[:8]):
+            exam_code = str(1500 + 10 * semester_index)
+            for subject in range(8):
+                grade = rng.choices(GRADES, GRADE_WEIGHTS)[0]
+                attempts = [(exam_code, False, grade)]
+                if grade in ("F", "Ab"):
+                    attempts.append(
+                        (str(int(exam_code) + 5), False, rng.choice(GRADES))
+                    )
+                elif rng.random() < 0.02:
+                    attempts.append((exam_code, True, rng.choice(GRADES)))
+                for code, rcrv, attempt_grade in attempts:
+                    rows.append(
+                        {
+                            "rollNumber": roll_number,
+                            "semesterCode": semester,
+                            "examCode": code,
+                            "rcrv": rcrv,
+                            "graceMarks": False,
+                            "subjectCode": f"S{semester_index}{subject}",
+                            "subjectName": f"SUBJECT {semester_index}{subject}",
+                            "internalMarks": str(rng.randint(10, 30)),
+                            "externalMarks": str(rng.randint(0, 70)),
+                            "totalMarks": str(rng.randint(10, 100)),
+                            "grades": attempt_grade,
+                            "credits": 3.0,
+                        }
+                    )
+    rows.sort(
+        key=lambda row: (
+            row["rollNumber"],
+            row["semesterCode"],
+            row["examCode"],
+            row["rcrv"],
+            row["graceMarks"],
+        )
+    )
+    return students, rows
+
+
+def prisma_marks(rows):
+    """The same rows as `mark` objects with their subject, by roll number."""
+    marks = defaultdict(list)
+    for row in rows:
+        marks[row["rollNumber"]].append(
+            SimpleNamespace(
+                subject=SimpleNamespace(
+                    subjectCode=row["subjectCode"], subjectName=row["subjectName"]
+                ),
+                **{
+                    key: value
+                    for key, value in row.items()
+                    if key not in ("rollNumber", "subjectCode", "subjectName")
+                },
+            )
+        )
+    return marks
+
+
+def per_student(students, marks):
+    return [
+        studentResultViews(
+            student,
+            marks.get(student.rollNumber, []),
+            isbpharmacyr22(student.rollNumber),
+        )
+        for student in students
+    ]
+
+
+def _time(label, size, compute, repeat):
+    best = None
+    for _ in range(repeat):
+        views = None
+        # Keep the cohort and earlier results out of the collector's way so
+        # each run only pays for the objects it creates.
+        gc.collect()
+        gc.freeze()
+        start = time.perf_counter()
+        views = compute()
+        elapsed = time.perf_counter() - start
+        gc.unfreeze()
+        best = elapsed if best is None else min(best, elapsed)
+    print(
+        f"{label:<12} {size:>6} students  {best:8.3f}s  "
+        f"{best / size * 1e6:9.1f} us/student"
+    )
+    return views
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--students", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    for size in args.students:
+        students, rows = synthetic_cohort(size)
+        marks = prisma_marks(rows)
+        expected = _time(
+            "per student", size, lambda: per_student(students, marks), args.repeat
+        )
+        actual = _time(
+            "cohort", size, lambda: cohortResultViews(students, rows), args.repeat
+        )
+        assert actual == expected, "cohort views differ from per-student views"
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""Time the lxml result parser against the BeautifulSoup walk it replaced.
+
+Parses every page in `tests/fixtures/results` repeatedly with both
+implementations, then measures how long a burst of concurrent parses blocks
+the event loop when run inline versus through `parse_result_page_async`.
+
+    python -m benchmarks.result_parser --iterations 500
+"""
+
+import argparse
+import asyncio
+import time
+from pathlib import Path
+
+from bs4 import BeautifulSoup
+
+from scrapers.resultParser import parse_result_page, parse_result_page_async
+
+FIXTURES = Path(__file__).resolve().parent.parent / "tests" / "fixtures" / "results"
+
+
+def parse_with_beautifulsoup(page: str):
+    """The pre-lxml parser, kept here as the baseline (find_all per field)."""
+    try:
+        soup = BeautifulSoup(page, "lxml")
+        details_table, results_table = soup.find_all("table")[:2]
+        details = details_table.find_all("tr")
+        details = {
+            "name": details[0].find_all("td")[3].get_text(),
+            "rollNo": details[0].find_all("td")[1].get_text(),
+            "collegeCode": details[1].find_all("td")[3].get_text(),
+            "fatherName": details[1].find_all("td")[1].get_text(),
+        }
+        results = results_table.find_all("tr")
+        if not results:
+            return details, None
+        columns = [content.text for content in results[0].find_all("b")]
+        indexes = {
+            "subjectCode": columns.index("SUBJECT CODE"),
+            "subjectName": columns.index("SUBJECT NAME"),
+            "subjectGrade": columns.index("GRADE"),
+            "subjectCredits": columns.index("CREDITS(C)"),
+        }
+        for key, column in (
+            ("subjectInternal", "INTERNAL"),
+            ("subjectExternal", "EXTERNAL"),
+            ("subjectTotal", "TOTAL"),
+        ):
+            indexes[key] = columns.index(column) if column in columns else -1
+        subjects = [
+            {key: row.find_all("td")[index].get_text() for key, index in indexes.items()}
+            for row in results[1:]
+        ]
+        return details, subjects
+    except Exception:
+        return None
+
+
+def _time_sync(label, parse, pages, iterations):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        for page in pages:
+            parse(page)
+    elapsed = time.perf_counter() - start
+    parsed = iterations * len(pages)
+    print(
+        f"{label:<24} {parsed:>7} pages  {elapsed:8.3f}s  "
+        f"{elapsed / parsed * 1e6:9.1f} us/page"
+    )
+
+
+async def _loop_stall(label, parse_burst, burst):
+    """Time a 1 ms ticker spent waiting beyond its interval during a burst."""
+    stalls = []
+    done = asyncio.Event()
+
+    async def ticker():
+        last = time.perf_counter()
+        while not done.is_set():
+            await asyncio.sleep(0.001)
+            now = time.perf_counter()
+            stalls.append(now - last)
+            last = now
+
+    ticker_task = asyncio.create_task(ticker())
+    await asyncio.sleep(0.01)
+    start = time.perf_counter()
+    await parse_burst(burst)
+    elapsed = time.perf_counter() - start
+    done.set()
+    await ticker_task
+    blocked = sum(max(0.0, stall - 0.001) for stall in stalls)
+    print(
+        f"{label:<24} {len(burst):>7} pages  {elapsed:8.3f}s  "
+        f"loop blocked {blocked * 1000:7.1f} ms  worst {max(stalls) * 1000:6.1f} ms"
+    )
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--burst", type=int, default=120)
+    args = parser.parse_args()
+
+    pages = [page.read_text() for page in sorted(FIXTURES.glob("*.html"))]
+    _time_sync("beautifulsoup", parse_with_beautifulsoup, pages, args.iterations)
+    _time_sync("lxml single pass", parse_result_page, pages, args.iterations)
+
+    burst = [pages[index % len(pages)] for index in range(args.burst)]
+
+    async def inline_burst(batch):
+        for page in batch:
+            parse_with_beautifulsoup(page)
+            await asyncio.sleep(0)
+
+    async def pooled_burst(batch):
+        await asyncio.gather(*(parse_result_page_async(page) for page in batch))
+
+    await _loop_stall("beautifulsoup on loop", inline_burst, burst)
+    await _loop_stall("lxml in parser pool", pooled_burst, burst)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
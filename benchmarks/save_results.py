@@ -0,0 +1,122 @@
+"""Compare the per-subject and bulk result write paths on a local PostgreSQL.
+
+Seeds synthetic full-history scrapes (every student gets the same exam and
+subject layout a real B.Tech record has) and times `save_to_database_per_subject`
+against `save_to_database_bulk` on fresh students, then once more on the same
+students to measure the "nothing new was released" re-scrape. All rows use the
+`99BM` roll prefix and `BENCH` subject codes and are deleted afterwards.
+
+Prerequisites (run from the repo root against a disposable database):
+    prisma generate
+    prisma db push
+    python -m benchmarks.save_results --students 50
+"""
+
+import argparse
+import asyncio
+import time
+
+from config.connection import prismaConnection
+from database.operations import (
+    save_to_database_bulk,
+    save_to_database_per_subject,
+)
+
+ROLL_PREFIX = "99BM"
+SUBJECT_PREFIX = "BENCH"
+SEMESTERS = ["1-1", "1-2", "2-1", "2-2", "3-1", "3-2", "4-1", "4-2"]
+
+
+def _scrape(roll_number: str, exams_per_semester: int, subjects_per_exam: int):
+    results = []
+    for semester_index, semester in enumerate(SEMESTERS):
+        for exam_index in range(exams_per_semester):
+            results.append(
+                {
+                    "examCode": str(1000 + semester_index * 10 + exam_index),
+                    "semesterCode": semester,
+                    "rcrv": False,
+                    "subjects": [
+                        {
+                            "subjectCode": f"{SUBJECT_PREFIX}{semester_index}{subject}",
+                            "subjectName": f"Benchmark subject {semester_index}.{subject}",
+                            "subjectInternal": "25",
+                            "subjectExternal": "50",
+                            "subjectTotal": "75",
+                            "subjectGrade": "A",
+                            "subjectCredits": "3",
+                        }
+                        for subject in range(subjects_per_exam)
+                    ],
+                }
+            )
+    return {
+        "details": {
+            "name": "BENCHMARK STUDENT",
+            "rollNo": roll_number,
+            "collegeCode": "BM",
+            "fatherName": "BENCHMARK",
+        },
+        "results": results,
+    }
+
+
+async def _cleanup():
+    prisma = prismaConnection.prisma
+    students = await prisma.student.find_many(
+        where={"rollNumber": {"startswith": ROLL_PREFIX}}
+    )
+    student_ids = [student.id for student in students]
+    if student_ids:
+        await prisma.mark.delete_many(where={"studentId": {"in": student_ids}})
+        await prisma.student.delete_many(where={"id": {"in": student_ids}})
+    await prisma.subject.delete_many(
+        where={"subjectCode": {"startswith": SUBJECT_PREFIX}}
+    )
+
+
+async def _time_path(label, save, scrapes):
+    start = time.perf_counter()
+    inserted = 0
+    for scrape in scrapes:
+        inserted += await save(scrape)
+    elapsed = time.perf_counter() - start
+    rows = sum(len(result["subjects"]) for s in scrapes for result in s["results"])
+    print(
+        f"{label:<28} {rows:>7} rows  {inserted:>7} inserted  "
+        f"{elapsed:8.2f}s  {rows / elapsed:10.1f} rows/s"
+    )
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--students", type=int, default=50)
+    parser.add_argument("--exams-per-semester", type=int, default=3)
+    parser.add_argument("--subjects-per-exam", type=int, default=9)
+    args = parser.parse_args()
+
+    def scrapes(path_code: str):
+        return [
+            _scrape(
+                f"{ROLL_PREFIX}{path_code}{index:05d}",
+                args.exams_per_semester,
+                args.subjects_per_exam,
+            )
+            for index in range(args.students)
+        ]
+
+    await prismaConnection.connect()
+    try:
+        await _cleanup()
+        legacy, bulk = scrapes("P"), scrapes("B")
+        await _time_path("per-subject (fresh)", save_to_database_per_subject, legacy)
+        await _time_path("per-subject (re-scrape)", save_to_database_per_subject, legacy)
+        await _time_path("bulk (fresh)", save_to_database_bulk, bulk)
+        await _time_path("bulk (re-scrape)", save_to_database_bulk, bulk)
+    finally:
+        await _cleanup()
+        await prismaConnection.disconnect()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
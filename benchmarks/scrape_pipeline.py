@@ -0,0 +1,279 @@
+"""Replay recorded result pages through the scraping pipeline end to end.
+
+Starts a local stand-in for the JNTUH `resultAction` endpoint that serves the
+pages in `tests/fixtures/results` (rewritten per roll number and exam code)
+with configurable latency, dropped connections and timeouts. Then
+`ResultScraper.run` (`--mode scraper`), the worker's `process_message`
+(`--mode pipeline`, which also writes to PostgreSQL and Redis) or its batched
+`process_message_batch` (`--mode batch`, `--batch-size` students per
+transaction) is driven for synthetic students. It reports students/sec,
+p50/p95/p99 scrape latency, upstream requests per student and database write
+time.
+
+The run points the Redis `url` key, the B.Tech exam-code cache and the
+upstream governor limits at the stand-in, and restores them afterwards. Use a
+disposable Redis and database: students use the `99BM` roll prefix and
+`BENCH` subject codes, and are deleted before and after the run.
+
+    prisma generate && prisma db push
+    python -m benchmarks.scrape_pipeline --students 200 --concurrency 4 \\
+        --latency-ms 80 --error-rate 0.02
+    python -m benchmarks.scrape_pipeline --mode batch --batch-size 16 \\
+        --students 200 --concurrency 1
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import time
+from collections import Counter
+from pathlib import Path
+
+from aiohttp import web
+
+import messaging.consumer as consumer
+from benchmarks.save_results import ROLL_PREFIX, SUBJECT_PREFIX, SEMESTERS, _cleanup
+from config.connection import prismaConnection
+from config.httpConnection import httpConnection
+from config.redisConnection import redisConnection
+from config.settings import REDIS_URL_KEY, UPSTREAM_HOSTS_KEY
+from scrapers.resultScraper import ResultScraper
+from scrapers.retryScheduler import upstreamCircuitBreaker
+from scrapers.upstreamGovernor import upstreamGovernor
+
+FIXTURES = Path(__file__).resolve().parent.parent / "tests" / "fixtures" / "results"
+TEMPLATE_ROLL_NUMBER = "20J21A0501"
+TEMPLATE_SUBJECT_CODES = [
+    "MA301BS", "CS302ES", "CS303PC", "CS304PC", "CS305PC",
+    "CS306ES", "CS307PC", "CS308PC", "*MC309",
+]
+NO_RESULT_PAGE = "<html><body><h3>Enter HallTicket Number</h3></body></html>"
+
+
+class StandInServer:
+    """Serves recorded result pages with injected latency and failures."""
+
+    def __init__(self, exam_codes, latency_ms, jitter_ms, error_rate, timeout_rate):
+        self.template = (FIXTURES / "btech_regular.html").read_text()
+        self.semester_of = {
+            code: index
+            for index, semester in enumerate(SEMESTERS)
+            for code in exam_codes[semester]
+        }
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.timeout_rate = timeout_rate
+        self.requests = Counter()
+        self.runner = None
+
+    def _page(self, roll_number, exam_code):
+        page = self.template.replace(TEMPLATE_ROLL_NUMBER, roll_number)
+        semester = self.semester_of[exam_code]
+        for index, code in enumerate(TEMPLATE_SUBJECT_CODES):
+            page = page.replace(
+                f"<td>{code}</td>", f"<td>{SUBJECT_PREFIX}{semester}{index}</td>"
+            )
+        return page
+
+    async def result_action(self, request):
+        roll_number = request.query.get("htno", "")
+        exam_code = request.query.get("examCode", "")
+        self.requests[roll_number] += 1
+
+        delay = self.latency_ms + random.uniform(-self.jitter_ms, self.jitter_ms)
+        await asyncio.sleep(max(0.0, delay) / 1000)
+        roll = random.random()
+        if roll < self.error_rate:
+            request.transport.close()
+            return web.Response(status=500)
+        if roll < self.error_rate + self.timeout_rate:
+            await asyncio.sleep(600)
+
+        if request.query.get("type") != "intgrade" or exam_code not in self.semester_of:
+            return web.Response(text=NO_RESULT_PAGE, content_type="text/html")
+        return web.Response(
+            text=self._page(roll_number, exam_code), content_type="text/html"
+        )
+
+    async def start(self) -> str:
+        app = web.Application()
+        app.router.add_get("/results/resultAction", self.result_action)
+        self.runner = web.AppRunner(app, access_log=None)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, "127.0.0.1", 0)
+        await site.start()
+        port = self.runner.addresses[0][1]
+        return f"http://127.0.0.1:{port}/results/resultAction"
+
+    async def stop(self):
+        if self.runner is not None:
+            await self.runner.cleanup()
+
+
+def _percentile(values, percentile):
+    if len(values) < 2:
+        return values[0] if values else 0.0
+    return statistics.quantiles(values, n=100, method="inclusive")[percentile - 1]
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--mode", choices=("scraper", "pipeline", "batch"), default="pipeline"
+    )
+    parser.add_argument("--students", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=2)
+    parser.add_argument("--batch-size", type=int, default=16)
+    parser.add_argument("--exams-per-semester", type=int, default=4)
+    parser.add_argument("--latency-ms", type=float, default=50)
+    parser.add_argument("--jitter-ms", type=float, default=20)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--timeout-rate", type=float, default=0.0)
+    parser.add_argument("--rate", type=float, default=None, help="governor rate")
+    parser.add_argument("--max-concurrency", type=int, default=None)
+    args = parser.parse_args()
+
+    exam_codes = {
+        semester: [
+            str(9000 + index * 10 + exam) for exam in range(args.exams_per_semester)
+        ]
+        for index, semester in enumerate(SEMESTERS)
+    }
+    server = StandInServer(
+        exam_codes, args.latency_ms, args.jitter_ms, args.error_rate, args.timeout_rate
+    )
+    url = await server.start()
+
+    roll_numbers = [
+        f"{ROLL_PREFIX}1A{index:04d}" for index in range(args.students)
+    ]
+    # load_exam_codes caches the exam-code map per degree and regulation.
+    regulation = ResultScraper(roll_numbers[0], [], [])._determine_regulation()
+    exam_codes_key = f"btech{regulation}keys"
+
+    redisConnection.connect()
+    client = redisConnection.client
+    saved = {
+        key: client.get(key)
+        for key in (REDIS_URL_KEY, UPSTREAM_HOSTS_KEY, exam_codes_key)
+    }
+    saved_limits = client.hgetall(upstreamGovernor.LIMITS_KEY)
+    client.set(REDIS_URL_KEY, url)
+    client.set(
+        UPSTREAM_HOSTS_KEY,
+        json.dumps([{"url": url, "up": True, "latency": 0.01, "successRate": 1.0}]),
+    )
+    client.set(exam_codes_key, json.dumps(exam_codes))
+    client.delete(upstreamCircuitBreaker.OPEN_KEY)
+    await upstreamGovernor.set_limits(rate=args.rate, concurrency=args.max_concurrency)
+
+    scrape_seconds = []
+    write_seconds = []
+    original_run = ResultScraper.run
+    original_save = consumer.save_to_database
+    original_save_many = consumer.save_many_to_database
+
+    async def timed_run(scraper):
+        start = time.perf_counter()
+        try:
+            return await original_run(scraper)
+        finally:
+            scrape_seconds.append(time.perf_counter() - start)
+
+    async def timed_save(results):
+        start = time.perf_counter()
+        try:
+            return await original_save(results)
+        finally:
+            write_seconds.append(time.perf_counter() - start)
+
+    async def timed_save_many(scrapes):
+        start = time.perf_counter()
+        try:
+            return await original_save_many(scrapes)
+        finally:
+            write_seconds.append(time.perf_counter() - start)
+
+    ResultScraper.run = timed_run
+    consumer.save_to_database = timed_save
+    consumer.save_many_to_database = timed_save_many
+
+    queue = asyncio.Queue()
+    for roll_number in roll_numbers:
+        queue.put_nowait(roll_number)
+    succeeded = 0
+
+    async def worker():
+        nonlocal succeeded
+        while not queue.empty():
+            if args.mode == "batch":
+                batch = [
+                    queue.get_nowait()
+                    for _ in range(min(args.batch_size, queue.qsize()))
+                ]
+                outcomes = await consumer.process_message_batch(batch)
+                succeeded += sum(outcomes.values())
+                continue
+            roll_number = queue.get_nowait()
+            if args.mode == "pipeline":
+                ok = await consumer.process_message(roll_number)
+            else:
+                ok = await ResultScraper(roll_number, [], [], url).run() is not None
+            succeeded += bool(ok)
+
+    await httpConnection.connect()
+    if args.mode != "scraper":
+        await prismaConnection.connect()
+        await _cleanup()
+    try:
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+        elapsed = time.perf_counter() - start
+    finally:
+        ResultScraper.run = original_run
+        consumer.save_to_database = original_save
+        consumer.save_many_to_database = original_save_many
+        await httpConnection.disconnect()
+        await server.stop()
+        if args.mode != "scraper":
+            await _cleanup()
+            await prismaConnection.disconnect()
+        for key, value in saved.items():
+            if value is None:
+                client.delete(key)
+            else:
+                client.set(key, value)
+        client.delete(upstreamGovernor.LIMITS_KEY)
+        if saved_limits:
+            client.hset(upstreamGovernor.LIMITS_KEY, mapping=saved_limits)
+        breaker_open = bool(client.exists(upstreamCircuitBreaker.OPEN_KEY))
+        await redisConnection.aclose()
+
+    requests = [server.requests[roll_number] for roll_number in roll_numbers]
+    batching = f", batches of {args.batch_size}" if args.mode == "batch" else ""
+    print(f"mode                 {args.mode} ({args.concurrency} concurrent{batching})")
+    print(f"students             {succeeded}/{args.students} succeeded")
+    print(f"throughput           {args.students / elapsed:.2f} students/s")
+    print(
+        "scrape latency       "
+        f"p50 {_percentile(scrape_seconds, 50):.3f}s  "
+        f"p95 {_percentile(scrape_seconds, 95):.3f}s  "
+        f"p99 {_percentile(scrape_seconds, 99):.3f}s"
+    )
+    print(f"upstream requests    {statistics.mean(requests):.1f} per student")
+    if write_seconds:
+        print(
+            f"db write             {sum(write_seconds):.2f}s total "
+            f"in {len(write_seconds)} transactions  "
+            f"p50 {_percentile(write_seconds, 50) * 1000:.1f} ms  "
+            f"p95 {_percentile(write_seconds, 95) * 1000:.1f} ms"
+        )
+    if breaker_open:
+        print("note                 the upstream circuit breaker opened during the run")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
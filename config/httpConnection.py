@@ -0,0 +1,66 @@
+import aiohttp
+from prometheus_client import Gauge
+
+from config.settings import (
+    HTTP_POOL_DNS_TTL_SECONDS,
+    HTTP_POOL_KEEPALIVE_SECONDS,
+    HTTP_POOL_LIMIT,
+    HTTP_POOL_LIMIT_PER_HOST,
+)
+from utils.logger import scraping_logger
+
+
+class HttpConnection:
+    """Process-wide aiohttp session shared by every result scrape in the worker."""
+
+    def __init__(self):
+        self.session: aiohttp.ClientSession | None = None
+
+    async def connect(self):
+        if self.session is not None and not self.session.closed:
+            return
+        connector = aiohttp.TCPConnector(
+            limit=HTTP_POOL_LIMIT,
+            limit_per_host=HTTP_POOL_LIMIT_PER_HOST,
+            keepalive_timeout=HTTP_POOL_KEEPALIVE_SECONDS,
+            use_dns_cache=HTTP_POOL_DNS_TTL_SECONDS > 0,
+            ttl_dns_cache=HTTP_POOL_DNS_TTL_SECONDS or None,
+        )
+        self.session = aiohttp.ClientSession(connector=connector)
+        scraping_logger.info(
+            f"HTTP pool opened (limit={HTTP_POOL_LIMIT}, "
+            f"per host={HTTP_POOL_LIMIT_PER_HOST})"
+        )
+
+    async def disconnect(self):
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+            scraping_logger.info("HTTP pool closed")
+
+    def stats(self) -> dict[str, int]:
+        """Return open, idle and waiting connection counts for the pool."""
+        connector = self.session.connector if self.session else None
+        if connector is None or connector.closed:
+            return {"open": 0, "idle": 0, "waiting": 0}
+
+        # aiohttp keeps no public counters, so read the connector's bookkeeping:
+        # idle keep-alive sockets per host, sockets handed to requests, and
+        # requests queued behind the total or per-host limit.
+        idle = sum(len(conns) for conns in connector._conns.values())
+        acquired = len(connector._acquired)
+        waiting = sum(len(waiters) for waiters in connector._waiters.values())
+        return {"open": idle + acquired, "idle": idle, "waiting": waiting}
+
+
+httpConnection = HttpConnection()
+
+HTTP_POOL_CONNECTIONS = Gauge(
+    "scraper_http_pool_connections",
+    "Connections in the shared result-scraper HTTP pool, by state.",
+    labelnames=("state",),
+)
+for _state in ("open", "idle", "waiting"):
+    HTTP_POOL_CONNECTIONS.labels(state=_state).set_function(
+        lambda state=_state: httpConnection.stats()[state]
+    )
@@ -1,16 +1,91 @@
 import redis
-from config.settings import REDIS_URL
+import redis.asyncio as aioredis
+from config.settings import (
+    REDIS_MAX_CONNECTIONS,
+    REDIS_POOL_TIMEOUT_SECONDS,
+    REDIS_URL,
+)
 from utils.logger import redis_logger
 
 
+class AsyncRedisPipeline:
+    """Buffer commands and send them to Redis in one round trip on `execute()`."""
+
+    def __init__(self, connection: "RedisConnection"):
+        self._connection = connection
+        self._commands = []
+
+    def __getattr__(self, name):
+        def queue_command(*args, **kwargs):
+            self._commands.append((name, args, kwargs))
+            return self
+
+        return queue_command
+
+    async def execute(self) -> list:
+        commands, self._commands = self._commands, []
+        async_client = self._connection.async_client
+        if async_client is not None:
+            async with async_client.pipeline(transaction=False) as pipeline:
+                for name, args, kwargs in commands:
+                    getattr(pipeline, name)(*args, **kwargs)
+                return await pipeline.execute()
+        return [
+            getattr(self._connection.client, name)(*args, **kwargs)
+            for name, args, kwargs in commands
+        ]
+
+
+class AsyncRedis:
+    """Awaitable Redis commands for code moving off the blocking client.
+
+    Commands go to the `redis.asyncio` pool once `connect()` has created it,
+    and fall back to the synchronous `client` otherwise, so a service can
+    switch to `await redisConnection.aio.get(...)` on its own schedule.
+    """
+
+    def __init__(self, connection: "RedisConnection"):
+        self._connection = connection
+
+    def __bool__(self) -> bool:
+        return bool(self._connection.async_client or self._connection.client)
+
+    def __getattr__(self, name):
+        async_client = self._connection.async_client
+        if async_client is not None:
+            return getattr(async_client, name)
+
+        command = getattr(self._connection.client, name)
+
+        async def call(*args, **kwargs):
+            return command(*args, **kwargs)
+
+        return call
+
+    def pipeline(self) -> AsyncRedisPipeline:
+        return AsyncRedisPipeline(self._connection)
+
+
 class RedisConnection:
     def __init__(self):
         self.redis_url = REDIS_URL
         self.client = None
+        self.async_client = None
+        self.aio = AsyncRedis(self)
 
     def connect(self):
         if self.redis_url:
             self.client = redis.Redis.from_url(self.redis_url)
+            # Connections are opened lazily, on the event loop that first uses them.
+            # A full pool makes commands wait for a connection instead of
+            # failing with "Too many connections".
+            self.async_client = aioredis.Redis.from_pool(
+                aioredis.BlockingConnectionPool.from_url(
+                    self.redis_url,
+                    max_connections=REDIS_MAX_CONNECTIONS,
+                    timeout=REDIS_POOL_TIMEOUT_SECONDS,
+                )
+            )
             try:
                 self.client.ping()
                 redis_logger.info("Redis Connected!!")
@@ -22,6 +97,13 @@ class RedisConnection:
             self.client.close()
             redis_logger.info("Redis Disconnected!!")
 
+    async def aclose(self):
+        """Close the asyncio pool and then the blocking client."""
+        if self.async_client:
+            await self.async_client.aclose()
+            self.async_client = None
+        self.disconnect()
+
 
 redisConnection = RedisConnection()
 
@@ -33,3 +115,12 @@ def getRedisKeyValue(key):
             redis_logger.info(f"Cache hit for {key}")
             return cached_data  # pyright: ignore
     return None
+
+
+async def agetRedisKeyValue(key):
+    if redisConnection.aio:
+        cached_data = await redisConnection.aio.get(key)
+        if cached_data:
+            redis_logger.info(f"Cache hit for {key}")
+            return cached_data
+    return None
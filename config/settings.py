@@ -84,6 +84,17 @@ APNS_PRIVATE_KEY = os.getenv("APNS_PRIVATE_KEY") or None
 APNS_PRIVATE_KEY_PATH = os.getenv("APNS_PRIVATE_KEY_PATH") or None
 CLASS_RESULTS_QUEUE_NAME = os.getenv("CLASS_RESULTS_QUEUE_NAME", "classresults")
 CLASS_RESULTS_QUEUE_MAX_MESSAGES = 3
+# Hard refreshes and freshness scrapes, consumed ahead of class sweeps but
+# behind students waiting on a scrape.
+REFRESH_RESULTS_QUEUE_NAME = os.getenv(
+    "REFRESH_RESULTS_QUEUE_NAME", "refreshresults"
+)
+# Newly released exam codes are scraped per cohort from their own queue.
+INCREMENTAL_RESULTS_QUEUE_NAME = os.getenv(
+    "INCREMENTAL_RESULTS_QUEUE_NAME", "incrementalresults"
+)
+INCREMENTAL_PREFIXES_PER_MESSAGE = 20
+WARMUP_ROLL_NUMBERS_PER_MESSAGE = 100
 
 
 def _bounded_int_env(name: str, default: int, minimum: int, maximum: int) -> int:
@@ -115,6 +126,157 @@ CHATBOT_MAX_TOOL_CALLS = _bounded_int_env("CHATBOT_MAX_TOOL_CALLS", 6, 1, 10)
 CHATBOT_MAX_OUTPUT_TOKENS = _bounded_int_env(
     "CHATBOT_MAX_OUTPUT_TOKENS", 800, 100, 2000
 )
+# Shared aiohttp pool for the result worker. Every student and class scrape
+# reuses its keep-alive sockets; the per-host limit caps how many requests one
+# worker process can have open against a single JNTUH host.
+HTTP_POOL_LIMIT = _bounded_int_env("HTTP_POOL_LIMIT", 100, 1, 1000)
+HTTP_POOL_LIMIT_PER_HOST = _bounded_int_env("HTTP_POOL_LIMIT_PER_HOST", 30, 1, 500)
+HTTP_POOL_KEEPALIVE_SECONDS = _bounded_float_env(
+    "HTTP_POOL_KEEPALIVE_SECONDS", 30.0, 1.0, 300.0
+)
+HTTP_POOL_DNS_TTL_SECONDS = _bounded_int_env("HTTP_POOL_DNS_TTL_SECONDS", 300, 0, 3600)
+WORKER_METRICS_PORT = _bounded_int_env("WORKER_METRICS_PORT", 9101, 0, 65535)
+# Failed exam codes are retried with exponential backoff and full jitter. The
+# budget caps the retried requests spent on one student across all codes.
+SCRAPE_REQUEST_TIMEOUT_SECONDS = _bounded_float_env(
+    "SCRAPE_REQUEST_TIMEOUT_SECONDS", 5.0, 1.0, 60.0
+)
+SCRAPE_RETRY_BUDGET = _bounded_int_env("SCRAPE_RETRY_BUDGET", 40, 0, 500)
+SCRAPE_RETRY_MAX_ATTEMPTS = _bounded_int_env("SCRAPE_RETRY_MAX_ATTEMPTS", 6, 1, 20)
+SCRAPE_RETRY_BASE_SECONDS = _bounded_float_env(
+    "SCRAPE_RETRY_BASE_SECONDS", 0.5, 0.05, 30.0
+)
+SCRAPE_RETRY_MAX_SECONDS = _bounded_float_env(
+    "SCRAPE_RETRY_MAX_SECONDS", 30.0, 0.1, 300.0
+)
+# Shared upstream circuit breaker. Once at least MIN_REQUESTS were made in the
+# current window and the error rate crosses the threshold, every worker stops
+# scraping for the cooldown.
+UPSTREAM_BREAKER_ERROR_RATE = _bounded_float_env(
+    "UPSTREAM_BREAKER_ERROR_RATE", 0.5, 0.05, 1.0
+)
+UPSTREAM_BREAKER_MIN_REQUESTS = _bounded_int_env(
+    "UPSTREAM_BREAKER_MIN_REQUESTS", 40, 1, 100000
+)
+UPSTREAM_BREAKER_WINDOW_SECONDS = _bounded_int_env(
+    "UPSTREAM_BREAKER_WINDOW_SECONDS", 30, 5, 3600
+)
+UPSTREAM_BREAKER_COOLDOWN_SECONDS = _bounded_int_env(
+    "UPSTREAM_BREAKER_COOLDOWN_SECONDS", 60, 5, 3600
+)
+# Fleet-wide limits on requests to each JNTUH host, shared by every worker
+# through Redis. Override at runtime with HSET upstream_governor:limits
+# rate|burst|concurrency. Leases of crashed workers expire after LEASE_SECONDS.
+UPSTREAM_RATE_PER_SECOND = _bounded_float_env(
+    "UPSTREAM_RATE_PER_SECOND", 40.0, 0.1, 10000.0
+)
+UPSTREAM_BURST = _bounded_int_env("UPSTREAM_BURST", 40, 1, 10000)
+UPSTREAM_MAX_CONCURRENCY = _bounded_int_env("UPSTREAM_MAX_CONCURRENCY", 60, 1, 10000)
+UPSTREAM_LEASE_SECONDS = _bounded_int_env("UPSTREAM_LEASE_SECONDS", 30, 1, 600)
+# Share of those limits refresh-lane and background-lane scrapes leave free for
+# higher lanes (interactive first, then refresh).
+UPSTREAM_REFRESH_HEADROOM = _bounded_float_env(
+    "UPSTREAM_REFRESH_HEADROOM", 0.1, 0.0, 0.9
+)
+UPSTREAM_BACKGROUND_HEADROOM = _bounded_float_env(
+    "UPSTREAM_BACKGROUND_HEADROOM", 0.3, 0.0, 0.9
+)
+# Connections each process's asyncio Redis pool may open, and how long a
+# command waits for a free connection once they are all in use.
+REDIS_MAX_CONNECTIONS = _bounded_int_env("REDIS_MAX_CONNECTIONS", 50, 1, 10000)
+REDIS_POOL_TIMEOUT_SECONDS = _bounded_float_env(
+    "REDIS_POOL_TIMEOUT_SECONDS", 5.0, 0.1, 60.0
+)
+# In-process (L1) cache in front of Redis for result views, exam-code maps,
+# notifications and content trees.
+L1_CACHE_MAX_ENTRIES = _bounded_int_env("L1_CACHE_MAX_ENTRIES", 2048, 0, 1000000)
+L1_CACHE_TTL_SECONDS = _bounded_float_env("L1_CACHE_TTL_SECONDS", 30.0, 0.1, 3600.0)
+# How long a request waits for another process to rebuild the same cache key
+# before rebuilding it itself.
+SINGLE_FLIGHT_WAIT_SECONDS = _bounded_float_env(
+    "SINGLE_FLIGHT_WAIT_SECONDS", 3.0, 0.1, 30.0
+)
+# Stale-while-revalidate for `<rollNo>Results`: the entry is served fresh for
+# the soft TTL, served stale with one background refresh per window until the
+# hard TTL, and rebuilt synchronously after that.
+RESULTS_SOFT_TTL_SECONDS = _bounded_int_env("RESULTS_SOFT_TTL_SECONDS", 1200, 1, 86400)
+RESULTS_HARD_TTL_SECONDS = _bounded_int_env(
+    "RESULTS_HARD_TTL_SECONDS", 21600, 1, 604800
+)
+RESULTS_REFRESH_WINDOW_SECONDS = _bounded_int_env(
+    "RESULTS_REFRESH_WINDOW_SECONDS", 60, 1, 86400
+)
+# A roll number scraped successfully is not rescraped on publish for this long
+# unless a new result release is detected (or the client forces a refresh).
+RECENT_SCRAPE_WINDOW_SECONDS = _bounded_int_env(
+    "RECENT_SCRAPE_WINDOW_SECONDS", 900, 0, 86400
+)
+# Long-lived publishing channels the API keeps open, and how often it re-reads
+# queue depths for backpressure checks.
+RABBITMQ_PUBLISHER_CHANNELS = _bounded_int_env("RABBITMQ_PUBLISHER_CHANNELS", 4, 1, 64)
+QUEUE_DEPTH_REFRESH_SECONDS = _bounded_float_env(
+    "QUEUE_DEPTH_REFRESH_SECONDS", 1.0, 0.1, 60.0
+)
+# Worker consumption per queue. A batch size above 1 makes the worker take up to
+# that many roll numbers at once, scrape them concurrently, save them in one
+# transaction and ack them afterwards; a partial batch is flushed after
+# CONSUMER_BATCH_WAIT_SECONDS. Prefetch is raised to the batch size if lower.
+RESULTS_QUEUE_PREFETCH = _bounded_int_env("RESULTS_QUEUE_PREFETCH", 2, 1, 1000)
+RESULTS_QUEUE_BATCH_SIZE = _bounded_int_env("RESULTS_QUEUE_BATCH_SIZE", 1, 1, 500)
+REFRESH_QUEUE_PREFETCH = _bounded_int_env("REFRESH_QUEUE_PREFETCH", 2, 1, 1000)
+REFRESH_QUEUE_BATCH_SIZE = _bounded_int_env("REFRESH_QUEUE_BATCH_SIZE", 1, 1, 500)
+CLASS_RESULTS_QUEUE_PREFETCH = _bounded_int_env("CLASS_RESULTS_QUEUE_PREFETCH", 1, 1, 16)
+INCREMENTAL_RESULTS_QUEUE_PREFETCH = _bounded_int_env(
+    "INCREMENTAL_RESULTS_QUEUE_PREFETCH", 1, 1, 16
+)
+CONSUMER_BATCH_WAIT_SECONDS = _bounded_float_env(
+    "CONSUMER_BATCH_WAIT_SECONDS", 0.05, 0.0, 5.0
+)
+# Worker processes main2.py runs. With a maximum above 1, a supervisor keeps
+# between the minimum and maximum consumer processes running and re-sizes them
+# every WORKER_SCALE_INTERVAL_SECONDS: one process per WORKER_BACKLOG_PER_PROCESS
+# waiting roll numbers plus one per waiting background message, and the minimum
+# while the upstream is down.
+WORKER_MIN_PROCESSES = _bounded_int_env("WORKER_MIN_PROCESSES", 1, 1, 64)
+WORKER_MAX_PROCESSES = _bounded_int_env("WORKER_MAX_PROCESSES", 1, 1, 64)
+WORKER_BACKLOG_PER_PROCESS = _bounded_int_env(
+    "WORKER_BACKLOG_PER_PROCESS", 200, 1, 100000
+)
+WORKER_SCALE_INTERVAL_SECONDS = _bounded_float_env(
+    "WORKER_SCALE_INTERVAL_SECONDS", 15.0, 1.0, 600.0
+)
+# How often a worker probes each JNTUH result host, and how long a probe may
+# take before the host counts as down for that round.
+UPSTREAM_PROBE_INTERVAL_SECONDS = _bounded_float_env(
+    "UPSTREAM_PROBE_INTERVAL_SECONDS", 30.0, 5.0, 600.0
+)
+UPSTREAM_PROBE_TIMEOUT_SECONDS = _bounded_float_env(
+    "UPSTREAM_PROBE_TIMEOUT_SECONDS", 5.0, 0.5, 30.0
+)
+# Students per database round trip when class results are streamed as NDJSON.
+CLASS_RESULTS_STREAM_CHUNK_SIZE = _bounded_int_env(
+    "CLASS_RESULTS_STREAM_CHUNK_SIZE", 50, 1, 1000
+)
+# Cached responses of at least this many bytes are stored gzip-compressed
+# and sent as stored to clients that accept gzip.
+CACHE_COMPRESSION_MIN_BYTES = _bounded_int_env(
+    "CACHE_COMPRESSION_MIN_BYTES", 4096, 256, 10485760
+)
+CACHE_COMPRESSION_LEVEL = _bounded_int_env("CACHE_COMPRESSION_LEVEL", 6, 1, 9)
+# Roll numbers a class sweep scrapes concurrently.
+CLASS_RESULTS_WINDOW_SIZE = _bounded_int_env("CLASS_RESULTS_WINDOW_SIZE", 8, 1, 64)
+# Students an incremental exam-code work item scrapes concurrently.
+INCREMENTAL_RESULTS_CONCURRENCY = _bounded_int_env(
+    "INCREMENTAL_RESULTS_CONCURRENCY", 16, 1, 256
+)
+# Release-day warm-up: how many subscribed students a release pre-scrapes, and
+# how many of those scrapes a worker starts per second.
+WARMUP_MAX_STUDENTS = _bounded_int_env("WARMUP_MAX_STUDENTS", 20000, 0, 1000000)
+WARMUP_RATE_PER_SECOND = _bounded_float_env(
+    "WARMUP_RATE_PER_SECOND", 10.0, 0.1, 1000.0
+)
+# Threads that parse result pages off the worker's event loop.
+RESULT_PARSER_WORKERS = _bounded_int_env("RESULT_PARSER_WORKERS", 4, 1, 32)
 # Set ENVIRONMENT=production to disable the interactive docs (/docs, /redoc,
 # /openapi.json). Anything else (or unset) keeps them enabled.
 IS_PRODUCTION = os.getenv("ENVIRONMENT", "development").lower() == "production"
@@ -126,22 +288,42 @@ GRACE_MARKS_PROOF_ALLOWED_TYPES = {
     "image/jpg",
 }
 
+# Scraped results are written with set-based statements in one transaction
+# per student. BULK_RESULT_WRITES=false restores the per-subject upserts.
+BULK_RESULT_WRITES = os.getenv("BULK_RESULT_WRITES", "true").lower() != "false"
+
 NOTIFICATIONS_EXPIRY_TIME = 1800
 EXPIRY_TIME = 1200
 FIVE_MINUTE_EXPIRY = 300
 CLASS_RESULTS_PROCESSED_EXPIRY_TIME = 86400
+# Roll numbers a class sweep probed and found missing are skipped for 30 days.
+CLASS_RESULTS_GAP_EXPIRY_TIME = 2592000
 # Calendars / syllabus change rarely — cache the built trees for a day.
 CONTENT_EXPIRY_TIME = 86400
+CACHE_INVALIDATION_CHANNEL = "cache_invalidation"
+SINGLE_FLIGHT_LOCK_SECONDS = 10
+SINGLE_FLIGHT_RESULT_SECONDS = 5
+SINGLE_FLIGHT_POLL_SECONDS = 0.05
 NOTIFICATIONS_REDIS_KEY = "notificationsi"
 LATEST_NOTIFICATIONS_REDIS_KEY = "latest_notifications"
 CALENDARS_REDIS_KEY = "academic_calendars_tree"
 SYLLABUS_REDIS_KEY = "syllabus_tree"
 REDIS_URL_KEY = "url"
+# JSON ranking of the JNTUH result hosts written by the background prober.
+UPSTREAM_HOSTS_KEY = "upstream_hosts"
 SEMESTERS = ["1-1", "1-2", "2-1", "2-2", "3-1", "3-2", "4-1", "4-2"]
 RABBITMQ_MAX_MESSAGES = 4000
+RABBITMQ_REFRESH_MAX_MESSAGES = 1000
 RABBITMQ_CLASS_MAX_MESSAGES = 500
 RABBITMQ_CLASS_PUBLISH_MAX_MESSAGES = 50
+# Sorted set of roll numbers queued or being scraped, scored by enqueue time.
+# Entries older than SCRAPE_IN_FLIGHT_SECONDS belong to lost messages.
 RABBITMQ_ROLL_NUMBERS = "rabbitmq_roll_numbers"
+SCRAPE_IN_FLIGHT_SECONDS = 1800
+# Bumped whenever new results are released; recent-scrape markers hold the
+# generation they were written in.
+RESULTS_RELEASE_GENERATION_KEY = "results_release_generation"
+SCRAPES_COMPLETED_EXPIRY_TIME = 180
 RESULTS = "results"
 ALL = "all"
 EXAMS = "exams"
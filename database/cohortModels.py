@@ -0,0 +1,159 @@
+"""Result views for a whole cohort at once, from flat mark rows.
+
+`studentResultViews` walks one student's Prisma `mark` objects, building a
+subject dict for each mark twice (once for the consolidated sheet, once for
+the attempt history) through per-field helper calls. `cohortResultViews`
+takes the cohort's marks as plain rows from one raw query
+(`COHORT_MARK_ROWS_QUERY`, so no Prisma models are hydrated) and computes
+every student's best attempts, SGPA, CGPA, credits, backlogs and history in
+a single pass over those rows, grouping by (student, semester, subject) in
+dicts. The output matches `studentResultViews` field for field, float for
+float.
+
+    python -m benchmarks.class_results
+"""
+
+from config.settings import SEMESTERS
+from database.models import (
+    RESULT_VIEW_VERSION,
+    backlogsFromResults,
+    calculateGPA,
+    studentDetailsModel,
+)
+from utils.helpers import gradestogpa, gradestogpabppharamcyr22, isbpharmacyr22
+
+# The order `get_details` uses, per student.
+COHORT_MARK_ROWS_QUERY = """
+SELECT
+    s."rollNumber", m."semesterCode", m."examCode", m."rcrv", m."graceMarks",
+    sub."subjectCode", sub."subjectName", m."internalMarks", m."externalMarks",
+    m."totalMarks", m."grades", m."credits"
+FROM "mark" m
+JOIN "student" s ON s."id" = m."studentId"
+JOIN "subject" sub ON sub."id" = m."subjectId"
+WHERE m."studentId" IN (SELECT jsonb_array_elements_text($1::jsonb))
+ORDER BY
+    s."rollNumber", m."semesterCode", m."examCode", m."rcrv", m."graceMarks"
+"""
+
+
+class _WholeMarks(dict):
+    """Marks as `studentResultModel` reads them, each distinct string once."""
+
+    def __missing__(self, value):
+        marks = self[value] = int(value) if str(value).isdigit() else 0
+        return marks
+
+
+def _sheet(semesters: dict[str, dict[str, dict]], scale: dict[str, int]):
+    """`processResults` from a student's best attempt per semester and subject."""
+    final_result = {}
+    total_grades, total_credits, total_backlogs = 0.0, 0.0, 0
+    for semester, subjects in semesters.items():
+        semester_credits = semester_grades = backlogs = 0.0
+        subject_list = list(subjects.values())
+        for subject in subject_list:
+            grade_value = scale.get(subject["grades"], 0)
+            semester_grades += grade_value * subject["credits"]
+            semester_credits += subject["credits"]
+            backlogs += grade_value == 0
+        final_result[semester] = {
+            "semester": semester,
+            "subjects": subject_list,
+            "semesterSGPA": calculateGPA(semester_grades, semester_credits),
+            "semesterCredits": semester_credits,
+            "semesterGrades": semester_grades,
+            "backlogs": backlogs,
+            "failed": backlogs > 0,
+        }
+        total_grades += semester_grades
+        total_credits += semester_credits
+        total_backlogs += backlogs
+
+    return {
+        "semesters": [
+            final_result[semester] for semester in SEMESTERS if semester in final_result
+        ],
+        "CGPA": calculateGPA(total_grades, total_credits)
+        if total_backlogs == 0
+        else 0.0,
+        "backlogs": total_backlogs,
+        "credits": total_credits,
+        "grades": total_grades,
+    }
+
+
+def cohortResultViews(students, rows: list[dict]) -> list[dict]:
+    """`studentResultViews` for every student in `students`, from their mark rows.
+
+    `rows` are the `COHORT_MARK_ROWS_QUERY` rows of those students. Each row
+    becomes one subject dict, shared by the consolidated sheet and the
+    history. Views come back in the order of `students`.
+    """
+    marks = _WholeMarks()
+    best_attempts, histories, mark_counts = {}, {}, {}
+    for row in rows:
+        roll_number = row["rollNumber"]
+        semester = row["semesterCode"]
+        grade = row["grades"] or ""
+        subject = {
+            "subjectCode": row["subjectCode"] or "",
+            "subjectName": row["subjectName"] or "",
+            "internalMarks": marks[row["internalMarks"]],
+            "externalMarks": marks[row["externalMarks"]],
+            "totalMarks": marks[row["totalMarks"]],
+            "grades": grade,
+            "credits": float(row["credits"] or 0),
+        }
+        mark_counts[roll_number] = mark_counts.get(roll_number, 0) + 1
+
+        # A later attempt replaces an earlier one with an equal or better
+        # grade, as `isGreat` decides in `processResults`.
+        semesters = best_attempts.setdefault(roll_number, {})
+        subjects = semesters.setdefault(semester, {})
+        kept = subjects.get(row["subjectCode"])
+        if kept is None or gradestogpa.get(kept["grades"], 0) <= gradestogpa.get(
+            grade, 0
+        ):
+            subjects[row["subjectCode"]] = subject
+
+        exam_code = row["examCode"]
+        if row["rcrv"]:
+            exam_code = f"{exam_code}[RCRV]"
+        elif row["graceMarks"]:
+            exam_code = f"{exam_code}[Grace]"
+        exams = histories.setdefault(roll_number, {}).setdefault(semester, {})
+        exam = exams.get(exam_code)
+        if exam is None:
+            exam = exams[exam_code] = {
+                "examCode": exam_code,
+                "rcrv": row["rcrv"],
+                "graceMarks": row["graceMarks"],
+                "subjects": [],
+            }
+        exam["subjects"].append(subject)
+
+    views = []
+    for student in students:
+        roll_number = student.rollNumber
+        bpharmacyR22 = isbpharmacyr22(roll_number)
+        results = _sheet(
+            best_attempts.get(roll_number, {}),
+            gradestogpabppharamcyr22 if bpharmacyR22 else gradestogpa,
+        )
+        views.append(
+            {
+                "rollNumber": roll_number,
+                "version": RESULT_VIEW_VERSION,
+                "marksVersion": student.marksVersion,
+                "markCount": mark_counts.get(roll_number, 0),
+                "details": studentDetailsModel(student),
+                "results": results,
+                "allResults": [
+                    {"semester": semester, "exams": list(exams.values())}
+                    for semester, exams in histories.get(roll_number, {}).items()
+                ],
+                "backlogs": backlogsFromResults(results, bpharmacyR22),
+            }
+        )
+    return views
@@ -229,7 +229,10 @@ def studentResultsModel(results: List[mark], bpharmacyR22=False):
 
 
 def studentCredits(results: List[mark], credits, bpharmacyR22):
-    processed_results = processResults(results, bpharmacyR22)
+    return creditsFromResults(processResults(results, bpharmacyR22), credits)
+
+
+def creditsFromResults(processed_results, credits):
     semester_results = processed_results["semesters"]
 
     # Extract semester-wise obtained credits
@@ -276,17 +279,20 @@ def studentCredits(results: List[mark], credits, bpharmacyR22):
 
 
 def studentBacklogs(results: List[mark], bpharmacyR22):
-    processed_results = processResults(results, bpharmacyR22)["semesters"]
+    return backlogsFromResults(processResults(results, bpharmacyR22), bpharmacyR22)
+
+
+def backlogsFromResults(processed_results, bpharmacyR22):
     backlogs_data = []
-    for sem in processed_results:
+    for sem in processed_results["semesters"]:
         if sem["backlogs"] >= 1.0:
             backlogSubjects = []
             for subject in sem["subjects"]:
                 grade_value = getGradeValue(subject["grades"], bpharmacyR22)
                 if grade_value == 0:
                     backlogSubjects.append(subject)
-            sem["subjects"] = backlogSubjects
-            backlogs_data.append(sem)
+            # The consolidated view keeps its full subject list.
+            backlogs_data.append({**sem, "subjects": backlogSubjects})
 
     total_backlogs = sum(sem["backlogs"] for sem in backlogs_data)
 
@@ -296,6 +302,31 @@ def studentBacklogs(results: List[mark], bpharmacyR22):
     }
 
 
+# Bump whenever a stored view's shape or calculation changes; stored views of
+# another version are recomputed the next time they are read.
+RESULT_VIEW_VERSION = 2
+
+
+def studentResultViews(details: student, results: List[mark], bpharmacyR22=False):
+    """Every per-student view the read endpoints serve, from one pass over the marks.
+
+    Stored in the `resultview` table when marks are written: `results` is the
+    consolidated sheet, `allResults` the attempt history and `backlogs` the
+    backlog summary. The credits checker is derived from `results`.
+    """
+    processed_results = processResults(results, bpharmacyR22)
+    return {
+        "rollNumber": details.rollNumber,
+        "version": RESULT_VIEW_VERSION,
+        "marksVersion": details.marksVersion,
+        "markCount": len(results),
+        "details": studentDetailsModel(details),
+        "results": processed_results,
+        "allResults": studentAllResultsModel(results),
+        "backlogs": backlogsFromResults(processed_results, bpharmacyR22),
+    }
+
+
 def studentResultContrast(result1, result2):
     # Extract basic details for both students
     student1_profile = {
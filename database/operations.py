@@ -7,13 +7,20 @@ from collections import defaultdict
 from prisma.types import GraceMarksProofWhereInput, examcodesWhereInput
 from prisma.errors import UniqueViolationError
 from config.connection import prismaConnection
-from config.settings import RESULTS
+from config.settings import (
+    BULK_RESULT_WRITES,
+    CLASS_RESULTS_STREAM_CHUNK_SIZE,
+    RESULTS,
+)
+from database.cohortModels import COHORT_MARK_ROWS_QUERY, cohortResultViews
 from database.models import (
+    RESULT_VIEW_VERSION,
     APNSDeviceRegistrationPayload,
     PushSub,
     ResultDeviceSubscriptionPayload,
+    studentResultViews,
 )
-from utils.helpers import format_date
+from utils.helpers import format_date, isbpharmacyr22
 from utils.logger import database_logger
 
 
@@ -177,6 +184,12 @@ async def get_exam_codes_from_database(roll_number, rcrv=False):
 
 
 async def save_to_database(results):
+    if BULK_RESULT_WRITES:
+        return await save_to_database_bulk(results)
+    return await save_to_database_per_subject(results)
+
+
+async def save_to_database_per_subject(results):
     details = results["details"]
     rollNo = details["rollNo"]
     results = results["results"]
@@ -184,10 +197,295 @@ async def save_to_database(results):
     inserted_count = 0
     for result in results:
         inserted_count += await save_subject_and_marks(rollNo, result)
+    if inserted_count:
+        await outdate_result_views([rollNo])
     database_logger.info(f"Exam data and marks saved for student {rollNo}")
     return inserted_count
 
 
+# Subjects are inserted when unknown and only ever have an empty name filled
+# in, mirroring the upsert + update_many pair of the per-subject path. The
+# final SELECT cannot see rows inserted by the `inserted` CTE (same snapshot),
+# so both halves are unioned to return an id for every requested code.
+BULK_UPSERT_SUBJECTS_QUERY = """
+WITH input AS (
+    SELECT s."subjectCode", s."subjectName"
+    FROM jsonb_to_recordset($1::jsonb) AS s("subjectCode" text, "subjectName" text)
+),
+inserted AS (
+    INSERT INTO "subject" ("id", "subjectCode", "subjectName")
+    SELECT gen_random_uuid()::text, input."subjectCode", input."subjectName"
+    FROM input
+    ON CONFLICT ("subjectCode") DO NOTHING
+    RETURNING "id", "subjectCode"
+),
+named AS (
+    UPDATE "subject"
+    SET "subjectName" = input."subjectName"
+    FROM input
+    WHERE "subject"."subjectCode" = input."subjectCode"
+      AND "subject"."subjectName" = ''
+      AND input."subjectName" <> ''
+)
+SELECT "subject"."id", "subject"."subjectCode"
+FROM "subject"
+JOIN input ON input."subjectCode" = "subject"."subjectCode"
+UNION ALL
+SELECT "id", "subjectCode" FROM inserted
+"""
+
+SELECT_SUBJECT_IDS_QUERY = """
+SELECT "id", "subjectCode"
+FROM "subject"
+WHERE "subjectCode" IN (SELECT jsonb_array_elements_text($1::jsonb))
+"""
+
+# Attempts are immutable, so existing rows are left untouched and RETURNING
+# only yields the rows this statement actually inserted.
+BULK_INSERT_MARKS_QUERY = """
+INSERT INTO "mark" (
+    "id", "studentId", "subjectId", "semesterCode", "examCode",
+    "internalMarks", "externalMarks", "totalMarks", "grades", "credits",
+    "rcrv", "graceMarks"
+)
+SELECT
+    gen_random_uuid()::text, $2, m."subjectId", m."semesterCode", m."examCode",
+    m."internalMarks", m."externalMarks", m."totalMarks", m."grades", m."credits",
+    m."rcrv", false
+FROM jsonb_to_recordset($1::jsonb) AS m(
+    "subjectId" text, "semesterCode" text, "examCode" text,
+    "internalMarks" text, "externalMarks" text, "totalMarks" text,
+    "grades" text, "credits" double precision, "rcrv" boolean
+)
+ON CONFLICT ("studentId", "semesterCode", "examCode", "subjectId", "rcrv", "graceMarks")
+DO NOTHING
+RETURNING "id"
+"""
+
+
+async def _bulk_upsert_subjects(transaction, results) -> dict[str, str]:
+    subject_names = {}
+    for result in results:
+        for subject in result["subjects"]:
+            code = subject["subjectCode"]
+            if not subject_names.get(code):
+                subject_names[code] = subject["subjectName"]
+
+    if not subject_names:
+        return {}
+
+    rows = await transaction.query_raw(
+        BULK_UPSERT_SUBJECTS_QUERY,
+        json.dumps(
+            [
+                {"subjectCode": code, "subjectName": name}
+                for code, name in subject_names.items()
+            ]
+        ),
+    )
+    subject_ids = {row["subjectCode"]: row["id"] for row in rows}
+
+    # A concurrent worker may have inserted a code after this statement's
+    # snapshot was taken; a fresh statement sees its committed row.
+    missing_codes = [code for code in subject_names if code not in subject_ids]
+    if missing_codes:
+        rows = await transaction.query_raw(
+            SELECT_SUBJECT_IDS_QUERY, json.dumps(missing_codes)
+        )
+        subject_ids.update({row["subjectCode"]: row["id"] for row in rows})
+
+    return subject_ids
+
+
+# One upsert for every student of a batch. `lastUpdated` is bumped on conflict,
+# as the Prisma upsert of the single-student path does. Rows are locked in
+# roll-number order, the order result view writes use.
+BULK_UPSERT_STUDENTS_QUERY = """
+INSERT INTO "student" ("id", "rollNumber", "name", "collegeCode", "fatherName", "lastUpdated")
+SELECT
+    gen_random_uuid()::text, s."rollNumber", s."name", s."collegeCode",
+    s."fatherName", $2::timestamp
+FROM jsonb_to_recordset($1::jsonb) AS s(
+    "rollNumber" text, "name" text, "collegeCode" text, "fatherName" text
+)
+ORDER BY s."rollNumber"
+ON CONFLICT ("rollNumber") DO UPDATE SET "lastUpdated" = EXCLUDED."lastUpdated"
+RETURNING "id", "rollNumber"
+"""
+
+# BULK_INSERT_MARKS_QUERY for several students: each row names its student.
+BULK_INSERT_BATCH_MARKS_QUERY = """
+INSERT INTO "mark" (
+    "id", "studentId", "subjectId", "semesterCode", "examCode",
+    "internalMarks", "externalMarks", "totalMarks", "grades", "credits",
+    "rcrv", "graceMarks"
+)
+SELECT
+    gen_random_uuid()::text, m."studentId", m."subjectId", m."semesterCode",
+    m."examCode", m."internalMarks", m."externalMarks", m."totalMarks",
+    m."grades", m."credits", m."rcrv", false
+FROM jsonb_to_recordset($1::jsonb) AS m(
+    "studentId" text, "subjectId" text, "semesterCode" text, "examCode" text,
+    "internalMarks" text, "externalMarks" text, "totalMarks" text,
+    "grades" text, "credits" double precision, "rcrv" boolean
+)
+ON CONFLICT ("studentId", "semesterCode", "examCode", "subjectId", "rcrv", "graceMarks")
+DO NOTHING
+RETURNING "studentId"
+"""
+
+
+def _exam_results_with_semester(results) -> list:
+    rollNo = results["details"]["rollNo"]
+    exam_results = []
+    for result in results["results"]:
+        if "semesterCode" not in result:
+            database_logger.error(
+                f"Skipping exam {result.get('examCode')} without a semester: {rollNo}"
+            )
+            continue
+        exam_results.append(result)
+    return exam_results
+
+
+def _mark_rows(exam_results, subject_ids: dict[str, str]) -> list[dict]:
+    return [
+        {
+            "subjectId": subject_ids[subject["subjectCode"]],
+            "semesterCode": result["semesterCode"],
+            "examCode": result["examCode"],
+            "internalMarks": subject["subjectInternal"],
+            "externalMarks": subject["subjectExternal"],
+            "totalMarks": subject["subjectTotal"],
+            "grades": subject["subjectGrade"],
+            "credits": float(subject["subjectCredits"]),
+            "rcrv": result["rcrv"],
+        }
+        for result in exam_results
+        for subject in result["subjects"]
+    ]
+
+
+async def save_to_database_bulk(results):
+    """Persist one scrape with set-based statements inside a single transaction.
+
+    The student upsert, one subject statement for every exam of the scrape and
+    one `INSERT ... ON CONFLICT DO NOTHING RETURNING` for the marks replace the
+    four round trips per subject of `save_to_database_per_subject`. The
+    returned row count is the number of newly inserted attempts, which drives
+    result notifications exactly like the per-subject path. Raises when the
+    transaction fails, so the scrape is not reported as saved.
+    """
+    details = results["details"]
+    rollNo = details["rollNo"]
+    exam_results = _exam_results_with_semester(results)
+
+    try:
+        async with prismaConnection.prisma.tx(timeout=15000) as transaction:
+            student = await transaction.student.upsert(
+                where={"rollNumber": rollNo},
+                data={
+                    "create": {
+                        "rollNumber": rollNo,
+                        "name": details["name"],
+                        "collegeCode": details["collegeCode"],
+                        "fatherName": details["fatherName"],
+                    },
+                    "update": {
+                        "lastUpdated": datetime.now(),
+                    },
+                },
+            )
+
+            subject_ids = await _bulk_upsert_subjects(transaction, exam_results)
+            marks = _mark_rows(exam_results, subject_ids)
+
+            inserted_count = 0
+            if marks:
+                inserted = await transaction.query_raw(
+                    BULK_INSERT_MARKS_QUERY, json.dumps(marks), student.id
+                )
+                inserted_count = len(inserted)
+            if inserted_count:
+                await outdate_result_views([rollNo], transaction)
+
+    except Exception as e:
+        database_logger.error(
+            f"Database error while bulk inserting student marks: {rollNo}:{e}"
+        )
+        raise
+
+    database_logger.info(f"Exam data and marks saved for student {rollNo}")
+    return inserted_count
+
+
+async def save_many_to_database(scrapes: list) -> dict[str, int]:
+    """Persist several students' scrapes in one transaction.
+
+    One statement upserts every student, one upserts every subject and one
+    inserts every mark, whatever the batch size. Returns the number of newly
+    inserted attempts per roll number. Raises when the transaction fails, so
+    the caller can fall back to saving the students one at a time.
+    """
+    scrapes_by_roll = {scrape["details"]["rollNo"]: scrape for scrape in scrapes}
+    if not scrapes_by_roll:
+        return {}
+    exam_results = {
+        rollNo: _exam_results_with_semester(scrape)
+        for rollNo, scrape in scrapes_by_roll.items()
+    }
+
+    async with prismaConnection.prisma.tx(timeout=30000) as transaction:
+        students = await transaction.query_raw(
+            BULK_UPSERT_STUDENTS_QUERY,
+            json.dumps(
+                [
+                    {
+                        "rollNumber": rollNo,
+                        "name": scrape["details"]["name"],
+                        "collegeCode": scrape["details"]["collegeCode"],
+                        "fatherName": scrape["details"]["fatherName"],
+                    }
+                    for rollNo, scrape in scrapes_by_roll.items()
+                ]
+            ),
+            datetime.now().isoformat(),
+        )
+        student_ids = {row["rollNumber"]: row["id"] for row in students}
+
+        subject_ids = await _bulk_upsert_subjects(
+            transaction,
+            [result for results in exam_results.values() for result in results],
+        )
+        marks = [
+            {**mark, "studentId": student_ids[rollNo]}
+            for rollNo, results in exam_results.items()
+            for mark in _mark_rows(results, subject_ids)
+        ]
+
+        inserted = []
+        if marks:
+            inserted = await transaction.query_raw(
+                BULK_INSERT_BATCH_MARKS_QUERY, json.dumps(marks)
+            )
+
+        roll_numbers = {
+            student_id: rollNo for rollNo, student_id in student_ids.items()
+        }
+        await outdate_result_views(
+            list(dict.fromkeys(roll_numbers[row["studentId"]] for row in inserted)),
+            transaction,
+        )
+
+    inserted_counts = dict.fromkeys(scrapes_by_roll, 0)
+    for row in inserted:
+        inserted_counts[roll_numbers[row["studentId"]]] += 1
+    database_logger.info(
+        f"Exam data and marks saved for {len(inserted_counts)} students in one batch"
+    )
+    return inserted_counts
+
+
 async def get_details(roll_number: str):
     student = await prismaConnection.prisma.student.find_unique(
         where={"rollNumber": roll_number}
@@ -245,6 +543,339 @@ async def get_students_details(rollNumber: str, roll_number2: str):
     return students
 
 
+RESULT_VIEW_FIELDS = ("details", "results", "allResults", "backlogs")
+
+# Every write that changes a student's marks runs this with it: the mark-set
+# version moves on and the stored view, now out of date, is dropped.
+RESULT_VIEWS_OUTDATED_QUERY = """
+WITH changed AS (
+    UPDATE "student" SET "marksVersion" = "marksVersion" + 1
+    WHERE "rollNumber" IN (SELECT jsonb_array_elements_text($1::jsonb))
+    RETURNING "rollNumber"
+)
+DELETE FROM "resultview"
+WHERE "rollNumber" IN (SELECT "rollNumber" FROM changed)
+"""
+
+# A view is stored only when it was built from the student's current mark
+# set, so an older snapshot can neither replace a newer view nor come back
+# after its marks changed. FOR SHARE waits for a mark write in progress and
+# then compares against the version it committed. Students are locked in
+# roll-number order, as `save_many_to_database` locks them, so the two cannot
+# deadlock.
+UPSERT_RESULT_VIEWS_QUERY = """
+INSERT INTO "resultview" (
+    "rollNumber", "version", "marksVersion", "markCount", "details", "results",
+    "allResults", "backlogs", "updatedAt"
+)
+SELECT
+    v."rollNumber", v."version", v."marksVersion", v."markCount", v."details",
+    v."results", v."allResults", v."backlogs", now()
+FROM jsonb_to_recordset($1::jsonb) AS v(
+    "rollNumber" text, "version" int, "marksVersion" int, "markCount" int,
+    "details" jsonb, "results" jsonb, "allResults" jsonb, "backlogs" jsonb
+)
+JOIN "student" s
+    ON s."rollNumber" = v."rollNumber" AND s."marksVersion" = v."marksVersion"
+ORDER BY v."rollNumber"
+FOR SHARE OF s
+ON CONFLICT ("rollNumber") DO UPDATE SET
+    "version" = EXCLUDED."version",
+    "marksVersion" = EXCLUDED."marksVersion",
+    "markCount" = EXCLUDED."markCount",
+    "details" = EXCLUDED."details",
+    "results" = EXCLUDED."results",
+    "allResults" = EXCLUDED."allResults",
+    "backlogs" = EXCLUDED."backlogs",
+    "updatedAt" = EXCLUDED."updatedAt"
+"""
+
+# The JSON columns come back as text and are decoded here, whatever the
+# client's JSON handling.
+GET_RESULT_VIEWS_QUERY = """
+SELECT
+    "rollNumber", "markCount", "details"::text AS "details",
+    "results"::text AS "results", "allResults"::text AS "allResults",
+    "backlogs"::text AS "backlogs"
+FROM "resultview"
+WHERE "rollNumber" IN (SELECT jsonb_array_elements_text($1::jsonb))
+    AND "version" = $2::int
+"""
+
+
+async def outdate_result_views(roll_numbers: list[str], client=None) -> None:
+    """Record that these students' marks changed, dropping their stored views.
+
+    Pass the transaction that wrote the marks as `client`, so both commit
+    together.
+    """
+    if roll_numbers:
+        await (client or prismaConnection.prisma).execute_raw(
+            RESULT_VIEWS_OUTDATED_QUERY, json.dumps(roll_numbers)
+        )
+
+
+async def get_result_views(roll_numbers: list[str]) -> dict[str, dict]:
+    """Fetch the stored result views of these students by primary key.
+
+    Only views of this `RESULT_VIEW_VERSION` are returned. Views whose marks
+    have changed since were dropped by `outdate_result_views`.
+    """
+    rows = await prismaConnection.prisma.query_raw(
+        GET_RESULT_VIEWS_QUERY, json.dumps(roll_numbers), str(RESULT_VIEW_VERSION)
+    )
+    return {
+        row["rollNumber"]: {
+            "markCount": row["markCount"],
+            **{field: json.loads(row[field]) for field in RESULT_VIEW_FIELDS},
+        }
+        for row in rows
+    }
+
+
+async def save_result_views(views: list[dict]) -> None:
+    """Store result views built by `studentResultViews`, replacing older ones."""
+    if not views:
+        return
+    try:
+        await prismaConnection.prisma.query_raw(
+            UPSERT_RESULT_VIEWS_QUERY, json.dumps(views)
+        )
+    except Exception as e:
+        # Reads recompute a missing view, so a failed write only costs speed.
+        database_logger.error(f"Unable to store result views: {e}")
+
+
+async def refresh_result_view(roll_number: str) -> dict | None:
+    """Recompute one student's result views from their marks and store them.
+
+    The worker calls this after saving new marks and grace marks are applied
+    through it as well. Returns None when the student is not stored.
+    """
+    response = await get_details(roll_number)
+    if not response:
+        return None
+    student, marks = response
+    view = studentResultViews(student, marks, isbpharmacyr22(roll_number))
+    await save_result_views([view])
+    return view
+
+
+async def get_result_view(roll_number: str) -> dict | None:
+    """Return the student's result views with one primary-key read.
+
+    Views that are missing or of an older `RESULT_VIEW_VERSION` are rebuilt
+    from the marks and stored on the way.
+    """
+    view = None
+    try:
+        view = (await get_result_views([roll_number])).get(roll_number)
+    except Exception as e:
+        database_logger.warning(f"Unable to read result view of {roll_number}: {e}")
+    if view is None:
+        view = await refresh_result_view(roll_number)
+    return view
+
+
+async def get_class_result_views(rollNumber: str, roll_number2: str):
+    """Return the result views of every student of both cohorts, by roll number.
+
+    Only students without a current view have their marks loaded, as flat
+    rows in one query; `cohortResultViews` computes all their views at once
+    and they are stored in one statement. Returns None when neither
+    cohort has students.
+    """
+    students = await prismaConnection.prisma.student.find_many(
+        where={
+            "OR": [
+                {"rollNumber": {"startswith": rollNumber}},
+                {"rollNumber": {"startswith": roll_number2}},
+            ]
+        },
+        order=[{"rollNumber": "asc"}],
+    )
+    if not students:
+        return None
+
+    return await _result_views_of(students)
+
+
+async def iter_class_result_views(
+    rollNumber: str,
+    roll_number2: str,
+    chunk_size: int = CLASS_RESULTS_STREAM_CHUNK_SIZE,
+):
+    """Yield the result views of both cohorts in chunks of `chunk_size` students.
+
+    Students are paged by roll number (keyset pagination), so memory stays
+    flat in the size of the class. Each chunk is built like
+    `get_class_result_views` builds the whole class.
+    """
+    after = ""
+    while True:
+        students = await prismaConnection.prisma.student.find_many(
+            where={
+                "OR": [
+                    {"rollNumber": {"startswith": rollNumber}},
+                    {"rollNumber": {"startswith": roll_number2}},
+                ],
+                "rollNumber": {"gt": after},
+            },
+            order=[{"rollNumber": "asc"}],
+            take=chunk_size,
+        )
+        if not students:
+            return
+        yield await _result_views_of(students)
+        if len(students) < chunk_size:
+            return
+        after = students[-1].rollNumber
+
+
+async def _result_views_of(students) -> list[dict]:
+    """Stored result views of `students`, building and storing missing ones."""
+    views = {}
+    try:
+        views = await get_result_views([s.rollNumber for s in students])
+    except Exception as e:
+        database_logger.warning(f"Unable to read class result views: {e}")
+
+    missing = [s for s in students if s.rollNumber not in views]
+    if missing:
+        rows = await prismaConnection.prisma.query_raw(
+            COHORT_MARK_ROWS_QUERY, json.dumps([s.id for s in missing])
+        )
+        built = cohortResultViews(missing, rows)
+        await save_result_views(built)
+        views.update((view["rollNumber"], view) for view in built)
+
+    return [views[s.rollNumber] for s in students]
+
+
+COHORT_PROBE_EXAM_CODE_QUERY = """
+SELECT m."examCode", COUNT(DISTINCT m."studentId") AS "students"
+FROM "mark" m
+JOIN "student" s ON s."id" = m."studentId"
+WHERE s."rollNumber" LIKE $1 AND m."rcrv" = false AND m."graceMarks" = false
+GROUP BY m."examCode"
+ORDER BY "students" DESC, m."examCode"
+LIMIT 1
+"""
+
+
+async def get_cohort_roll_numbers(class_prefix: str) -> set[str]:
+    students = await prismaConnection.prisma.student.find_many(
+        where={"rollNumber": {"startswith": class_prefix}}
+    )
+    return {student.rollNumber for student in students}
+
+
+async def get_cohort_probe_exam_code(class_prefix: str) -> str | None:
+    """Return the regular exam code most students of a cohort have results for."""
+    rows = await prismaConnection.prisma.query_raw(
+        COHORT_PROBE_EXAM_CODE_QUERY, f"{class_prefix}%"
+    )
+    return rows[0]["examCode"] if rows else None
+
+
+SEMESTER_COHORT_PREFIXES_QUERY = """
+SELECT DISTINCT substring(s."rollNumber" from 1 for 8) AS "prefix"
+FROM "mark" m
+JOIN "student" s ON s."id" = m."studentId"
+WHERE m."semesterCode" IN (SELECT jsonb_array_elements_text($1::jsonb))
+  AND substring(s."rollNumber" from 6 for 1) = $2
+"""
+
+EXAM_CODE_COHORT_PREFIXES_QUERY = """
+SELECT DISTINCT substring(s."rollNumber" from 1 for 8) AS "prefix"
+FROM "mark" m
+JOIN "student" s ON s."id" = m."studentId"
+WHERE m."examCode" = $1 AND m."rcrv" = false
+"""
+
+# RCRV results only exist for students who sat the exam, so for an RCRV
+# release only students with a regular attempt at the exam code qualify.
+STUDENTS_MISSING_EXAM_CODE_QUERY = """
+SELECT s."rollNumber"
+FROM "student" s
+WHERE s."rollNumber" LIKE $1
+  AND NOT EXISTS (
+    SELECT 1 FROM "mark" m
+    WHERE m."studentId" = s."id" AND m."examCode" = $2 AND m."rcrv" = $3
+  )
+  AND (
+    $3 = false OR EXISTS (
+      SELECT 1 FROM "mark" m
+      WHERE m."studentId" = s."id" AND m."examCode" = $2 AND m."rcrv" = false
+    )
+  )
+ORDER BY s."rollNumber"
+"""
+
+
+# Warm-up candidates for a release: subscribed roll numbers of a degree that do
+# not have the exam code yet, most-subscribed first.
+SUBSCRIBED_ROLL_NUMBERS_QUERY = """
+SELECT r."rollNumber", count(*) AS "subscriptions"
+FROM (
+  SELECT upper("rollNumber") AS "rollNumber" FROM "result_device_subscriptions"
+  UNION ALL
+  SELECT upper("rollNumber") AS "rollNumber" FROM "anon_push_subscriptions"
+  WHERE "rollNumber" IS NOT NULL
+) r
+WHERE substring(r."rollNumber" from 6 for 1) = $1
+  AND NOT EXISTS (
+    SELECT 1 FROM "student" s JOIN "mark" m ON m."studentId" = s."id"
+    WHERE s."rollNumber" = r."rollNumber" AND m."examCode" = $2 AND m."rcrv" = $3
+  )
+  AND (
+    $3 = false OR EXISTS (
+      SELECT 1 FROM "student" s JOIN "mark" m ON m."studentId" = s."id"
+      WHERE s."rollNumber" = r."rollNumber" AND m."examCode" = $2 AND m."rcrv" = false
+    )
+  )
+GROUP BY r."rollNumber"
+ORDER BY "subscriptions" DESC, r."rollNumber"
+LIMIT $4
+"""
+
+
+async def get_semester_cohort_prefixes(
+    degree_code: str, semester_codes: list[str]
+) -> list[str]:
+    """Return class prefixes of a degree with marks in any of the semesters."""
+    rows = await prismaConnection.prisma.query_raw(
+        SEMESTER_COHORT_PREFIXES_QUERY, json.dumps(semester_codes), degree_code
+    )
+    return sorted(row["prefix"] for row in rows)
+
+
+async def get_exam_code_cohort_prefixes(exam_code: str) -> list[str]:
+    rows = await prismaConnection.prisma.query_raw(
+        EXAM_CODE_COHORT_PREFIXES_QUERY, exam_code
+    )
+    return sorted(row["prefix"] for row in rows)
+
+
+async def get_students_missing_exam_code(
+    class_prefix: str, exam_code: str, rcrv: bool
+) -> list[str]:
+    rows = await prismaConnection.prisma.query_raw(
+        STUDENTS_MISSING_EXAM_CODE_QUERY, f"{class_prefix}%", exam_code, rcrv
+    )
+    return [row["rollNumber"] for row in rows]
+
+
+async def get_subscribed_roll_numbers(
+    degree_code: str, exam_code: str, rcrv: bool, limit: int
+) -> list[str]:
+    """Return subscribed roll numbers still missing the exam code, by subscriptions."""
+    rows = await prismaConnection.prisma.query_raw(
+        SUBSCRIBED_ROLL_NUMBERS_QUERY, degree_code, exam_code, rcrv, limit
+    )
+    return [row["rollNumber"] for row in rows]
+
+
 async def get_subscription_roll_number(roll_number: str):
     record = await prismaConnection.prisma.anonpushsubscription.find_first(
         where={"rollNumber": roll_number},
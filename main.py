@@ -33,8 +33,11 @@ from config.settings import (
     IS_PRODUCTION,
     RABBITMQ_URL,
 )
+from messaging.publisherPool import PublisherPool
 from scrapers.resultNotificationScraper import refresh_notifications_periodically
 from service.jobsService import refresh_jobs_periodically
+from utils.caching import listen_for_cache_invalidations
+from utils.compression import PrecompressedResponseMiddleware
 from utils.logger import logger
 from utils.mcpMetrics import instrument_mcp
 
@@ -44,21 +47,30 @@ async def lifespan(app: FastAPI):
     """Manages the lifespan of the application, ensuring RabbitMQ connection is opened and closed properly."""
     notification_refresh_task = None
     job_refresh_task = None
+    cache_invalidation_task = None
 
     try:
         logger.info("Starting FastAPI & RabbitMQ Consumer...")
         app.state.rabbitmq_connection = await aio_pika.connect_robust(RABBITMQ_URL)
+        app.state.rabbitmq_publisher = PublisherPool(app.state.rabbitmq_connection)
+        await app.state.rabbitmq_publisher.start()
         await prismaConnection.connect()
         redisConnection.connect()
 
         notification_refresh_task = asyncio.create_task(
-            refresh_notifications_periodically(),
+            refresh_notifications_periodically(
+                connection=app.state.rabbitmq_connection
+            ),
             name="notification-refresh-scheduler",
         )
         job_refresh_task = asyncio.create_task(
             refresh_jobs_periodically(),
             name="job-refresh-scheduler",
         )
+        cache_invalidation_task = asyncio.create_task(
+            listen_for_cache_invalidations(),
+            name="cache-invalidation-listener",
+        )
 
         yield
 
@@ -78,6 +90,16 @@ async def lifespan(app: FastAPI):
             except asyncio.CancelledError:
                 pass
 
+        if cache_invalidation_task is not None:
+            cache_invalidation_task.cancel()
+            try:
+                await cache_invalidation_task
+            except asyncio.CancelledError:
+                pass
+
+        if hasattr(app.state, "rabbitmq_publisher"):
+            await app.state.rabbitmq_publisher.close()
+
         if hasattr(app.state, "rabbitmq_connection"):
             await app.state.rabbitmq_connection.close()
 
@@ -87,6 +109,7 @@ async def lifespan(app: FastAPI):
         # Close Redis
         if hasattr(app.state, "redis"):
             await app.state.redis.close()
+        await redisConnection.aclose()
 
 
 def custom_openapi():
@@ -132,6 +155,10 @@ app.add_middleware(ExemptingSlowAPIMiddleware)
 # still carry the CORS headers the browser needs.
 app.add_middleware(ApiKeyHeaderMiddleware)
 
+# Large cached responses are gzip bodies (utils/compression.py); this decodes
+# them for the few clients that do not send `Accept-Encoding: gzip`.
+app.add_middleware(PrecompressedResponseMiddleware)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=[
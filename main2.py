@@ -1,4 +1,6 @@
+from config.settings import WORKER_MAX_PROCESSES
 from messaging.consumer import consume_messages
+from messaging.supervisor import run_supervisor
 import asyncio
 
 
@@ -6,5 +8,8 @@ async def main():
     await consume_messages()
 
 
-asyncio.run(main())
-
+if __name__ == "__main__":
+    if WORKER_MAX_PROCESSES > 1:
+        run_supervisor()
+    else:
+        asyncio.run(main())
@@ -0,0 +1,34 @@
+"""Class prefixes and progress keys, shared by the API and the worker.
+
+Kept apart from `messaging.consumer` so the API can read class progress
+without importing the worker's scraping stack.
+"""
+
+
+def get_class_prefixes(roll_number: str) -> tuple[str, str]:
+    """Return the requested and paired class prefixes."""
+    class_prefix = roll_number[:8]
+    admission_type = class_prefix[4]
+
+    if admission_type == "1":
+        paired_year = str(int(class_prefix[:2]) + 1).zfill(2)
+        paired_admission_type = "5"
+    elif admission_type == "5":
+        paired_year = str(int(class_prefix[:2]) - 1).zfill(2)
+        paired_admission_type = "1"
+    else:
+        raise ValueError(
+            f"Unsupported admission type in class roll number: {roll_number}"
+        )
+
+    paired_prefix = (
+        paired_year
+        + class_prefix[2:4]
+        + paired_admission_type
+        + class_prefix[5:8]
+    )
+    return class_prefix, paired_prefix
+
+
+def class_results_progress_key(class_prefix: str) -> str:
+    return f"class_results_progress:{class_prefix}"
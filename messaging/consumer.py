@@ -1,53 +1,63 @@
 import asyncio
+import json
+import time
 from collections.abc import Iterator
+from contextlib import asynccontextmanager
 
 import aio_pika
+from prometheus_client import start_http_server
 
 from config.connection import prismaConnection
+from config.httpConnection import httpConnection
 from config.redisConnection import redisConnection
 from config.settings import (
     CLASS_RESULTS_PROCESSED_EXPIRY_TIME,
     CLASS_RESULTS_QUEUE_NAME,
+    CLASS_RESULTS_QUEUE_PREFETCH,
+    CLASS_RESULTS_WINDOW_SIZE,
+    CONSUMER_BATCH_WAIT_SECONDS,
+    INCREMENTAL_RESULTS_CONCURRENCY,
+    INCREMENTAL_RESULTS_QUEUE_NAME,
+    INCREMENTAL_RESULTS_QUEUE_PREFETCH,
     NOTIFICATIONS_REDIS_KEY,
     QUEUE_NAME,
     RABBITMQ_URL,
     RABBITMQ_ROLL_NUMBERS,
+    RECENT_SCRAPE_WINDOW_SECONDS,
+    REFRESH_QUEUE_BATCH_SIZE,
+    REFRESH_QUEUE_PREFETCH,
+    REFRESH_RESULTS_QUEUE_NAME,
+    RESULTS_QUEUE_BATCH_SIZE,
+    RESULTS_QUEUE_PREFETCH,
+    RESULTS_RELEASE_GENERATION_KEY,
+    SCRAPES_COMPLETED_EXPIRY_TIME,
+    UPSTREAM_BREAKER_COOLDOWN_SECONDS,
+    WARMUP_RATE_PER_SECOND,
+    WORKER_METRICS_PORT,
 )
-from database.operations import get_exam_codes_from_database, save_to_database
+from database.operations import (
+    get_exam_codes_from_database,
+    get_students_missing_exam_code,
+    refresh_result_view,
+    save_many_to_database,
+    save_to_database,
+)
+from messaging.classResults import class_results_progress_key, get_class_prefixes
+from messaging.lanes import BACKGROUND, INTERACTIVE, REFRESH, scrape_lane
+from messaging.publisher import recently_scraped_key, scrapes_completed_key
+from messaging.workerStats import workerStats
 from scrapers.resultNotificationScraper import refresh_notifications
 from scrapers.resultScraper import ResultScraper
-from scrapers.serverChecker import check_url
+from scrapers.retryScheduler import upstreamCircuitBreaker
+from scrapers.rollNumberProbe import load_class_cohort, scrape_class_roll_number
+from scrapers.serverChecker import get_upstream_hosts, run_host_prober
+from service.getResultsService import cache_results
 from subscriptions.send_notification import send_push_notification_to_particular_user
 from subscriptions.mobile_notification import notify_student_result_updated
 from utils.logger import rabbitmq_logger, logger, scraping_logger
 from utils.caching import invalidate_all_cache
 
 
-def get_class_prefixes(roll_number: str) -> tuple[str, str]:
-    """Return the requested and paired class prefixes."""
-    class_prefix = roll_number[:8]
-    admission_type = class_prefix[4]
-
-    if admission_type == "1":
-        paired_year = str(int(class_prefix[:2]) + 1).zfill(2)
-        paired_admission_type = "5"
-    elif admission_type == "5":
-        paired_year = str(int(class_prefix[:2]) - 1).zfill(2)
-        paired_admission_type = "1"
-    else:
-        raise ValueError(
-            f"Unsupported admission type in class roll number: {roll_number}"
-        )
-
-    paired_prefix = (
-        paired_year
-        + class_prefix[2:4]
-        + paired_admission_type
-        + class_prefix[5:8]
-    )
-    return class_prefix, paired_prefix
-
-
 def iter_class_roll_numbers(roll_number: str) -> Iterator[str]:
     """Yield every roll number in the requested and paired class cohorts."""
     class_prefixes = get_class_prefixes(roll_number)
@@ -61,65 +71,230 @@ def iter_class_roll_numbers(roll_number: str) -> Iterator[str]:
                 yield f"{prefix}{letter}{number}"
 
 
+async def _set_class_results_progress(key: str, **fields) -> None:
+    if not redisConnection.aio:
+        return
+    await (
+        redisConnection.aio.pipeline()
+        .hset(key, mapping={**fields, "updatedAt": int(time.time())})
+        .expire(key, CLASS_RESULTS_PROCESSED_EXPIRY_TIME)
+        .execute()
+    )
+
+
 async def process_class_results_message(message_body: str) -> None:
-    """Scrape a class unless either paired cohort was processed in the last day."""
+    """Scrape a class unless either paired cohort was processed in the last day.
+
+    Up to `CLASS_RESULTS_WINDOW_SIZE` roll numbers are scraped at once, but
+    outcomes are consumed in roll-number order so the sweep stops at exactly
+    the same roll number as a serial walk after 20 consecutive empty results.
+    Scrapes already in flight past that point are allowed to finish. Roll
+    numbers not yet in the database are probed before a full scrape.
+    """
     rabbitmq_logger.info(f"Processing class results message: {message_body}")
     class_prefixes = get_class_prefixes(message_body)
     processed_keys = [
         f"class_results_processed:{prefix}" for prefix in class_prefixes
     ]
 
-    if redisConnection.client and any(
-        redisConnection.client.exists(key) for key in processed_keys
-    ):
+    if redisConnection.aio and await redisConnection.aio.exists(*processed_keys):
         rabbitmq_logger.info(
             f"Skipping class results for {message_body[:8]}; "
             "already processed within 24 hours"
         )
         return
 
+    roll_numbers = list(iter_class_roll_numbers(message_body))
+    cohorts = {prefix: await load_class_cohort(prefix) for prefix in class_prefixes}
+    progress_key = class_results_progress_key(class_prefixes[0])
+    await _set_class_results_progress(
+        progress_key,
+        status="running",
+        total=len(roll_numbers),
+        processed=0,
+        withResults=0,
+        startedAt=int(time.time()),
+    )
+
+    in_flight: dict[asyncio.Task, int] = {}
+    outcomes: dict[int, bool] = {}
+    next_index = 0
+    frontier = 0
+    with_results = 0
     consecutive_empty_results = 0
-    for student_roll_number in iter_class_roll_numbers(message_body):
-        has_results = await process_message(student_roll_number)
-        if has_results:
-            consecutive_empty_results = 0
-            continue
-
-        consecutive_empty_results += 1
-        if consecutive_empty_results >= 20:
-            rabbitmq_logger.info(
-                f"Stopping class results for {message_body[:8]} after "
-                "20 consecutive roll numbers returned no results"
+    stopped = False
+    aborted = False
+
+    while True:
+        while (
+            not stopped
+            and not aborted
+            and next_index < len(roll_numbers)
+            and len(in_flight) < CLASS_RESULTS_WINDOW_SIZE
+        ):
+            if await upstreamCircuitBreaker.is_open():
+                # Failures while the breaker is open say nothing about the
+                # cohort, so leave the class unmarked for a later request.
+                rabbitmq_logger.warning(
+                    f"Abandoning class results for {message_body[:8]}; "
+                    "upstream circuit breaker is open"
+                )
+                aborted = True
+                break
+            roll_number = roll_numbers[next_index]
+            task = asyncio.create_task(
+                scrape_class_roll_number(
+                    roll_number, cohorts[roll_number[:8]], process_message
+                )
             )
+            in_flight[task] = next_index
+            next_index += 1
+
+        if not in_flight:
             break
 
-    if redisConnection.client:
+        done, _ = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            outcomes[in_flight.pop(task)] = bool(task.result())
+
+        advanced = False
+        while not stopped and frontier in outcomes:
+            advanced = True
+            if outcomes.pop(frontier):
+                with_results += 1
+                consecutive_empty_results = 0
+            else:
+                consecutive_empty_results += 1
+                if consecutive_empty_results >= 20:
+                    rabbitmq_logger.info(
+                        f"Stopping class results for {message_body[:8]} after "
+                        "20 consecutive roll numbers returned no results"
+                    )
+                    stopped = True
+            frontier += 1
+        if advanced:
+            await _set_class_results_progress(
+                progress_key, processed=frontier, withResults=with_results
+            )
+
+    if aborted:
+        await _set_class_results_progress(progress_key, status="aborted")
+        return
+
+    await _set_class_results_progress(progress_key, status="completed")
+    if redisConnection.aio:
+        pipeline = redisConnection.aio.pipeline()
         for key in processed_keys:
-            redisConnection.client.set(
-                key, "1", ex=CLASS_RESULTS_PROCESSED_EXPIRY_TIME
+            pipeline.set(key, "1", ex=CLASS_RESULTS_PROCESSED_EXPIRY_TIME)
+        await pipeline.execute()
+
+
+async def _save_and_notify(roll_number: str, results) -> int:
+    inserted_count = await save_to_database(results)
+    await _notify_saved(roll_number, inserted_count)
+    return inserted_count
+
+
+async def _notify_saved(roll_number: str, inserted_count: int) -> None:
+    if inserted_count > 0:
+        # Rebuild the stored views before the caches are dropped, so the next
+        # read already finds them.
+        await refresh_result_view(roll_number)
+    await invalidate_all_cache(roll_number)
+    if inserted_count > 0:
+        await send_push_notification_to_particular_user(roll_number)
+        try:
+            await notify_student_result_updated(roll_number)
+        except Exception as error:
+            logger.error(
+                f"Mobile student result notification failed for {roll_number}: {error}"
             )
 
 
-# Define a function to process messages
-async def process_message(message_body: str) -> bool:
+async def process_incremental_results_message(message_body: str) -> None:
+    """Fetch one newly released exam code for every known student of the cohorts.
+
+    Students that already have the exam code stored are skipped, and each of
+    the rest costs a single upstream request instead of a full re-scrape.
+    Warm-up items name subscribed roll numbers instead of cohorts; they are
+    started at `WARMUP_RATE_PER_SECOND` and their results are cached once saved.
+    """
+    work_item = json.loads(message_body)
+    exam_code = work_item["examCode"]
+    rcrv = work_item.get("rcrv", False)
+    warmup_roll_numbers = work_item.get("rollNumbers")
+    if warmup_roll_numbers is not None:
+        target = f"{len(warmup_roll_numbers)} subscribed students"
+    else:
+        target = f"{len(work_item['prefixes'])} cohorts"
+    rabbitmq_logger.info(
+        f"Processing incremental results for {exam_code} (rcrv={rcrv}) across {target}"
+    )
+
+    hosts = await get_upstream_hosts()
+    if not hosts:
+        rabbitmq_logger.warning("No url found, skipping incremental results...")
+        return
+
+    semaphore = asyncio.Semaphore(INCREMENTAL_RESULTS_CONCURRENCY)
+
+    async def scrape(roll_number: str) -> None:
+        async with semaphore:
+            while await upstreamCircuitBreaker.is_open():
+                await asyncio.sleep(UPSTREAM_BREAKER_COOLDOWN_SECONDS)
+            try:
+                scraper = ResultScraper(roll_number, [], [], hosts=hosts)
+                results = await scraper.scrape_exam_code(
+                    exam_code, work_item["semesterCode"], rcrv
+                )
+                if results and results["results"]:
+                    await _save_and_notify(roll_number, results)
+                    if warmup_roll_numbers is not None:
+                        await cache_results(roll_number)
+            except Exception as error:
+                scraping_logger.error(
+                    f"Incremental scrape of {exam_code} failed for {roll_number}: {error}"
+                )
+
+    if warmup_roll_numbers is not None:
+        # Pace warm-up starts so on-demand scrapes keep most of the upstream
+        # budget the governor hands out.
+        tasks = []
+        for roll_number in warmup_roll_numbers:
+            tasks.append(asyncio.create_task(scrape(roll_number)))
+            await asyncio.sleep(1 / WARMUP_RATE_PER_SECOND)
+        await asyncio.gather(*tasks)
+        return
+
+    for prefix in work_item["prefixes"]:
+        roll_numbers = await get_students_missing_exam_code(prefix, exam_code, rcrv)
+        await asyncio.gather(*(scrape(roll_number) for roll_number in roll_numbers))
+
+
+async def scrape_roll_number(message_body: str) -> dict | None:
+    """Scrape one roll number, or return None when there is nothing to save."""
     try:
-        """
-        Process the consumed message.
-        Replace this logic with your custom processing code.
-        """
         rabbitmq_logger.info(f"Processing message: {message_body}")
 
-        url = check_url()
-        if not url:
+        hosts = await get_upstream_hosts()
+        if not hosts:
             rabbitmq_logger.warning("No url found, skipping processing...")
-            return False
+            return None
+
+        if await upstreamCircuitBreaker.is_open():
+            rabbitmq_logger.warning(
+                f"Upstream circuit breaker is open, skipping {message_body}"
+            )
+            return None
 
         # get exam codes present in database
         exam_codes = await get_exam_codes_from_database(message_body)
         exam_codes_rcrv = await get_exam_codes_from_database(message_body, True)
 
         # intializeing the scraper
-        scraper = ResultScraper(message_body, exam_codes, exam_codes_rcrv, url)
+        scraper = ResultScraper(
+            message_body, exam_codes, exam_codes_rcrv, hosts=hosts
+        )
 
         # running the scraper
         rabbitmq_logger.info(f"Started scraper for {message_body}")
@@ -129,50 +304,143 @@ async def process_message(message_body: str) -> bool:
 
         if results is None:
             logger.warning(f"Failed to get results: {message_body}")
-            return False
+            return None
 
         logger.info(f"Results was successfully extracted: {message_body}")
+        return results
 
+    except Exception as e:
+        scraping_logger.error(f"Error while scarping results: {e}")
+        return None
+
+
+# Define a function to process messages
+async def process_message(message_body: str) -> bool:
+    results = await scrape_roll_number(message_body)
+    if results is None:
+        return False
+
+    try:
         # Database save
         rabbitmq_logger.info(f"Saving results to database for {message_body}")
-        inserted_count = await save_to_database(results)
-        invalidate_all_cache(message_body)
-        if inserted_count > 0:
-            await send_push_notification_to_particular_user(message_body)
-            try:
-                await notify_student_result_updated(message_body)
-            except Exception as error:
-                logger.error(
-                    f"Mobile student result notification failed for {message_body}: {error}"
-                )
+        await _save_and_notify(message_body, results)
         return True
 
     except Exception as e:
         scraping_logger.error(f"Error while scarping results: {e}")
         return False
 
+
+async def process_message_batch(roll_numbers: list[str]) -> dict[str, bool]:
+    """Scrape roll numbers concurrently and save every result in one transaction.
+
+    Returns whether each roll number was scraped and saved. If the batch
+    transaction fails, the students are saved one at a time instead, so one
+    bad record cannot sink the rest.
+    """
+    roll_numbers = list(dict.fromkeys(roll_numbers))
+    scraped = await asyncio.gather(*map(scrape_roll_number, roll_numbers))
+    results = {
+        roll_number: result
+        for roll_number, result in zip(roll_numbers, scraped)
+        if result is not None
+    }
+
+    if results:
+        rabbitmq_logger.info(f"Saving results to database for {len(results)} students")
+        try:
+            inserted_counts = await save_many_to_database(list(results.values()))
+        except Exception as error:
+            logger.error(
+                f"Batch save failed, saving {len(results)} students one at a time: {error}"
+            )
+            inserted_counts = {}
+            for roll_number, result in list(results.items()):
+                # One bad record must not sink the students that do save.
+                try:
+                    inserted_counts[roll_number] = await save_to_database(result)
+                except Exception as error:
+                    logger.error(f"Unable to save results for {roll_number}: {error}")
+                    del results[roll_number]
+
+        for roll_number in list(results):
+            try:
+                await _notify_saved(roll_number, inserted_counts[roll_number])
+            except Exception as error:
+                scraping_logger.error(f"Error while scarping results: {error}")
+                del results[roll_number]
+
+    return {roll_number: roll_number in results for roll_number in roll_numbers}
+
     """Consume messages from RabbitMQ and pass them to the processing function."""
 
 
-async def _consume_default_queue(queue) -> None:
-    async with queue.iterator() as queue_iter:
+async def _record_scrape(roll_number: str, scraped: bool) -> None:
+    """Release a roll number's publish claim and, on success, mark it recently scraped."""
+    if not redisConnection.aio:
+        rabbitmq_logger.warning("Redis is not found")
+        return
+    pipeline = redisConnection.aio.pipeline().zrem(RABBITMQ_ROLL_NUMBERS, roll_number)
+    if scraped:
+        completed_key = scrapes_completed_key(int(time.time() // 60))
+        generation = await redisConnection.aio.get(RESULTS_RELEASE_GENERATION_KEY)
+        pipeline.incr(completed_key).expire(completed_key, SCRAPES_COMPLETED_EXPIRY_TIME)
+        if RECENT_SCRAPE_WINDOW_SECONDS:
+            pipeline.set(
+                recently_scraped_key(roll_number),
+                generation or "0",
+                ex=RECENT_SCRAPE_WINDOW_SECONDS,
+            )
+    await pipeline.execute()
+    rabbitmq_logger.info(f"Removed roll number {roll_number} from Redis.")
+
+
+@asynccontextmanager
+async def _stop_consuming_on(stopping: asyncio.Event | None, stop_consuming):
+    """Await `stop_consuming()` once `stopping` is set.
+
+    Stopping cancels the consumer, so the loop ends after its current message
+    and the messages prefetched behind it go back to the queue.
+    """
+    if stopping is None:
+        yield
+        return
+
+    async def watch():
+        await stopping.wait()
+        await stop_consuming()
+
+    watcher = asyncio.create_task(watch())
+    try:
+        yield
+    finally:
+        watcher.cancel()
+
+
+async def _consume_default_queue(
+    queue, connection, lane: str = INTERACTIVE, stopping: asyncio.Event | None = None
+) -> None:
+    # Each consumer runs in its own task, so the lane only tags its own scrapes.
+    scrape_lane.set(lane)
+    async with queue.iterator() as queue_iter, _stop_consuming_on(
+        stopping, queue_iter.close
+    ):
         async for message in queue_iter:
             try:
                 async with message.process():
                     body = message.body.decode()
-                    # Remove the roll number from Redis after successful processing
-                    if redisConnection.client:
-                        redisConnection.client.srem(RABBITMQ_ROLL_NUMBERS, body)
-                        rabbitmq_logger.info(
-                            f"Removed roll number {body} from Redis."
-                        )
-                    else:
-                        rabbitmq_logger.warning("Redis is not found")
-
                     if body == NOTIFICATIONS_REDIS_KEY:
-                        await refresh_notifications()
-                    else:
-                        await process_message(body)
+                        await refresh_notifications(connection)
+                        continue
+
+                    # The roll number stays claimed while it is scraped, so
+                    # publishes meanwhile report it as in progress.
+                    scraped = False
+                    try:
+                        with workerStats.track():
+                            scraped = await process_message(body)
+                    finally:
+                        await _record_scrape(body, scraped)
 
             except Exception as error:
                 rabbitmq_logger.error(
@@ -182,12 +450,127 @@ async def _consume_default_queue(queue) -> None:
                     await message.reject(requeue=False)
 
 
-async def _consume_class_results_queue(queue) -> None:
-    async with queue.iterator() as queue_iter:
+async def _refresh_notifications_message(message, connection) -> None:
+    try:
+        await refresh_notifications(connection)
+    except Exception as error:
+        rabbitmq_logger.error(f"Error refreshing notifications: {error}")
+        await message.reject(requeue=False)
+        return
+    await message.ack()
+
+
+async def _process_message_batch(messages, connection) -> None:
+    """Process one batch and ack or reject each of its messages."""
+    roll_number_messages = []
+    for message in messages:
+        if message.body.decode() == NOTIFICATIONS_REDIS_KEY:
+            # Settled on its own, so a failed refresh cannot drop the batch.
+            await _refresh_notifications_message(message, connection)
+        else:
+            roll_number_messages.append(message)
+    if not roll_number_messages:
+        return
+
+    roll_numbers = [message.body.decode() for message in roll_number_messages]
+    try:
+        outcomes = await process_message_batch(roll_numbers)
+    except Exception as error:
+        # Nothing is known to be saved; the roll numbers keep their claims
+        # and are scraped again.
+        rabbitmq_logger.error(
+            f"Error processing message batch: {error},{roll_numbers}"
+        )
+        for message in roll_number_messages:
+            await message.reject(requeue=True)
+        return
+
+    for roll_number in dict.fromkeys(roll_numbers):
+        try:
+            await _record_scrape(roll_number, outcomes.get(roll_number, False))
+        except Exception as error:
+            # The claim expires after SCRAPE_IN_FLIGHT_SECONDS instead.
+            rabbitmq_logger.error(f"Unable to record scrape of {roll_number}: {error}")
+    # Failed scrapes are acked too, as in the one-message-at-a-time loop.
+    for message in roll_number_messages:
+        await message.ack()
+
+
+async def _consume_default_queue_in_batches(
+    queue, connection, lane: str, batch_size: int, stopping: asyncio.Event | None = None
+) -> None:
+    """Take up to `batch_size` messages at a time and ack them once their batch is saved."""
+    scrape_lane.set(lane)
+    pending: asyncio.Queue = asyncio.Queue()
+    consumer_tag = await queue.consume(pending.put)
+
+    async def stop_consuming():
+        await queue.cancel(consumer_tag)
+        # Prefetched messages go back to the queue; None wakes the loop to end it.
+        while not pending.empty():
+            await pending.get_nowait().reject(requeue=True)
+        pending.put_nowait(None)
+
+    async with _stop_consuming_on(stopping, stop_consuming):
+        await _take_batches(pending, connection, batch_size)
+
+
+async def _take_batches(pending: asyncio.Queue, connection, batch_size: int) -> None:
+    stopped = False
+    while not stopped:
+        message = await pending.get()
+        if message is None:
+            return
+        batch = [message]
+        deadline = time.monotonic() + CONSUMER_BATCH_WAIT_SECONDS
+        while len(batch) < batch_size:
+            if not pending.empty():
+                message = pending.get_nowait()
+            else:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    message = await asyncio.wait_for(pending.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+            if message is None:
+                # Finish the messages already batched, then stop.
+                stopped = True
+                break
+            batch.append(message)
+
+        try:
+            with workerStats.track(len(batch)):
+                await _process_message_batch(batch, connection)
+        except Exception as error:
+            # Settling failed, most likely on a closed channel; the unacked
+            # messages are redelivered.
+            rabbitmq_logger.error(f"Error settling message batch: {error}")
+
+
+def _consume_roll_numbers(
+    queue, connection, lane: str, batch_size: int, stopping: asyncio.Event | None
+):
+    if batch_size > 1:
+        return _consume_default_queue_in_batches(
+            queue, connection, lane, batch_size, stopping
+        )
+    return _consume_default_queue(queue, connection, lane, stopping)
+
+
+async def _consume_class_results_queue(
+    queue, stopping: asyncio.Event | None = None
+) -> None:
+    scrape_lane.set(BACKGROUND)
+    async with queue.iterator() as queue_iter, _stop_consuming_on(
+        stopping, queue_iter.close
+    ):
         async for message in queue_iter:
             try:
                 async with message.process():
-                    await process_class_results_message(message.body.decode())
+                    with workerStats.track(background=True):
+                        await process_class_results_message(message.body.decode())
             except Exception as error:
                 rabbitmq_logger.error(
                     f"Error processing class results message: {error},{message.body}"
@@ -196,7 +579,34 @@ async def _consume_class_results_queue(queue) -> None:
                     await message.reject(requeue=False)
 
 
-async def consume_messages():
+async def _consume_incremental_results_queue(
+    queue, stopping: asyncio.Event | None = None
+) -> None:
+    scrape_lane.set(BACKGROUND)
+    async with queue.iterator() as queue_iter, _stop_consuming_on(
+        stopping, queue_iter.close
+    ):
+        async for message in queue_iter:
+            try:
+                async with message.process():
+                    with workerStats.track(background=True):
+                        await process_incremental_results_message(
+                            message.body.decode()
+                        )
+            except Exception as error:
+                rabbitmq_logger.error(
+                    f"Error processing incremental results message: {error},{message.body}"
+                )
+                if not message.processed:
+                    await message.reject(requeue=False)
+
+
+async def consume_messages(
+    metrics_port: int = WORKER_METRICS_PORT, stopping: asyncio.Event | None = None
+):
+    """Consume every queue until cancelled, or until `stopping` is set and the
+    messages in hand are finished."""
+    host_prober = None
     try:
         # connection = app.state.rabbitmq_connection
         logger.info("Starting rabbitmq connection for consumer")
@@ -209,28 +619,80 @@ async def consume_messages():
         logger.info("Starting redis connection for consumer")
         redisConnection.connect()
 
+        logger.info("Starting shared HTTP pool for consumer")
+        await httpConnection.connect()
+
+        logger.info("Starting upstream host prober for consumer")
+        host_prober = asyncio.create_task(run_host_prober(), name="host-prober")
+
+        if metrics_port:
+            start_http_server(metrics_port)
+            logger.info(f"Worker metrics exposed on port {metrics_port}")
+
         async with connection:
             channel = await connection.channel()
+            refresh_results_channel = await connection.channel()
             class_results_channel = await connection.channel()
+            incremental_results_channel = await connection.channel()
 
-            await channel.set_qos(prefetch_count=2)
-            # Only one class batch may run at a time. Each batch also awaits
-            # every individual roll number before starting the next one.
-            await class_results_channel.set_qos(prefetch_count=1)
+            # A batch needs all of its messages delivered at once.
+            await channel.set_qos(
+                prefetch_count=max(RESULTS_QUEUE_PREFETCH, RESULTS_QUEUE_BATCH_SIZE)
+            )
+            await refresh_results_channel.set_qos(
+                prefetch_count=max(REFRESH_QUEUE_PREFETCH, REFRESH_QUEUE_BATCH_SIZE)
+            )
+            # With the default of 1, only one class batch runs at a time. Each
+            # batch scrapes at most CLASS_RESULTS_WINDOW_SIZE roll numbers
+            # concurrently.
+            await class_results_channel.set_qos(
+                prefetch_count=CLASS_RESULTS_QUEUE_PREFETCH
+            )
+            await incremental_results_channel.set_qos(
+                prefetch_count=INCREMENTAL_RESULTS_QUEUE_PREFETCH
+            )
 
             queue = await channel.declare_queue(QUEUE_NAME, durable=True)
+            refresh_results_queue = await refresh_results_channel.declare_queue(
+                REFRESH_RESULTS_QUEUE_NAME,
+                durable=True,
+            )
             class_results_queue = await class_results_channel.declare_queue(
                 CLASS_RESULTS_QUEUE_NAME,
                 durable=True,
             )
+            incremental_results_queue = (
+                await incremental_results_channel.declare_queue(
+                    INCREMENTAL_RESULTS_QUEUE_NAME,
+                    durable=True,
+                )
+            )
             rabbitmq_logger.info(f"Waiting for messages in queue: {QUEUE_NAME}")
+            rabbitmq_logger.info(
+                f"Waiting for messages in queue: {REFRESH_RESULTS_QUEUE_NAME}"
+            )
             rabbitmq_logger.info(
                 f"Waiting for messages in queue: {CLASS_RESULTS_QUEUE_NAME}"
             )
+            rabbitmq_logger.info(
+                f"Waiting for messages in queue: {INCREMENTAL_RESULTS_QUEUE_NAME}"
+            )
 
             await asyncio.gather(
-                _consume_default_queue(queue),
-                _consume_class_results_queue(class_results_queue),
+                _consume_roll_numbers(
+                    queue, connection, INTERACTIVE, RESULTS_QUEUE_BATCH_SIZE, stopping
+                ),
+                _consume_roll_numbers(
+                    refresh_results_queue,
+                    connection,
+                    REFRESH,
+                    REFRESH_QUEUE_BATCH_SIZE,
+                    stopping,
+                ),
+                _consume_class_results_queue(class_results_queue, stopping),
+                _consume_incremental_results_queue(
+                    incremental_results_queue, stopping
+                ),
             )
 
     except asyncio.CancelledError:
@@ -238,4 +700,8 @@ async def consume_messages():
     except Exception as e:
         rabbitmq_logger.error(f"An error occurred: {e}")
     finally:
+        if host_prober is not None:
+            host_prober.cancel()
+        await httpConnection.disconnect()
+        await redisConnection.aclose()
         rabbitmq_logger.info("Shutting down gracefully...")
@@ -0,0 +1,35 @@
+"""Priority lanes for result scrapes.
+
+- `INTERACTIVE`: a student is waiting on a cache and database miss
+  (`QUEUE_NAME`).
+- `REFRESH`: hard refreshes and freshness scrapes for students who were
+  already answered from the cache or database (`REFRESH_RESULTS_QUEUE_NAME`).
+- `BACKGROUND`: class sweeps and release-day work items (the class-results and
+  incremental-results queues).
+
+Each lane has its own queue and depth limit, so a burst of background work
+never sits in front of an interactive request. The worker records the lane of
+the scrape it is running in `scrape_lane`. Tasks started by a sweep inherit
+it, and the upstream governor uses it to keep `LANE_HEADROOM` of the shared
+request budget free for higher lanes.
+"""
+
+from contextvars import ContextVar
+
+from config.settings import (
+    UPSTREAM_BACKGROUND_HEADROOM,
+    UPSTREAM_REFRESH_HEADROOM,
+)
+
+INTERACTIVE = "interactive"
+REFRESH = "refresh"
+BACKGROUND = "background"
+
+# Share of upstream concurrency and burst a lane leaves for the lanes above it.
+LANE_HEADROOM = {
+    INTERACTIVE: 0.0,
+    REFRESH: UPSTREAM_REFRESH_HEADROOM,
+    BACKGROUND: UPSTREAM_BACKGROUND_HEADROOM,
+}
+
+scrape_lane: ContextVar[str] = ContextVar("scrape_lane", default=INTERACTIVE)
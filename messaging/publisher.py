@@ -1,3 +1,6 @@
+import json
+import time
+
 import aio_pika
 from fastapi import FastAPI, status
 from fastapi.responses import JSONResponse
@@ -5,45 +8,182 @@ from config.redisConnection import redisConnection
 from config.settings import (
     CLASS_RESULTS_QUEUE_MAX_MESSAGES,
     CLASS_RESULTS_QUEUE_NAME,
+    INCREMENTAL_RESULTS_QUEUE_NAME,
     NOTIFICATIONS_REDIS_KEY,
     QUEUE_NAME,
     RABBITMQ_MAX_MESSAGES,
+    RABBITMQ_REFRESH_MAX_MESSAGES,
+    RABBITMQ_ROLL_NUMBERS,
+    REFRESH_RESULTS_QUEUE_NAME,
+    RESULTS_RELEASE_GENERATION_KEY,
+    SCRAPE_IN_FLIGHT_SECONDS,
 )
+from messaging.lanes import INTERACTIVE, REFRESH
 from scrapers.serverChecker import check_valid_url_in_redis
 from utils.logger import rabbitmq_logger
 
+# Queue and depth limit of each roll-number lane. Background work has its own
+# queues: class sweeps are capped by CLASS_RESULTS_QUEUE_MAX_MESSAGES and
+# RABBITMQ_CLASS_PUBLISH_MAX_MESSAGES, and release-day work items are bounded
+# by the release itself.
+LANE_QUEUES = {
+    INTERACTIVE: QUEUE_NAME,
+    REFRESH: REFRESH_RESULTS_QUEUE_NAME,
+}
+LANE_MAX_MESSAGES = {
+    INTERACTIVE: RABBITMQ_MAX_MESSAGES,
+    REFRESH: RABBITMQ_REFRESH_MAX_MESSAGES,
+}
+
+# Claims a roll number for one scrape. RABBITMQ_ROLL_NUMBERS is a sorted set of
+# roll numbers queued or being scraped, scored by enqueue time; entries older
+# than the in-flight limit belong to lost messages and are dropped first.
+# Returns {outcome, rank}: 0 newly queued, 1 already queued or being scraped,
+# 2 scraped since the latest result release.
+CLAIM_ROLL_NUMBER_SCRIPT = """
+redis.call("ZREMRANGEBYSCORE", KEYS[1], "-inf", tonumber(ARGV[2]) - tonumber(ARGV[3]))
+if ARGV[4] == "1" then
+  local scraped = redis.call("GET", KEYS[2])
+  if scraped and scraped == (redis.call("GET", KEYS[3]) or "0") then
+    return {2, -1}
+  end
+end
+local added = redis.call("ZADD", KEYS[1], "NX", ARGV[2], ARGV[1])
+local outcome = 1
+if added == 1 then
+  outcome = 0
+end
+return {outcome, redis.call("ZRANK", KEYS[1], ARGV[1])}
+"""
+ROLL_NUMBER_QUEUED = 0
+ROLL_NUMBER_IN_PROGRESS = 1
+ROLL_NUMBER_RECENTLY_SCRAPED = 2
+
+
+def recently_scraped_key(roll_number: str) -> str:
+    return f"recently_scraped:{roll_number}"
+
+
+def scrapes_completed_key(minute: int) -> str:
+    return f"scrapes_completed:{minute}"
+
+
+async def _claim_roll_number(roll_number: str, force: bool) -> tuple[int, int | None]:
+    """Return the claim outcome and the roll number's position among queued scrapes."""
+    if not redisConnection.aio:
+        return ROLL_NUMBER_QUEUED, None
+    try:
+        outcome, rank = await redisConnection.aio.eval(
+            CLAIM_ROLL_NUMBER_SCRIPT,
+            3,
+            RABBITMQ_ROLL_NUMBERS,
+            recently_scraped_key(roll_number),
+            RESULTS_RELEASE_GENERATION_KEY,
+            roll_number,
+            time.time(),
+            SCRAPE_IN_FLIGHT_SECONDS,
+            "0" if force else "1",
+        )
+        return int(outcome), (None if int(rank) < 0 else int(rank))
+    except Exception as error:
+        # Deduplication is an optimisation; publish as before without Redis.
+        rabbitmq_logger.warning(f"Unable to claim {roll_number}: {error}")
+        return ROLL_NUMBER_QUEUED, None
+
+
+async def _release_roll_number(roll_number: str) -> None:
+    if redisConnection.aio:
+        try:
+            await redisConnection.aio.zrem(RABBITMQ_ROLL_NUMBERS, roll_number)
+        except Exception as error:
+            rabbitmq_logger.warning(f"Unable to release {roll_number}: {error}")
+
+
+async def _estimate_wait_seconds(position: int | None) -> int | None:
+    """Estimate from the scrapes workers completed in the last full minute."""
+    if position is None or not redisConnection.aio:
+        return None
+    try:
+        completed = await redisConnection.aio.get(
+            scrapes_completed_key(int(time.time() // 60) - 1)
+        )
+    except Exception:
+        return None
+    per_second = int(completed or 0) / 60
+    return round((position + 1) / per_second) if per_second else None
+
+
+async def _queue_status(position: int | None) -> dict:
+    return {
+        "position": None if position is None else position + 1,
+        "etaSeconds": await _estimate_wait_seconds(position),
+    }
+
 
 async def publish_class_results_message(app: FastAPI, roll_number: str) -> bool:
     """Publish a class-results request to its dedicated RabbitMQ queue."""
-    async with app.state.rabbitmq_connection.channel() as channel:
-        queue = await channel.declare_queue(CLASS_RESULTS_QUEUE_NAME, durable=True)
-        message_count = queue.declaration_result.message_count
-        if message_count >= CLASS_RESULTS_QUEUE_MAX_MESSAGES:
-            rabbitmq_logger.warning(
-                f"Skipping {roll_number}; queue {CLASS_RESULTS_QUEUE_NAME} "
-                f"already has {message_count} messages"
-            )
-            return False
-
-        await channel.default_exchange.publish(
-            aio_pika.Message(body=roll_number.encode()),
-            routing_key=CLASS_RESULTS_QUEUE_NAME,
+    publisher = app.state.rabbitmq_publisher
+    message_count = publisher.queue_depth(CLASS_RESULTS_QUEUE_NAME)
+    if message_count >= CLASS_RESULTS_QUEUE_MAX_MESSAGES:
+        rabbitmq_logger.warning(
+            f"Skipping {roll_number}; queue {CLASS_RESULTS_QUEUE_NAME} "
+            f"already has {message_count} messages"
         )
+        return False
+
+    await publisher.publish(
+        CLASS_RESULTS_QUEUE_NAME, aio_pika.Message(body=roll_number.encode())
+    )
     rabbitmq_logger.info(
         f"Published {roll_number} to queue: {CLASS_RESULTS_QUEUE_NAME}"
     )
     return True
 
 
+async def publish_incremental_results_messages(
+    connection: aio_pika.abc.AbstractConnection, work_items: list[dict]
+) -> int:
+    """Publish incremental exam-code work items to their dedicated queue."""
+    if not work_items:
+        return 0
+    async with connection.channel() as channel:
+        await channel.declare_queue(INCREMENTAL_RESULTS_QUEUE_NAME, durable=True)
+        for work_item in work_items:
+            await channel.default_exchange.publish(
+                aio_pika.Message(
+                    body=json.dumps(work_item).encode(),
+                    content_type="application/json",
+                    delivery_mode=aio_pika.DeliveryMode.PERSISTENT,
+                ),
+                routing_key=INCREMENTAL_RESULTS_QUEUE_NAME,
+            )
+    rabbitmq_logger.info(
+        f"Published {len(work_items)} work items to queue: "
+        f"{INCREMENTAL_RESULTS_QUEUE_NAME}"
+    )
+    return len(work_items)
+
+
 async def publish_message(
     app: FastAPI,
     rollNo: str,
+    force: bool = False,
+    lane: str = INTERACTIVE,
 ):
-    """Publishes a message (roll number) to the RabbitMQ queue."""
+    """Publishes a message (roll number) to its lane's RabbitMQ queue.
+
+    Students waiting on a scrape use the `INTERACTIVE` lane. Hard refreshes and
+    freshness scrapes for students who already got an answer use `REFRESH`.
+
+    A roll number already queued or being scraped is not queued again, and one
+    scraped since the latest result release is not rescraped unless `force`
+    is set (hard refresh). Queued and in-progress answers carry the queue
+    position and an ETA.
+    """
 
     try:
-        if redisConnection.client:
-            url = check_valid_url_in_redis()
+        if redisConnection.aio:
+            url = await check_valid_url_in_redis()
 
             if url == ".":
                 return JSONResponse(
@@ -54,25 +194,40 @@ async def publish_message(
                     },
                 )
 
-        async with app.state.rabbitmq_connection.channel() as channel:
-            queue = await channel.declare_queue(QUEUE_NAME, durable=True)
-
-            message_count = queue.declaration_result.message_count
-            if message_count > RABBITMQ_MAX_MESSAGES:
-                rabbitmq_logger.warning("Server had execced the threshold level")
+        position = None
+        if rollNo != NOTIFICATIONS_REDIS_KEY:
+            outcome, position = await _claim_roll_number(rollNo, force)
+            # A recent scrape stored the student's results, so a later read
+            # finds them; answer as for a scrape in progress.
+            if outcome in (ROLL_NUMBER_IN_PROGRESS, ROLL_NUMBER_RECENTLY_SCRAPED):
                 return JSONResponse(
-                    status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                    status_code=status.HTTP_202_ACCEPTED,
                     content={
-                        "status": "failure",
-                        "message": "Server cannot handle the requests currently, please try again later",
+                        "status": "success",
+                        "message": "Your roll number is already being processed.",
+                        **await _queue_status(position),
                     },
                 )
 
-            await channel.default_exchange.publish(
-                aio_pika.Message(body=rollNo.encode()),
-                routing_key=QUEUE_NAME,
+        publisher = app.state.rabbitmq_publisher
+        queue_name = LANE_QUEUES[lane]
+        if publisher.queue_depth(queue_name) > LANE_MAX_MESSAGES[lane]:
+            rabbitmq_logger.warning("Server had execced the threshold level")
+            await _release_roll_number(rollNo)
+            return JSONResponse(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                content={
+                    "status": "failure",
+                    "message": "Server cannot handle the requests currently, please try again later",
+                },
             )
 
+        try:
+            await publisher.publish(queue_name, aio_pika.Message(body=rollNo.encode()))
+        except Exception:
+            await _release_roll_number(rollNo)
+            raise
+
         if rollNo == NOTIFICATIONS_REDIS_KEY:
             return {"status": "success", "message": "Notifications are been fetched"}
 
@@ -81,6 +236,7 @@ async def publish_message(
             content={
                 "status": "success",
                 "message": "Your roll number has been queued.",
+                **await _queue_status(position),
             },
         )
 
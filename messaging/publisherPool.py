@@ -0,0 +1,111 @@
+"""Long-lived RabbitMQ channels and cached queue depths for the API.
+
+Opening a channel and declaring a queue on every request just to read its
+depth costs several AMQP round trips on the hottest path. `PublisherPool`
+opens `RABBITMQ_PUBLISHER_CHANNELS` robust channels with publisher confirms
+once, lends them to publishers one at a time, and keeps each queue's depth in
+memory. A background task re-declares the queues every
+`QUEUE_DEPTH_REFRESH_SECONDS` to refresh the depths, and each publish adds one
+to its queue's reading in between, so backpressure checks read a number
+instead of asking the broker.
+"""
+
+import asyncio
+
+import aio_pika
+from prometheus_client import Gauge
+
+from config.settings import (
+    CLASS_RESULTS_QUEUE_NAME,
+    QUEUE_DEPTH_REFRESH_SECONDS,
+    QUEUE_NAME,
+    RABBITMQ_PUBLISHER_CHANNELS,
+    REFRESH_RESULTS_QUEUE_NAME,
+)
+from utils.logger import rabbitmq_logger
+
+QUEUE_DEPTH = Gauge(
+    "rabbitmq_queue_depth",
+    "Messages ready in each queue at the publisher pool's last refresh.",
+    ["queue"],
+)
+
+
+class PublisherPool:
+    """A fixed set of publishing channels plus periodically refreshed queue depths."""
+
+    def __init__(
+        self,
+        connection: aio_pika.abc.AbstractConnection,
+        size: int = RABBITMQ_PUBLISHER_CHANNELS,
+        refresh_seconds: float = QUEUE_DEPTH_REFRESH_SECONDS,
+        queue_names: tuple[str, ...] = (
+            QUEUE_NAME,
+            REFRESH_RESULTS_QUEUE_NAME,
+            CLASS_RESULTS_QUEUE_NAME,
+        ),
+    ):
+        self._connection = connection
+        self.size = size
+        self.refresh_seconds = refresh_seconds
+        self.queue_names = queue_names
+        self._channels: asyncio.Queue = asyncio.Queue()
+        self._depths: dict[str, int] = {}
+        self._monitor = None
+        self._refresh_task: asyncio.Task | None = None
+
+    async def start(self) -> None:
+        """Open the channels, take a first depth reading and start refreshing."""
+        self._monitor = await self._connection.channel(publisher_confirms=False)
+        await self.refresh_depths()
+        for _ in range(self.size):
+            self._channels.put_nowait(await self._connection.channel())
+        self._refresh_task = asyncio.create_task(
+            self._refresh_periodically(), name="queue-depth-refresh"
+        )
+        rabbitmq_logger.info(f"Publisher pool opened ({self.size} channels)")
+
+    async def refresh_depths(self) -> None:
+        for name in self.queue_names:
+            queue = await self._monitor.declare_queue(name, durable=True)
+            self._depths[name] = queue.declaration_result.message_count
+            QUEUE_DEPTH.labels(name).set(self._depths[name])
+
+    async def _refresh_periodically(self) -> None:
+        while True:
+            await asyncio.sleep(self.refresh_seconds)
+            try:
+                await self.refresh_depths()
+            except asyncio.CancelledError:
+                raise
+            except Exception as error:
+                # Keep serving the last readings until the broker answers again.
+                rabbitmq_logger.warning(f"Unable to refresh queue depths: {error}")
+
+    def queue_depth(self, queue_name: str) -> int:
+        """Return the queue's last known depth plus messages published since."""
+        return self._depths.get(queue_name, 0)
+
+    async def publish(self, routing_key: str, message: aio_pika.Message) -> None:
+        """Publish on a pooled channel and wait for the broker's confirm."""
+        channel = await self._channels.get()
+        try:
+            if channel.is_closed:
+                channel = await self._connection.channel()
+            await channel.default_exchange.publish(message, routing_key=routing_key)
+        finally:
+            self._channels.put_nowait(channel)
+        self._depths[routing_key] = self._depths.get(routing_key, 0) + 1
+
+    async def close(self) -> None:
+        if self._refresh_task is not None:
+            self._refresh_task.cancel()
+            try:
+                await self._refresh_task
+            except asyncio.CancelledError:
+                pass
+        while not self._channels.empty():
+            await self._channels.get_nowait().close()
+        if self._monitor is not None:
+            await self._monitor.close()
+        rabbitmq_logger.info("Publisher pool closed")
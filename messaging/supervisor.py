@@ -0,0 +1,342 @@
+"""Run the result worker as several consumer processes.
+
+A single worker process parses pages and writes to PostgreSQL on one core, and
+each of its consumer loops works on one message at a time. `WorkerSupervisor`
+runs between `WORKER_MIN_PROCESSES` and `WORKER_MAX_PROCESSES` copies of
+`consume_messages`, each a spawned process with its own event loop,
+connections and HTTP pool. The upstream governor and circuit breaker live in
+Redis, so more processes never mean more load on JNTUH than the configured
+limits.
+
+Every `WORKER_SCALE_INTERVAL_SECONDS` the supervisor reads the queue depths and
+the upstream health and resizes the pool with `desired_processes`. Background
+messages a process is still working on count towards the backlog, and the pool
+shrinks only by retiring processes that hold no message. It serves
+the queue lag, the process counts and each process's throughput and
+utilisation on `WORKER_METRICS_PORT`; each process serves its own scraper
+metrics on the ports after it (slot 0 on `WORKER_METRICS_PORT + 1`, and so on).
+"""
+
+import asyncio
+import math
+import multiprocessing
+import signal
+import time
+from dataclasses import dataclass
+
+import aio_pika
+from prometheus_client import Gauge, start_http_server
+
+from config.redisConnection import redisConnection
+from config.settings import (
+    CLASS_RESULTS_QUEUE_NAME,
+    INCREMENTAL_RESULTS_QUEUE_NAME,
+    QUEUE_NAME,
+    RABBITMQ_URL,
+    REFRESH_RESULTS_QUEUE_NAME,
+    WORKER_BACKLOG_PER_PROCESS,
+    WORKER_MAX_PROCESSES,
+    WORKER_METRICS_PORT,
+    WORKER_MIN_PROCESSES,
+    WORKER_SCALE_INTERVAL_SECONDS,
+)
+from messaging.consumer import consume_messages
+from messaging.publisherPool import PublisherPool
+from messaging.workerStats import CONSUMER_LOOPS, workerStats
+from scrapers.retryScheduler import upstreamCircuitBreaker
+from scrapers.serverChecker import check_valid_url_in_redis
+from utils.logger import rabbitmq_logger
+
+# Seconds a retiring process gets to finish its current messages after SIGTERM;
+# then it is killed and the unfinished ones go back to the queue.
+WORKER_STOP_TIMEOUT_SECONDS = 30
+
+ROLL_NUMBER_QUEUES = (QUEUE_NAME, REFRESH_RESULTS_QUEUE_NAME)
+BACKGROUND_QUEUES = (CLASS_RESULTS_QUEUE_NAME, INCREMENTAL_RESULTS_QUEUE_NAME)
+
+WORKER_PROCESSES = Gauge("worker_processes", "Consumer processes running.")
+WORKER_PROCESSES_DESIRED = Gauge(
+    "worker_processes_desired",
+    "Consumer processes the queue backlog and upstream health call for, "
+    "before the WORKER_MAX_PROCESSES cap.",
+)
+WORKER_QUEUE_LAG_SECONDS = Gauge(
+    "worker_queue_lag_seconds",
+    "Waiting roll numbers divided by the workers' current throughput.",
+)
+WORKER_UPSTREAM_HEALTHY = Gauge(
+    "worker_upstream_healthy",
+    "1 while the JNTUH servers are reachable and the circuit breaker is closed.",
+)
+WORKER_PROCESS_THROUGHPUT = Gauge(
+    "worker_process_messages_per_second",
+    "Messages each consumer process finished per second over the last interval.",
+    ["slot"],
+)
+WORKER_PROCESS_UTILISATION = Gauge(
+    "worker_process_utilisation",
+    "Share of the last interval each process's consumer loops spent working.",
+    ["slot"],
+)
+
+
+def wanted_processes(
+    roll_number_backlog: int,
+    background_backlog: int,
+    upstream_healthy: bool,
+    minimum: int = WORKER_MIN_PROCESSES,
+    backlog_per_process: int = WORKER_BACKLOG_PER_PROCESS,
+) -> int:
+    """Return how many processes the backlog calls for, without an upper cap."""
+    if not upstream_healthy:
+        # Scrapes would only wait out the breaker, so extra processes sit idle.
+        return minimum
+    # Background messages are long sweeps; each deserves its own process.
+    return max(
+        minimum,
+        math.ceil(roll_number_backlog / backlog_per_process) + background_backlog,
+    )
+
+
+def desired_processes(
+    wanted: int,
+    current: int,
+    minimum: int = WORKER_MIN_PROCESSES,
+    maximum: int = WORKER_MAX_PROCESSES,
+) -> int:
+    """Return how many processes to run next.
+
+    The pool grows to the wanted size at once but shrinks by one process per
+    interval, so the tail of a burst does not stop and start processes.
+    """
+    wanted = max(minimum, min(max(minimum, maximum), wanted))
+    if wanted >= current:
+        return wanted
+    return current - 1
+
+
+async def upstream_is_healthy() -> bool:
+    return not await upstreamCircuitBreaker.is_open() and (
+        await check_valid_url_in_redis() != "."
+    )
+
+
+def _run_worker(
+    slot: int, processed, busy_seconds, in_flight, background_in_flight
+) -> None:
+    """Entry point of a spawned consumer process."""
+    workerStats.attach(processed, busy_seconds, in_flight, background_in_flight)
+    metrics_port = WORKER_METRICS_PORT + 1 + slot if WORKER_METRICS_PORT else 0
+
+    async def main():
+        # SIGTERM stops the consumers; the process exits once the messages in
+        # hand are finished.
+        stopping = asyncio.Event()
+        asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, stopping.set)
+        await consume_messages(metrics_port, stopping)
+
+    asyncio.run(main())
+
+
+@dataclass
+class _Worker:
+    process: multiprocessing.Process
+    processed: object
+    busy_seconds: object
+    in_flight: object
+    background_in_flight: object
+    last_processed: int = 0
+    last_busy_seconds: float = 0.0
+
+
+class WorkerSupervisor:
+    def __init__(
+        self,
+        minimum: int = WORKER_MIN_PROCESSES,
+        maximum: int = WORKER_MAX_PROCESSES,
+        interval: float = WORKER_SCALE_INTERVAL_SECONDS,
+        context=None,
+    ):
+        self.minimum = minimum
+        self.maximum = max(minimum, maximum)
+        self.interval = interval
+        self._context = context or multiprocessing.get_context("spawn")
+        self._workers: dict[int, _Worker] = {}
+        self._last_report = time.monotonic()
+
+    @property
+    def size(self) -> int:
+        return len(self._workers)
+
+    def _start(self, slot: int) -> None:
+        processed = self._context.RawValue("q", 0)
+        busy_seconds = self._context.RawValue("d", 0.0)
+        in_flight = self._context.RawValue("q", 0)
+        background_in_flight = self._context.RawValue("q", 0)
+        process = self._context.Process(
+            target=_run_worker,
+            args=(slot, processed, busy_seconds, in_flight, background_in_flight),
+            name=f"result-worker-{slot}",
+            daemon=False,
+        )
+        process.start()
+        self._workers[slot] = _Worker(
+            process, processed, busy_seconds, in_flight, background_in_flight
+        )
+        WORKER_PROCESS_THROUGHPUT.labels(str(slot)).set(0)
+        WORKER_PROCESS_UTILISATION.labels(str(slot)).set(0)
+        rabbitmq_logger.info(f"Started worker process {slot} (pid {process.pid})")
+
+    async def _stop(self, slots: list[int]) -> None:
+        workers = [self._workers.pop(slot) for slot in slots]
+        for slot, worker in zip(slots, workers):
+            WORKER_PROCESS_THROUGHPUT.remove(str(slot))
+            WORKER_PROCESS_UTILISATION.remove(str(slot))
+            worker.process.terminate()
+        deadline = time.monotonic() + WORKER_STOP_TIMEOUT_SECONDS
+        for slot, worker in zip(slots, workers):
+            await asyncio.to_thread(
+                worker.process.join, max(deadline - time.monotonic(), 0)
+            )
+            if worker.process.is_alive():
+                worker.process.kill()
+            rabbitmq_logger.info(f"Stopped worker process {slot}")
+
+    def restart_exited(self) -> None:
+        """Replace processes that exited on their own."""
+        for slot, worker in list(self._workers.items()):
+            if not worker.process.is_alive():
+                rabbitmq_logger.warning(
+                    f"Worker process {slot} exited with code "
+                    f"{worker.process.exitcode}; restarting it"
+                )
+                self._start(slot)
+
+    async def scale_to(self, processes: int) -> None:
+        """Start the lowest free slots or stop the highest idle ones.
+
+        A process working on a message is not stopped unless `processes` is 0,
+        so the pool may stay larger until a later call finds it idle.
+        """
+        slot = 0
+        while self.size < processes:
+            if slot not in self._workers:
+                self._start(slot)
+            slot += 1
+        if self.size > processes:
+            retiring = sorted(
+                (
+                    slot
+                    for slot, worker in self._workers.items()
+                    if not processes or not worker.in_flight.value
+                ),
+                reverse=True,
+            )[: self.size - processes]
+            if retiring:
+                await self._stop(retiring)
+        WORKER_PROCESSES.set(self.size)
+
+    def background_in_flight(self) -> int:
+        """Background messages the processes have taken and not yet finished."""
+        return sum(
+            worker.background_in_flight.value for worker in self._workers.values()
+        )
+
+    def report(self) -> float:
+        """Export each process's throughput and utilisation since the last call.
+
+        Returns the throughput of all processes together.
+        """
+        now = time.monotonic()
+        elapsed = max(now - self._last_report, 1e-9)
+        self._last_report = now
+        total = 0.0
+        for slot, worker in self._workers.items():
+            processed = worker.processed.value
+            busy_seconds = worker.busy_seconds.value
+            throughput = max(processed - worker.last_processed, 0) / elapsed
+            utilisation = max(busy_seconds - worker.last_busy_seconds, 0.0) / (
+                elapsed * CONSUMER_LOOPS
+            )
+            worker.last_processed = processed
+            worker.last_busy_seconds = busy_seconds
+            WORKER_PROCESS_THROUGHPUT.labels(str(slot)).set(throughput)
+            WORKER_PROCESS_UTILISATION.labels(str(slot)).set(min(utilisation, 1.0))
+            total += throughput
+        return total
+
+    async def tick(self, depths: PublisherPool) -> None:
+        self.restart_exited()
+        throughput = self.report()
+        roll_number_backlog = sum(map(depths.queue_depth, ROLL_NUMBER_QUEUES))
+        # Queue depths count only ready messages, not the sweeps running now.
+        background_backlog = (
+            sum(map(depths.queue_depth, BACKGROUND_QUEUES))
+            + self.background_in_flight()
+        )
+        healthy = await upstream_is_healthy()
+        WORKER_UPSTREAM_HEALTHY.set(int(healthy))
+        if throughput:
+            WORKER_QUEUE_LAG_SECONDS.set(roll_number_backlog / throughput)
+        elif not roll_number_backlog:
+            WORKER_QUEUE_LAG_SECONDS.set(0)
+
+        wanted = wanted_processes(
+            roll_number_backlog, background_backlog, healthy, self.minimum
+        )
+        # Uncapped, so it can drive scaling containers once one is at its maximum.
+        WORKER_PROCESSES_DESIRED.set(wanted)
+        processes = desired_processes(wanted, self.size, self.minimum, self.maximum)
+        if processes != self.size:
+            rabbitmq_logger.info(
+                f"Scaling worker processes from {self.size} to {processes} "
+                f"(backlog {roll_number_backlog}+{background_backlog}, "
+                f"upstream {'up' if healthy else 'down'})"
+            )
+            await self.scale_to(processes)
+
+    async def run(self) -> None:
+        redisConnection.connect()
+        if WORKER_METRICS_PORT:
+            start_http_server(WORKER_METRICS_PORT)
+            rabbitmq_logger.info(
+                f"Worker supervisor metrics exposed on port {WORKER_METRICS_PORT}"
+            )
+
+        connection = await aio_pika.connect_robust(RABBITMQ_URL)
+        # Only the pool's depth readings are used; it opens no publishing channels.
+        depths = PublisherPool(
+            connection,
+            size=0,
+            refresh_seconds=self.interval,
+            queue_names=ROLL_NUMBER_QUEUES + BACKGROUND_QUEUES,
+        )
+        try:
+            await depths.start()
+            await self.scale_to(self.minimum)
+            while True:
+                await asyncio.sleep(self.interval)
+                try:
+                    await self.tick(depths)
+                except asyncio.CancelledError:
+                    raise
+                except Exception as error:
+                    rabbitmq_logger.warning(f"Worker supervisor tick failed: {error}")
+        finally:
+            await self.scale_to(0)
+            await depths.close()
+            await connection.close()
+            rabbitmq_logger.info("Worker supervisor stopped")
+
+
+def run_supervisor() -> None:
+    async def main():
+        asyncio.get_running_loop().add_signal_handler(
+            signal.SIGTERM, asyncio.current_task().cancel
+        )
+        try:
+            await WorkerSupervisor().run()
+        except asyncio.CancelledError:
+            pass
+
+    asyncio.run(main())
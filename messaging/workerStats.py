@@ -0,0 +1,57 @@
+"""Throughput and busy time of one worker process.
+
+The consumer loops record every message they finish in `workerStats`. Under
+the worker supervisor each process is handed two shared-memory counters at
+start-up, so the supervisor can read every process's throughput and
+utilisation without asking it, and see which processes are working on a
+message right now and how many background sweeps they hold. A worker
+started on its own keeps the counters to itself.
+"""
+
+import multiprocessing
+import time
+from contextlib import contextmanager
+
+# The interactive, refresh, class-results and incremental-results loops each
+# work on one message (or one batch) at a time.
+CONSUMER_LOOPS = 4
+
+
+class WorkerStats:
+    def __init__(self):
+        self.processed = multiprocessing.RawValue("q", 0)
+        self.busy_seconds = multiprocessing.RawValue("d", 0.0)
+        self.in_flight = multiprocessing.RawValue("q", 0)
+        self.background_in_flight = multiprocessing.RawValue("q", 0)
+
+    def attach(
+        self, processed, busy_seconds, in_flight, background_in_flight
+    ) -> None:
+        """Record into counters the supervisor shares with this process."""
+        self.processed = processed
+        self.busy_seconds = busy_seconds
+        self.in_flight = in_flight
+        self.background_in_flight = background_in_flight
+
+    @contextmanager
+    def track(self, messages: int = 1, background: bool = False):
+        """Count `messages` as processed and the time inside as busy.
+
+        While inside, the messages also count as in flight, and as background
+        work when they come from the class-results or incremental queue.
+        """
+        started = time.monotonic()
+        self.in_flight.value += messages
+        if background:
+            self.background_in_flight.value += messages
+        try:
+            yield
+        finally:
+            self.busy_seconds.value += time.monotonic() - started
+            self.processed.value += messages
+            self.in_flight.value -= messages
+            if background:
+                self.background_in_flight.value -= messages
+
+
+workerStats = WorkerStats()
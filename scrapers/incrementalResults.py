@@ -0,0 +1,141 @@
+"""Plan compact scrape work items for newly released exam codes.
+
+When `refresh_notifications` stores new `examcodes` rows, each release becomes a
+handful of work items shaped like `{"examCode", "semesterCode", "rcrv",
+"degree", "prefixes"}` instead of a full re-scrape of every student. The
+prefixes are the class prefixes the release can apply to:
+
+- a regular or supplementary release goes to cohorts of the same degree and
+  regulation that already have marks in that semester or the one before it;
+- an RCRV release goes only to cohorts with a regular attempt at the exam code.
+
+Cohorts with no marks yet (a new batch's first results) are not covered here;
+their first request or class sweep scrapes them in full.
+
+Before those cohort items, a release is warmed up for subscribed students: the
+roll numbers in `result_device_subscriptions` and `anon_push_subscriptions`
+that match the release's degree and regulation and still lack the exam code
+become work items carrying `"rollNumbers"` instead of `"prefixes"`, most
+subscribed first. Their results are cached as soon as they are saved, so the
+students who were notified find them hot.
+"""
+
+from config.settings import (
+    INCREMENTAL_PREFIXES_PER_MESSAGE,
+    WARMUP_MAX_STUDENTS,
+    WARMUP_ROLL_NUMBERS_PER_MESSAGE,
+)
+from database.operations import (
+    get_exam_code_cohort_prefixes,
+    get_semester_cohort_prefixes,
+    get_subscribed_roll_numbers,
+)
+from scrapers.resultScraper import ResultScraper
+from utils.logger import scraping_logger
+
+SEMESTERS = ["1-1", "1-2", "2-1", "2-2", "3-1", "3-2", "4-1", "4-2"]
+DEGREE_CODES = {
+    "btech": "A",
+    "bpharmacy": "R",
+    "mba": "E",
+    "mtech": "D",
+    "mpharmacy": "S",
+}
+
+
+def _prefix_regulation(class_prefix: str) -> str:
+    return ResultScraper(f"{class_prefix}01", [], [])._determine_regulation()
+
+
+async def _release_prefixes(exam: dict) -> list[str]:
+    if exam["rcrv"]:
+        return await get_exam_code_cohort_prefixes(exam["examCode"])
+
+    semester_code = exam["semesterCode"]
+    semester_codes = [semester_code]
+    if semester_code in SEMESTERS[1:]:
+        semester_codes.append(SEMESTERS[SEMESTERS.index(semester_code) - 1])
+    prefixes = await get_semester_cohort_prefixes(
+        DEGREE_CODES[exam["degree"]], semester_codes
+    )
+    return [
+        prefix
+        for prefix in prefixes
+        if _prefix_regulation(prefix) in exam["regulation"]
+    ]
+
+
+async def _warmup_roll_numbers(exam: dict) -> list[str]:
+    if not WARMUP_MAX_STUDENTS:
+        return []
+    roll_numbers = await get_subscribed_roll_numbers(
+        DEGREE_CODES[exam["degree"]],
+        exam["examCode"],
+        exam["rcrv"],
+        WARMUP_MAX_STUDENTS,
+    )
+    return [
+        roll_number
+        for roll_number in roll_numbers
+        if _prefix_regulation(roll_number[:8]) in exam["regulation"]
+    ]
+
+
+def _chunked_work_items(exam: dict, key: str, values: list[str], size: int):
+    return [
+        {
+            "examCode": exam["examCode"],
+            "semesterCode": exam["semesterCode"],
+            "rcrv": exam["rcrv"],
+            "degree": exam["degree"],
+            key: values[start : start + size],
+        }
+        for start in range(0, len(values), size)
+    ]
+
+
+def _is_targetable(exam: dict) -> bool:
+    return bool(
+        exam.get("examCode")
+        and exam.get("semesterCode")
+        and exam.get("regulation")
+        and exam.get("degree") in DEGREE_CODES
+    )
+
+
+async def plan_incremental_work_items(new_exams: list[dict]) -> list[dict]:
+    """Plan warm-up items for every release, followed by the cohort items."""
+    warmup_items = []
+    cohort_items = []
+    for exam in new_exams:
+        if not _is_targetable(exam):
+            scraping_logger.info(
+                f"No incremental scrape for {exam.get('title')}; release is not targetable"
+            )
+            continue
+
+        try:
+            roll_numbers = await _warmup_roll_numbers(exam)
+        except Exception as error:
+            scraping_logger.warning(
+                f"Unable to plan warm-up for {exam['examCode']}: {error}"
+            )
+            roll_numbers = []
+        warmup_items.extend(
+            _chunked_work_items(
+                exam, "rollNumbers", roll_numbers, WARMUP_ROLL_NUMBERS_PER_MESSAGE
+            )
+        )
+
+        prefixes = await _release_prefixes(exam)
+        cohort_items.extend(
+            _chunked_work_items(
+                exam, "prefixes", prefixes, INCREMENTAL_PREFIXES_PER_MESSAGE
+            )
+        )
+        scraping_logger.info(
+            f"Planned incremental scrape of {exam['examCode']} "
+            f"(rcrv={exam['rcrv']}) for {len(roll_numbers)} subscribed students "
+            f"and {len(prefixes)} cohorts"
+        )
+    return warmup_items + cohort_items
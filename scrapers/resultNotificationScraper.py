@@ -7,8 +7,11 @@ from config.redisConnection import redisConnection
 from config.settings import (
     NOTIFICATIONS_EXPIRY_TIME,
     NOTIFICATIONS_REDIS_KEY,
+    RESULTS_RELEASE_GENERATION_KEY,
 )
 from database.operations import save_exam_codes
+from messaging.publisher import publish_incremental_results_messages
+from scrapers.incrementalResults import plan_incremental_work_items
 from subscriptions.mobile_notification import broadcast_result_notifications
 from utils.helpers import send_telegram_notification
 from utils.logger import logger
@@ -210,8 +213,12 @@ def get_exam_codes(results):
     return results
 
 
-async def refresh_notifications():
-    """Fetches, parses, and caches JNTUH notifications."""
+async def refresh_notifications(connection=None):
+    """Fetches, parses, and caches JNTUH notifications.
+
+    With a RabbitMQ `connection`, newly stored exam codes are also published as
+    incremental scrape work items.
+    """
     try:
         tables = fetch_results()
         if not tables:
@@ -230,15 +237,24 @@ async def refresh_notifications():
 
         new_exams = await save_exam_codes(results)
         if new_exams:
+            # Reopen roll numbers scraped before this release for rescraping.
+            if redisConnection.aio:
+                await redisConnection.aio.incr(RESULTS_RELEASE_GENERATION_KEY)
             send_telegram_notification(new_exams)
             await broadcast_result_notifications(new_exams)
+            if connection is not None:
+                try:
+                    work_items = await plan_incremental_work_items(new_exams)
+                    await publish_incremental_results_messages(connection, work_items)
+                except Exception as error:
+                    logger.error(f"Unable to publish incremental scrapes: {error}")
 
     except Exception as e:
         logger.info(f"Error while fetching notifications:{e}")
 
 
-async def refresh_notifications_periodically(interval_seconds=60):
+async def refresh_notifications_periodically(interval_seconds=60, connection=None):
     """Refresh result notifications continuously at the configured interval."""
     while True:
-        await refresh_notifications()
+        await refresh_notifications(connection)
         await asyncio.sleep(interval_seconds)
@@ -0,0 +1,123 @@
+"""Single-pass lxml parser for JNTUH result pages, run off the event loop.
+
+`parse_result_page` mirrors the BeautifulSoup walk `ResultScraper` used to do:
+the first two `<table>` elements in document order are the details and marks
+tables, rows and cells are matched at any depth, and text is the concatenation
+of every descendant text node. Each row's cells are collected once instead of
+once per field. libxml2 releases the GIL while it parses, so a small thread
+pool keeps the worker's event loop responsive while a large scrape is parsed.
+"""
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+from lxml import html as lxml_html
+
+from config.settings import RESULT_PARSER_WORKERS
+from utils.logger import scraping_logger
+
+MARK_COLUMNS = (
+    ("subjectInternal", "INTERNAL"),
+    ("subjectExternal", "EXTERNAL"),
+    ("subjectTotal", "TOTAL"),
+)
+
+
+def _text(element) -> str:
+    return "".join(element.itertext())
+
+
+def _cells(row) -> list[str]:
+    return [_text(cell) for cell in row.iter("td")]
+
+
+def parse_result_page(page: str) -> dict:
+    """Parse one result page into details, subjects and the RCRV flag.
+
+    Returns a dict with `details` (None when the details table is unreadable),
+    `subjects` (None when the marks table has no rows), `rcrv` and `error`.
+    A page with an `error` must be retried; its details are still reported
+    because the previous parser kept them.
+    """
+    page_result = {"details": None, "subjects": None, "rcrv": False, "error": None}
+    try:
+        # Parse bytes with a fixed encoding: lxml rejects str input that
+        # carries an XML encoding declaration, and aiohttp has already decoded.
+        document = lxml_html.document_fromstring(
+            page.encode("utf-8"), parser=lxml_html.HTMLParser(encoding="utf-8")
+        )
+        tables = list(document.iter("table"))
+        details_table, results_table = tables[:2]
+
+        details = list(details_table.iter("tr"))
+        htno_and_name = _cells(details[0])
+        father_name_and_college_code = _cells(details[1])
+        page_result["details"] = {
+            "name": htno_and_name[3],
+            "rollNo": htno_and_name[1],
+            "collegeCode": father_name_and_college_code[3],
+            "fatherName": father_name_and_college_code[1],
+        }
+
+        rows = list(results_table.iter("tr"))
+        if not rows:
+            return page_result
+        columns = [_text(bold) for bold in rows[0].iter("b")]
+        grade_index = columns.index("GRADE")
+        subject_name_index = columns.index("SUBJECT NAME")
+        subject_code_index = columns.index("SUBJECT CODE")
+        subject_credits_index = columns.index("CREDITS(C)")
+        # Pages without a marks column fall back to index -1, which reads the
+        # last cell; later columns stay at -1 once one is missing.
+        mark_indexes = []
+        for position, (key, column) in enumerate(MARK_COLUMNS):
+            if column not in columns:
+                mark_indexes.extend(
+                    (missing_key, -1) for missing_key, _ in MARK_COLUMNS[position:]
+                )
+                break
+            mark_indexes.append((key, columns.index(column)))
+
+        subjects = []
+        rcrv = False
+        for row in rows[1:]:
+            cells = _cells(row)
+            if "Change in Grade" in cells[-1]:
+                rcrv = True
+            subject = {
+                "subjectCode": cells[subject_code_index],
+                "subjectName": cells[subject_name_index],
+                "subjectGrade": cells[grade_index],
+                "subjectCredits": cells[subject_credits_index],
+            }
+            try:
+                for key, index in mark_indexes:
+                    subject[key] = cells[index]
+            except IndexError as error:
+                scraping_logger.error(
+                    f"Error extracting marks for {subject['subjectCode']}: {error}"
+                )
+            subjects.append(subject)
+
+        page_result["subjects"] = subjects
+        page_result["rcrv"] = rcrv
+    except Exception as error:
+        page_result["error"] = str(error) or type(error).__name__
+    return page_result
+
+
+_executor: ThreadPoolExecutor | None = None
+
+
+def _parser_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=RESULT_PARSER_WORKERS, thread_name_prefix="result-parser"
+        )
+    return _executor
+
+
+async def parse_result_page_async(page: str) -> dict:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_parser_executor(), parse_result_page, page)
@@ -1,9 +1,14 @@
 # Import necessary libraries
 import asyncio
+from contextlib import asynccontextmanager
 from itertools import chain
 import aiohttp
-from bs4 import BeautifulSoup, Tag
+from config.httpConnection import httpConnection
 from data.examCodes import load_exam_codes
+from scrapers.resultParser import parse_result_page_async
+from scrapers.retryScheduler import RetryScheduler, upstreamCircuitBreaker
+from scrapers.serverChecker import choose_host
+from scrapers.upstreamGovernor import upstreamGovernor
 from utils.logger import scraping_logger
 
 
@@ -15,15 +20,19 @@ class ResultScraper:
         omit_exam_codes,
         omit_rcrv_exam_codes,
         url="http://results.jntuh.ac.in/resultAction",
+        hosts=None,
     ):
         # Initialize instance variables
         self.url = url
+        # Healthy hosts from `get_upstream_hosts`; each request picks one.
+        self.hosts = hosts
         self.roll_number = roll_number
         self.results = {"details": {}, "results": []}
         self.exam_code_results = []
         self.failed_exam_codes = []
         self.omit_exam_codes = omit_exam_codes
         self.omit_rcrv_exam_codes = omit_rcrv_exam_codes
+        self.retry_scheduler = RetryScheduler()
         self.grades_to_gpa = {
             "O": 10,
             "A+": 9,
@@ -74,6 +83,16 @@ class ResultScraper:
             ],
         }
 
+    @asynccontextmanager
+    async def _client_session(self):
+        # The worker owns one pooled session for its lifetime; ad-hoc callers
+        # without it (scripts, benchmarks) get a short-lived session instead.
+        if httpConnection.session is not None and not httpConnection.session.closed:
+            yield httpConnection.session
+            return
+        async with aiohttp.ClientSession() as session:
+            yield session
+
     async def fetch_result(self, session, exam_code, payload):
         payloaddata = "?&examCode=" + exam_code + payload + self.roll_number
         headers = {
@@ -81,104 +100,32 @@ class ResultScraper:
             "Content-Type": "application/x-www-form-urlencoded",
             "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8,application/signed-exchange;v=b3;q=0.9",
         }
-        async with session.get(
-            self.url + payloaddata, ssl=False, headers=headers, timeout=5
-        ) as response:
-            return await response.text()
-
-    def scrape_results(self, semester_code, response):
-        try:
-            soup = BeautifulSoup(response, "lxml")
-            table = soup.find_all("table")
-            details_table, results_table = table[:2]
-
-            if not isinstance(details_table, Tag) or not isinstance(results_table, Tag):
-                return
-            details = details_table.find_all("tr")
-            htnoAndName = details[0]
-            fatherNameAndCollegeCode = details[1]
-            if not isinstance(fatherNameAndCollegeCode, Tag) or not isinstance(
-                htnoAndName, Tag
-            ):
-                return
-            htno = htnoAndName.find_all("td")[1].get_text()
-            name = htnoAndName.find_all("td")[3].get_text()
-
-            fatherName = fatherNameAndCollegeCode.find_all("td")[1].get_text()
-            collegeCode = fatherNameAndCollegeCode.find_all("td")[3].get_text()
-
-            self.results["details"] = {
-                "name": name,
-                "rollNo": htno,
-                "collegeCode": collegeCode,
-                "fatherName": fatherName,
-            }
-
-            results = results_table.find_all("tr")
-            if not results:
-                return
-            column_results = results[0]
-            if not isinstance(column_results, Tag):
-                return
-            columns = [content.text for content in column_results.find_all("b")]
-            grade_index = columns.index("GRADE")
-            subject_name_index = columns.index("SUBJECT NAME")
-            subject_code_index = columns.index("SUBJECT CODE")
-            subject_credits_index = columns.index("CREDITS(C)")
-            subject_internal_marks_index = -1
-            subject_external_marks_index = -1
-            subject_total_marks_index = -1
-
-            try:
-                subject_internal_marks_index = columns.index("INTERNAL")
-                subject_external_marks_index = columns.index("EXTERNAL")
-                subject_total_marks_index = columns.index("TOTAL")
-            except ValueError:
-                pass
-
-            subjects = []
-            rcrv = False
-            for row in results[1:]:
-                if not isinstance(row, Tag):
-                    return
-                if "Change in Grade" in row.find_all("td")[-1].get_text():
-                    rcrv = True
-                subject_code = row.find_all("td")[subject_code_index].get_text()
-
-                result = {
-                    "subjectCode": subject_code,
-                    "subjectName": row.find_all("td")[subject_name_index].get_text(),
-                    "subjectGrade": row.find_all("td")[grade_index].get_text(),
-                    "subjectCredits": row.find_all("td")[
-                        subject_credits_index
-                    ].get_text(),
-                }
-                result["subjectCode"] = subject_code
+        timeout = aiohttp.ClientTimeout(
+            total=self.retry_scheduler.request_timeout(exam_code)
+        )
+        url = choose_host(self.hosts) if self.hosts else self.url
+        async with upstreamGovernor.slot(url):
+            async with session.get(
+                url + payloaddata, ssl=False, headers=headers, timeout=timeout
+            ) as response:
+                return await response.text()
 
-                try:
-                    result["subjectInternal"] = row.find_all("td")[
-                        subject_internal_marks_index
-                    ].get_text()
-                    result["subjectExternal"] = row.find_all("td")[
-                        subject_external_marks_index
-                    ].get_text()
-                    result["subjectTotal"] = row.find_all("td")[
-                        subject_total_marks_index
-                    ].get_text()
-
-                except Exception as e:
-                    self.logger.error(
-                        f"Error extracting results for {self.roll_number}: {e}"
-                    )
-                subjects.append(result)
+    async def scrape_results(self, semester_code, response):
+        page = await parse_result_page_async(response)
+        if page["details"] is not None:
+            self.results["details"] = page["details"]
+        if page["error"] is not None:
+            self.failed_exam_codes.append(semester_code)
+            return
+        if page["subjects"] is not None:
             self.exam_code_results.append(
-                {"examCode": semester_code, "subjects": subjects, "rcrv": rcrv}
+                {
+                    "examCode": semester_code,
+                    "subjects": page["subjects"],
+                    "rcrv": page["rcrv"],
+                }
             )
 
-        except Exception:
-            self.failed_exam_codes.append(semester_code)
-            # self.logger.error(f"Error processing results for {self.roll_number}: {e}")
-
     def _determine_degree(self):
         degree_map = {
             "A": "btech",
@@ -221,7 +168,8 @@ class ResultScraper:
         if degree is None:
             return
 
-        exam_codes = await load_exam_codes(degree, self._determine_regulation())
+        # The map is shared through the in-process cache, so trim a copy.
+        exam_codes = dict(await load_exam_codes(degree, self._determine_regulation()))
 
         if self.roll_number[4] == "5":
             exam_codes.pop("1-1", None)
@@ -231,7 +179,7 @@ class ResultScraper:
         codes_to_fetch = failed_exam_codes if failed_exam_codes else flattened_list
         payloads = self.payloads[degree]
         try:
-            async with aiohttp.ClientSession() as session:
+            async with self._client_session() as session:
                 for code in codes_to_fetch:
                     tasks[code] = []
                     if code not in self.omit_exam_codes:
@@ -255,21 +203,36 @@ class ResultScraper:
                                 f"Error calling the api for {self.roll_number}:{e}"
                             )
 
+                # The breaker counts the requests sent, not the exam codes:
+                # omitted codes send none, and an exam code sends up to two.
+                requests = failures = 0
                 for exam_code, exam_tasks in tasks.items():
+                    responses = await asyncio.gather(
+                        *exam_tasks, return_exceptions=True
+                    )
+                    errors = [
+                        response
+                        for response in responses
+                        if isinstance(response, BaseException)
+                    ]
+                    requests += len(responses)
+                    failures += len(errors)
                     try:
-                        responses = await asyncio.gather(*exam_tasks)
+                        if errors:
+                            raise errors[0]
                         for response in responses:
                             if (
                                 "Enter HallTicket Number" not in response
                                 and "SUBJECT CODE" in response
                                 # and "Internal Server Error" not in response
                             ):
-                                self.scrape_results(exam_code, response)
+                                await self.scrape_results(exam_code, response)
                     except Exception as e:
                         self.logger.error(
                             f"Error fetching resultgs for {exam_code}: {e}"
                         )
                         self.failed_exam_codes.append(exam_code)
+                await upstreamCircuitBreaker.record(requests - failures, failures)
                 for exam_result in self.exam_code_results:
                     exam_code = exam_result["examCode"]
                     for semester, codes in exam_codes.items():
@@ -282,23 +245,105 @@ class ResultScraper:
                 f"Something unexpecting has happend while scraping results: {e}"
             )
 
+    async def probe(self, exam_code):
+        """Check one exam code to learn whether this roll number exists.
+
+        Returns False only when the upstream shows its "not found" form, and
+        None when it could not answer or sent a page that is neither a result
+        nor that form (a busy page, a truncated body), so callers fall back to
+        a full scrape instead of treating the roll number as missing.
+        """
+        degree = self._determine_degree()
+        if degree is None:
+            return None
+        try:
+            async with self._client_session() as session:
+                response = await self.fetch_result(
+                    session, exam_code, self.payloads[degree][0]
+                )
+        except Exception as e:
+            self.logger.warning(f"Probe failed for {self.roll_number}: {e}")
+            await upstreamCircuitBreaker.record(0, 1)
+            return None
+        await upstreamCircuitBreaker.record(1, 0)
+        if "Enter HallTicket Number" in response:
+            return False
+        if "SUBJECT CODE" in response:
+            return True
+        return None
+
+    async def scrape_exam_code(self, exam_code, semester_code, rcrv=False):
+        """Fetch a single exam code, retrying with backoff like `run`.
+
+        Returns the usual results dict (with no results when the student has
+        none for this exam code), or None when the upstream never answered.
+        """
+        degree = self._determine_degree()
+        if degree is None:
+            return None
+        payload = self.payloads[degree][1 if rcrv else 0]
+
+        while True:
+            try:
+                async with self._client_session() as session:
+                    response = await self.fetch_result(session, exam_code, payload)
+                await upstreamCircuitBreaker.record(1, 0)
+                if "Enter HallTicket Number" in response or "SUBJECT CODE" not in response:
+                    return self.results
+                await self.scrape_results(exam_code, response)
+                if not self.failed_exam_codes:
+                    for exam_result in self.exam_code_results:
+                        exam_result["semesterCode"] = semester_code
+                    self.results["results"] = self.exam_code_results
+                    return self.results
+                self.failed_exam_codes = []
+            except Exception as e:
+                self.logger.error(
+                    f"Error fetching {exam_code} for {self.roll_number}: {e}"
+                )
+                await upstreamCircuitBreaker.record(0, 1)
+
+            if self.retry_scheduler.schedule([exam_code]):
+                return None
+            if await upstreamCircuitBreaker.is_open():
+                return None
+            await asyncio.sleep(self.retry_scheduler.next_delay())
+            self.retry_scheduler.pop_due()
+
     async def run(self):
         try:
             await self.scrape_all_results()
             retries = 0
-            while self.failed_exam_codes and retries < 15:
+            while self.failed_exam_codes or self.retry_scheduler.pending:
+                if self.failed_exam_codes:
+                    exhausted = self.retry_scheduler.schedule(
+                        dict.fromkeys(self.failed_exam_codes)
+                    )
+                    self.failed_exam_codes = []
+                    if exhausted:
+                        scraping_logger.info(
+                            f"The roll_number {self.roll_number} has exhausted its "
+                            f"retries for {len(exhausted)} exam codes"
+                        )
+                        return None
+                if await upstreamCircuitBreaker.is_open():
+                    scraping_logger.info(
+                        f"Abandoning retries for {self.roll_number}; "
+                        "upstream circuit breaker is open"
+                    )
+                    return None
+
+                await asyncio.sleep(self.retry_scheduler.next_delay())
+                due_codes = self.retry_scheduler.pop_due()
+                if not due_codes:
+                    # An empty list would make scrape_all_results fetch everything.
+                    continue
                 retries += 1
-                failed_codes = list(set(self.failed_exam_codes))
-                self.failed_exam_codes = []
                 scraping_logger.info(
-                    f"The roll_number {self.roll_number} has failed to get the exam codes of len {len(self.failed_exam_codes)} retrying again in {retries}"
+                    f"The roll_number {self.roll_number} is retrying "
+                    f"{len(due_codes)} exam codes (round {retries})"
                 )
-                await self.scrape_all_results(failed_codes)
-            if self.failed_exam_codes:
-                scraping_logger.info(
-                    f"The roll_number {self.roll_number} has failed to get the exam codes of len {len(self.failed_exam_codes)}"
-                )
-                return None
+                await self.scrape_all_results(due_codes)
             if retries:
                 scraping_logger.info(
                     f"Successfully extracted results fo {self.roll_number} in {retries + 1} attempts"
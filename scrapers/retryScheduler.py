@@ -0,0 +1,154 @@
+"""Backoff scheduling for failed exam codes and the shared upstream circuit breaker.
+
+`RetryScheduler` is per student: every failed exam code waits an exponentially
+growing, fully jittered delay before it is fetched again, and the student has a
+fixed budget of retried requests. `UpstreamCircuitBreaker` is shared by every
+worker through Redis: each scrape round reports its successes and failures into
+a fixed time window, and once the window's error rate crosses the threshold the
+breaker opens for a cooldown so all workers back off together.
+"""
+
+import random
+import time
+from collections.abc import Callable, Iterable
+
+from config.redisConnection import redisConnection
+from config.settings import (
+    SCRAPE_REQUEST_TIMEOUT_SECONDS,
+    SCRAPE_RETRY_BASE_SECONDS,
+    SCRAPE_RETRY_BUDGET,
+    SCRAPE_RETRY_MAX_ATTEMPTS,
+    SCRAPE_RETRY_MAX_SECONDS,
+    UPSTREAM_BREAKER_COOLDOWN_SECONDS,
+    UPSTREAM_BREAKER_ERROR_RATE,
+    UPSTREAM_BREAKER_MIN_REQUESTS,
+    UPSTREAM_BREAKER_WINDOW_SECONDS,
+)
+from utils.logger import scraping_logger
+
+
+class RetryScheduler:
+    def __init__(
+        self,
+        budget: int = SCRAPE_RETRY_BUDGET,
+        max_attempts: int = SCRAPE_RETRY_MAX_ATTEMPTS,
+        base_delay: float = SCRAPE_RETRY_BASE_SECONDS,
+        max_delay: float = SCRAPE_RETRY_MAX_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
+        jitter: Callable[[float, float], float] = random.uniform,
+    ):
+        self.budget = budget
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.clock = clock
+        self.jitter = jitter
+        self.attempts: dict[str, int] = {}
+        self.due: dict[str, float] = {}
+
+    @property
+    def pending(self) -> bool:
+        return bool(self.due)
+
+    def schedule(self, exam_codes: Iterable[str]) -> list[str]:
+        """Queue failed codes for another attempt; return the codes that cannot be."""
+        exhausted = []
+        now = self.clock()
+        for exam_code in exam_codes:
+            attempts = self.attempts.get(exam_code, 0) + 1
+            if attempts > self.max_attempts or self.budget <= 0:
+                exhausted.append(exam_code)
+                continue
+            self.budget -= 1
+            self.attempts[exam_code] = attempts
+            backoff = min(self.max_delay, self.base_delay * 2 ** (attempts - 1))
+            self.due[exam_code] = now + self.jitter(0, backoff)
+        return exhausted
+
+    def next_delay(self) -> float:
+        if not self.due:
+            return 0.0
+        return max(0.0, min(self.due.values()) - self.clock())
+
+    def pop_due(self) -> list[str]:
+        now = self.clock()
+        ready = [code for code, due in self.due.items() if due <= now]
+        for code in ready:
+            del self.due[code]
+        return ready
+
+    def request_timeout(self, exam_code: str) -> float:
+        """Give codes that already timed out more time on an overloaded server."""
+        attempts = self.attempts.get(exam_code, 0)
+        return SCRAPE_REQUEST_TIMEOUT_SECONDS * 2 ** min(attempts, 2)
+
+
+class UpstreamCircuitBreaker:
+    OPEN_KEY = "upstream_breaker:open"
+    REQUESTS_KEY = "upstream_breaker:requests"
+    ERRORS_KEY = "upstream_breaker:errors"
+
+    def __init__(
+        self,
+        error_rate: float = UPSTREAM_BREAKER_ERROR_RATE,
+        min_requests: int = UPSTREAM_BREAKER_MIN_REQUESTS,
+        window_seconds: int = UPSTREAM_BREAKER_WINDOW_SECONDS,
+        cooldown_seconds: int = UPSTREAM_BREAKER_COOLDOWN_SECONDS,
+    ):
+        self.error_rate = error_rate
+        self.min_requests = min_requests
+        self.window_seconds = window_seconds
+        self.cooldown_seconds = cooldown_seconds
+
+    async def is_open(self) -> bool:
+        if not redisConnection.aio:
+            return False
+        try:
+            return bool(await redisConnection.aio.exists(self.OPEN_KEY))
+        except Exception as error:
+            scraping_logger.warning(f"Circuit breaker state unavailable: {error}")
+            return False
+
+    async def record(self, successes: int, failures: int) -> None:
+        """Add one scrape round's outcome to the current window and trip if needed."""
+        if not redisConnection.aio or successes + failures == 0:
+            return
+
+        window = int(time.time() // self.window_seconds)
+        requests_key = f"{self.REQUESTS_KEY}:{window}"
+        errors_key = f"{self.ERRORS_KEY}:{window}"
+        try:
+            requests, _, errors, _ = await (
+                redisConnection.aio.pipeline()
+                .incrby(requests_key, successes + failures)
+                .expire(requests_key, self.window_seconds * 2)
+                .incrby(errors_key, failures)
+                .expire(errors_key, self.window_seconds * 2)
+                .execute()
+            )
+        except Exception as error:
+            scraping_logger.warning(f"Unable to record upstream outcome: {error}")
+            return
+
+        if (
+            failures
+            and requests >= self.min_requests
+            and errors / requests >= self.error_rate
+        ):
+            # NX keeps the first trip's cooldown instead of extending it on
+            # every failing round that lands while the breaker is open.
+            try:
+                opened = await redisConnection.aio.set(
+                    self.OPEN_KEY, "1", ex=self.cooldown_seconds, nx=True
+                )
+            except Exception as error:
+                scraping_logger.warning(f"Unable to open circuit breaker: {error}")
+                return
+            if opened:
+                scraping_logger.warning(
+                    f"Upstream circuit breaker opened for {self.cooldown_seconds}s: "
+                    f"{errors}/{requests} requests failed"
+                )
+
+
+upstreamCircuitBreaker = UpstreamCircuitBreaker()
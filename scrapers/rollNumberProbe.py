@@ -0,0 +1,103 @@
+"""Cheap existence checks that keep class sweeps from scraping empty roll numbers.
+
+A class sweep generates every possible suffix for a cohort, and most of them
+belong to nobody. Before a generated roll number is scraped across every exam
+code, it is probed with a single request for the exam code most of its cohort
+already has results for. Roll numbers already in the `student` table skip the
+probe. Roll numbers the probe finds missing are remembered in a Redis set, so
+later sweeps skip them without any request.
+"""
+
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+
+from config.redisConnection import redisConnection
+from config.settings import CLASS_RESULTS_GAP_EXPIRY_TIME
+from database.operations import get_cohort_probe_exam_code, get_cohort_roll_numbers
+from scrapers.resultScraper import ResultScraper
+from scrapers.serverChecker import get_upstream_hosts
+from utils.logger import scraping_logger
+
+
+@dataclass
+class ClassCohort:
+    prefix: str
+    known_roll_numbers: set[str] = field(default_factory=set)
+    gaps: set[str] = field(default_factory=set)
+    probe_exam_code: str | None = None
+
+
+def class_results_gaps_key(class_prefix: str) -> str:
+    return f"class_results_gaps:{class_prefix}"
+
+
+async def load_class_cohort(class_prefix: str) -> ClassCohort:
+    """Load what is already known about a cohort; unknowns just mean no pruning."""
+    cohort = ClassCohort(class_prefix)
+    try:
+        cohort.known_roll_numbers = await get_cohort_roll_numbers(class_prefix)
+        cohort.probe_exam_code = await get_cohort_probe_exam_code(class_prefix)
+    except Exception as error:
+        scraping_logger.warning(f"Unable to load cohort {class_prefix}: {error}")
+
+    if redisConnection.aio:
+        try:
+            cohort.gaps = {
+                member.decode() if isinstance(member, bytes) else member
+                for member in await redisConnection.aio.smembers(
+                    class_results_gaps_key(class_prefix)
+                )
+            }
+        except Exception as error:
+            scraping_logger.warning(f"Unable to load gaps for {class_prefix}: {error}")
+    # A roll number that has since been scraped is no longer a gap.
+    cohort.gaps -= cohort.known_roll_numbers
+    return cohort
+
+
+async def _record_gap(cohort: ClassCohort, roll_number: str) -> None:
+    cohort.gaps.add(roll_number)
+    if redisConnection.aio:
+        key = class_results_gaps_key(cohort.prefix)
+        try:
+            await (
+                redisConnection.aio.pipeline()
+                .sadd(key, roll_number)
+                .expire(key, CLASS_RESULTS_GAP_EXPIRY_TIME)
+                .execute()
+            )
+        except Exception as error:
+            scraping_logger.warning(f"Unable to record gap {roll_number}: {error}")
+
+
+async def scrape_class_roll_number(
+    roll_number: str,
+    cohort: ClassCohort,
+    process: Callable[[str], Awaitable[bool]],
+) -> bool:
+    """Scrape one generated roll number, probing first when it is not known."""
+    if roll_number in cohort.known_roll_numbers:
+        return await process(roll_number)
+    if roll_number in cohort.gaps:
+        return False
+
+    if cohort.probe_exam_code:
+        hosts = await get_upstream_hosts()
+        if hosts:
+            scraper = ResultScraper(roll_number, [], [], hosts=hosts)
+            exists = await scraper.probe(cohort.probe_exam_code)
+            if exists is False:
+                await _record_gap(cohort, roll_number)
+                return False
+
+    has_results = await process(roll_number)
+    if has_results and cohort.probe_exam_code is None:
+        # The first student found in a new cohort gives later roll numbers
+        # an exam code to probe with.
+        try:
+            cohort.probe_exam_code = await get_cohort_probe_exam_code(cohort.prefix)
+        except Exception as error:
+            scraping_logger.warning(
+                f"Unable to learn probe exam code for {cohort.prefix}: {error}"
+            )
+    return has_results
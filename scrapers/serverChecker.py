@@ -1,53 +1,213 @@
-import requests
-from config.settings import EXPIRY_TIME, FIVE_MINUTE_EXPIRY, REDIS_URL_KEY
-from utils.logger import scraping_logger
+"""Health of the JNTUH result hosts.
+
+Each worker runs `run_host_prober` in the background. Every
+`UPSTREAM_PROBE_INTERVAL_SECONDS` one worker process (whichever claims the
+round in Redis) requests a known result page from every host at once. It folds
+the latency and outcome into each host's moving averages and publishes the
+ranking under `UPSTREAM_HOSTS_KEY`. It also keeps `REDIS_URL_KEY` pointing at
+the best host, or at "." while every host is down, for the API's server status
+checks.
+
+Scrapes ask `get_upstream_hosts()` for the hosts that answered their last probe,
+and `choose_host()` spreads requests across them weighted by success rate over
+latency. A scrape never waits on a probe unless no ranking has been published.
+"""
+
+import asyncio
+import json
+import random
+import time
+from contextlib import asynccontextmanager
+
+import aiohttp
+from prometheus_client import Gauge
+
+from config.httpConnection import httpConnection
 from config.redisConnection import redisConnection
+from config.settings import (
+    REDIS_URL_KEY,
+    UPSTREAM_HOSTS_KEY,
+    UPSTREAM_PROBE_INTERVAL_SECONDS,
+    UPSTREAM_PROBE_TIMEOUT_SECONDS,
+)
+from utils.logger import scraping_logger
 
+RESULT_HOSTS = (
+    "http://results.jntuh.ac.in/results/resultAction",
+    "http://202.63.105.184/results/resultAction",
+)
+PROBE_QUERY = (
+    "?degree=btech&examCode=1323&etype=r16&result=null&grad=null"
+    "&type=intgrade&htno=18E51A0479"
+)
+PROBE_ROUND_KEY = f"{UPSTREAM_HOSTS_KEY}:probing"
+# A ranking not refreshed for three rounds is dropped, so scrapes probe again.
+UPSTREAM_HOSTS_EXPIRY_TIME = int(UPSTREAM_PROBE_INTERVAL_SECONDS * 3)
+# Weight of the newest probe in a host's moving latency and success rate.
+PROBE_SMOOTHING = 0.3
 
-def check_url():
-    urls = [
-        "http://results.jntuh.ac.in/results/resultAction?degree=btech&examCode=1323&etype=r16&result=null&grad=null&type=intgrade&htno=18E51A0479",
-        "http://202.63.105.184/results/resultAction?degree=btech&examCode=1323&etype=r16&result=null&grad=null&type=intgrade&htno=18E51A0479",
-    ]
+UPSTREAM_HOST_LATENCY = Gauge(
+    "scraper_upstream_host_latency_seconds",
+    "Moving average of each JNTUH host's probe latency.",
+    ["host"],
+)
+UPSTREAM_HOST_SUCCESS_RATE = Gauge(
+    "scraper_upstream_host_success_rate",
+    "Moving average of the share of probes each JNTUH host answered.",
+    ["host"],
+)
 
-    # Check Redis cache first
-    url = check_valid_url_in_redis()
+_probe_lock = asyncio.Lock()
 
-    if url is not None and url != ".":
-        return url
 
-    # Try each URL
-    for url in urls:
-        optimized_url = url.split("?")[0]
+def host_weight(host: dict) -> float:
+    """Share of requests a host should get: success rate over latency."""
+    if not host["up"]:
+        return 0.0
+    return host["successRate"] / max(host["latency"], 0.01)
 
-        try:
-            response = requests.get(url, timeout=5)
-            if response.status_code in {200, 201}:
-                scraping_logger.info(f"The URL {optimized_url} is working")
-
-                # Cache the result in Redis
-                if redisConnection.client:
-                    redisConnection.client.set(
-                        REDIS_URL_KEY, optimized_url, ex=EXPIRY_TIME
-                    )
-
-                return optimized_url  # Return the first working URL
-        except requests.exceptions.Timeout:
-            scraping_logger.warning(f"The URL {optimized_url} timed out")
-        except requests.exceptions.RequestException:
-            scraping_logger.warning(f"The URL {url} is not working")
-        except Exception:
-            scraping_logger.warning(f"The URL {url} is given an unexpected error")
-
-    if redisConnection.client:
-        redisConnection.client.set(REDIS_URL_KEY, ".", ex=FIVE_MINUTE_EXPIRY)
 
+def rank_hosts(previous: list[dict], latencies: dict[str, float | None]) -> list[dict]:
+    """Fold one probe round into each host's moving averages, best host first.
+
+    `latencies` maps each host to its probe latency, or None when it failed. A
+    failed probe counts as a timeout-long response.
+    """
+    previous_by_url = {host["url"]: host for host in previous}
+    hosts = []
+    for url, latency in latencies.items():
+        up = latency is not None
+        sample = latency if up else UPSTREAM_PROBE_TIMEOUT_SECONDS
+        before = previous_by_url.get(url)
+        if before is None:
+            average_latency, success_rate = sample, float(up)
+        else:
+            average_latency = before["latency"] + PROBE_SMOOTHING * (
+                sample - before["latency"]
+            )
+            success_rate = before["successRate"] + PROBE_SMOOTHING * (
+                float(up) - before["successRate"]
+            )
+        hosts.append(
+            {
+                "url": url,
+                "up": up,
+                "latency": round(average_latency, 4),
+                "successRate": round(success_rate, 4),
+            }
+        )
+    return sorted(hosts, key=host_weight, reverse=True)
+
+
+def choose_host(hosts: list[dict]) -> str:
+    """Pick one of the healthy `hosts` at random, weighted by `host_weight`."""
+    weights = [host_weight(host) for host in hosts]
+    return random.choices([host["url"] for host in hosts], weights=weights)[0]
+
+
+@asynccontextmanager
+async def _client_session():
+    if httpConnection.session is not None and not httpConnection.session.closed:
+        yield httpConnection.session
+        return
+    async with aiohttp.ClientSession() as session:
+        yield session
+
+
+async def _probe(session, url: str) -> float | None:
+    """Return how long `url` took to answer a result page, or None if it failed."""
+    started = time.monotonic()
+    try:
+        async with session.get(
+            url + PROBE_QUERY,
+            ssl=False,
+            timeout=aiohttp.ClientTimeout(total=UPSTREAM_PROBE_TIMEOUT_SECONDS),
+        ) as response:
+            await response.read()
+            if response.status in {200, 201}:
+                return time.monotonic() - started
+            scraping_logger.warning(f"The URL {url} answered {response.status}")
+    except asyncio.TimeoutError:
+        scraping_logger.warning(f"The URL {url} timed out")
+    except aiohttp.ClientError:
+        scraping_logger.warning(f"The URL {url} is not working")
+    except Exception:
+        scraping_logger.warning(f"The URL {url} is given an unexpected error")
     return None
 
 
-def check_valid_url_in_redis():
-    if redisConnection.client:
-        cached_url = redisConnection.client.get(REDIS_URL_KEY)
+async def _published_hosts() -> list[dict] | None:
+    if not redisConnection.aio:
+        return None
+    payload = await redisConnection.aio.get(UPSTREAM_HOSTS_KEY)
+    return json.loads(payload) if payload else None
+
+
+async def _publish(hosts: list[dict]) -> None:
+    for host in hosts:
+        UPSTREAM_HOST_LATENCY.labels(host["url"]).set(host["latency"])
+        UPSTREAM_HOST_SUCCESS_RATE.labels(host["url"]).set(host["successRate"])
+    if not redisConnection.aio:
+        return
+    best = hosts[0]["url"] if hosts and hosts[0]["up"] else "."
+    pipeline = redisConnection.aio.pipeline()
+    pipeline.set(UPSTREAM_HOSTS_KEY, json.dumps(hosts), ex=UPSTREAM_HOSTS_EXPIRY_TIME)
+    pipeline.set(REDIS_URL_KEY, best, ex=UPSTREAM_HOSTS_EXPIRY_TIME)
+    await pipeline.execute()
+
+
+async def probe_hosts() -> list[dict]:
+    """Probe every host once, concurrently, and publish the new ranking."""
+    async with _client_session() as session:
+        latencies = await asyncio.gather(
+            *(_probe(session, url) for url in RESULT_HOSTS)
+        )
+    hosts = rank_hosts(
+        await _published_hosts() or [], dict(zip(RESULT_HOSTS, latencies))
+    )
+    await _publish(hosts)
+    return hosts
+
+
+async def get_upstream_hosts() -> list[dict]:
+    """Return the hosts that answered their last probe, best first.
+
+    Only when no ranking is published (a cold start, or the prober stopped for
+    three rounds) does the caller probe, once per process at a time.
+    """
+    hosts = await _published_hosts()
+    if hosts is None:
+        async with _probe_lock:
+            hosts = await _published_hosts() or await probe_hosts()
+    return [host for host in hosts if host["up"]]
+
+
+async def _claim_probe_round(interval: float) -> bool:
+    if not redisConnection.aio:
+        return True
+    return bool(
+        await redisConnection.aio.set(
+            PROBE_ROUND_KEY, "1", nx=True, px=int(interval * 1000)
+        )
+    )
+
+
+async def run_host_prober(interval: float = UPSTREAM_PROBE_INTERVAL_SECONDS) -> None:
+    """Probe the hosts every `interval`; one worker process probes per round."""
+    while True:
+        try:
+            if await _claim_probe_round(interval):
+                await probe_hosts()
+        except asyncio.CancelledError:
+            raise
+        except Exception as error:
+            scraping_logger.warning(f"Upstream host probe failed: {error}")
+        await asyncio.sleep(interval)
+
+
+async def check_valid_url_in_redis():
+    if redisConnection.aio:
+        cached_url = await redisConnection.aio.get(REDIS_URL_KEY)
         if cached_url is not None:
             cached_url = (
                 cached_url.decode("utf-8")
@@ -0,0 +1,178 @@
+"""Redis-backed rate and concurrency limits shared by every scrape worker.
+
+Each upstream host has a token bucket (requests per second with a burst) and a
+set of concurrency leases. A single Lua script checks both atomically, so every
+worker container, queue consumer and class sweep draws from the same budget.
+The limits are read from the `upstream_governor:limits` hash on every acquire,
+which lets an operator retune a live fleet with `HSET`. Missing fields fall back
+to the `UPSTREAM_*` settings.
+
+Requests from the refresh and background lanes (`messaging.lanes.scrape_lane`)
+stop short of the limits: they leave their lane's headroom of the concurrency
+and of the burst for higher lanes, so a student waiting on a scrape does not
+queue behind a class sweep.
+
+When Redis is unavailable the governor lets requests through rather than
+stalling every scrape.
+"""
+
+import asyncio
+import inspect
+import random
+import time
+import uuid
+from contextlib import asynccontextmanager
+from urllib.parse import urlsplit
+
+from prometheus_client import Histogram
+
+from config.redisConnection import redisConnection
+from config.settings import (
+    UPSTREAM_BURST,
+    UPSTREAM_LEASE_SECONDS,
+    UPSTREAM_MAX_CONCURRENCY,
+    UPSTREAM_RATE_PER_SECOND,
+)
+from messaging.lanes import LANE_HEADROOM, scrape_lane
+from utils.logger import scraping_logger
+
+# KEYS: token bucket hash, lease sorted set, limits hash
+# ARGV: default rate, default burst, default concurrency, lease id, lease ms,
+#       share of concurrency and burst left for higher lanes
+# Returns 0 once a slot is taken, otherwise the milliseconds to wait.
+ACQUIRE_SCRIPT = """
+local limits = redis.call('HMGET', KEYS[3], 'rate', 'burst', 'concurrency')
+local rate = tonumber(limits[1]) or tonumber(ARGV[1])
+local burst = tonumber(limits[2]) or tonumber(ARGV[2])
+local concurrency = tonumber(limits[3]) or tonumber(ARGV[3])
+local lease_ms = tonumber(ARGV[5])
+local headroom = tonumber(ARGV[6]) or 0
+local lane_concurrency = math.max(1, math.floor(concurrency * (1 - headroom)))
+local reserve = math.min(burst * headroom, burst - 1)
+
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) * 1000 + math.floor(tonumber(clock[2]) / 1000)
+
+redis.call('ZREMRANGEBYSCORE', KEYS[2], '-inf', now)
+if redis.call('ZCARD', KEYS[2]) >= lane_concurrency then
+    local oldest = redis.call('ZRANGE', KEYS[2], 0, 0, 'WITHSCORES')
+    return math.max(1, math.min(250, tonumber(oldest[2]) - now))
+end
+
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(bucket[1]) or burst
+local last = tonumber(bucket[2]) or now
+tokens = math.min(burst, tokens + (now - last) * rate / 1000)
+if tokens < 1 + reserve then
+    return math.max(1, math.ceil((1 + reserve - tokens) * 1000 / rate))
+end
+
+redis.call('HSET', KEYS[1], 'tokens', tokens - 1, 'ts', now)
+redis.call('PEXPIRE', KEYS[1], math.ceil(burst * 1000 / rate) + 1000)
+redis.call('ZADD', KEYS[2], now + lease_ms, ARGV[4])
+redis.call('PEXPIRE', KEYS[2], lease_ms)
+return 0
+"""
+
+UPSTREAM_GOVERNOR_WAIT = Histogram(
+    "scraper_upstream_governor_wait_seconds",
+    "Time a result request waited for an upstream rate or concurrency slot.",
+    buckets=(0, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30),
+)
+
+
+class UpstreamGovernor:
+    LIMITS_KEY = "upstream_governor:limits"
+
+    def __init__(
+        self,
+        rate: float = UPSTREAM_RATE_PER_SECOND,
+        burst: int = UPSTREAM_BURST,
+        concurrency: int = UPSTREAM_MAX_CONCURRENCY,
+        lease_seconds: int = UPSTREAM_LEASE_SECONDS,
+    ):
+        self.rate = rate
+        self.burst = burst
+        self.concurrency = concurrency
+        self.lease_seconds = lease_seconds
+        self._script = None
+        self._script_client = None
+
+    def _acquire_script(self, client):
+        if self._script is None or self._script_client is not client:
+            self._script = client.register_script(ACQUIRE_SCRIPT)
+            self._script_client = client
+        return self._script
+
+    async def set_limits(self, rate=None, burst=None, concurrency=None) -> None:
+        """Change the fleet-wide limits; workers pick them up on their next acquire."""
+        limits = {
+            field: value
+            for field, value in (
+                ("rate", rate),
+                ("burst", burst),
+                ("concurrency", concurrency),
+            )
+            if value is not None
+        }
+        if limits and redisConnection.aio:
+            await redisConnection.aio.hset(self.LIMITS_KEY, mapping=limits)
+
+    async def acquire(self, host: str) -> str | None:
+        """Wait for a slot on `host` and return its lease id (None when unmanaged)."""
+        # The script runs on the asyncio pool, or on the blocking client before
+        # `connect()` has created the pool.
+        client = redisConnection.async_client or redisConnection.client
+        if not client:
+            return None
+
+        lease = uuid.uuid4().hex
+        keys = [
+            f"upstream_governor:{host}:tokens",
+            f"upstream_governor:{host}:leases",
+            self.LIMITS_KEY,
+        ]
+        args = [
+            self.rate,
+            self.burst,
+            self.concurrency,
+            lease,
+            self.lease_seconds * 1000,
+            LANE_HEADROOM[scrape_lane.get()],
+        ]
+        started = time.monotonic()
+        while True:
+            try:
+                wait_ms = self._acquire_script(client)(keys=keys, args=args)
+                if inspect.isawaitable(wait_ms):
+                    wait_ms = await wait_ms
+                wait_ms = int(wait_ms)
+            except Exception as error:
+                scraping_logger.warning(f"Upstream governor unavailable: {error}")
+                return None
+            if wait_ms <= 0:
+                UPSTREAM_GOVERNOR_WAIT.observe(time.monotonic() - started)
+                return lease
+            # Spread the retries so waiting workers do not poll in lockstep.
+            await asyncio.sleep(wait_ms / 1000 * random.uniform(1, 1.5))
+
+    async def release(self, host: str, lease: str | None) -> None:
+        if lease is None or not redisConnection.aio:
+            return
+        try:
+            await redisConnection.aio.zrem(f"upstream_governor:{host}:leases", lease)
+        except Exception as error:
+            # The lease expires on its own after UPSTREAM_LEASE_SECONDS.
+            scraping_logger.warning(f"Unable to release upstream lease: {error}")
+
+    @asynccontextmanager
+    async def slot(self, url: str):
+        host = urlsplit(url).netloc or url
+        lease = await self.acquire(host)
+        try:
+            yield
+        finally:
+            await self.release(host, lease)
+
+
+upstreamGovernor = UpstreamGovernor()
@@ -2,26 +2,23 @@
 
 Both endpoints rebuild the flat DB rows into the nested tree shape the web frontend
 already renders, and cache the built tree in Redis for `CONTENT_EXPIRY_TIME` seconds
-(the content changes rarely). See `prisma/seed.py` for how the tables are populated.
+(the content changes rarely), with a short-lived in-process copy in front of it. See `prisma/seed.py` for how the tables are populated.
 """
 
-import json
-
 from config.connection import prismaConnection
-from config.redisConnection import redisConnection
 from config.settings import (
     CALENDARS_REDIS_KEY,
     CONTENT_EXPIRY_TIME,
     SYLLABUS_REDIS_KEY,
 )
+from utils.caching import get_cached_bytes, json_response, set_cached_bytes
 
 
 async def getCalendars():
     """Return calendars as `{ academicYear: { degree: { studyYear: { title: link } } } }`."""
-    if redisConnection.client:
-        cached = redisConnection.client.get(CALENDARS_REDIS_KEY)
-        if cached:
-            return json.loads(cached)  # pyright: ignore
+    cached = await get_cached_bytes(CALENDARS_REDIS_KEY)
+    if cached:
+        return json_response(cached)
 
     rows = await prismaConnection.prisma.academiccalendar.find_many(
         order=[
@@ -39,11 +36,9 @@ async def getCalendars():
             .setdefault(r.studyYear, {})
         )[r.title] = r.link
 
-    if redisConnection.client:
-        redisConnection.client.set(
-            CALENDARS_REDIS_KEY, json.dumps(tree), ex=CONTENT_EXPIRY_TIME
-        )
-    return tree
+    return json_response(
+        await set_cached_bytes(CALENDARS_REDIS_KEY, tree, CONTENT_EXPIRY_TIME)
+    )
 
 
 async def getSyllabus():
@@ -52,10 +47,9 @@ async def getSyllabus():
     Rows with an empty regulation collapse to `{ degree: { category: [...] } }` — the
     frontend's tree walker handles the variable depth transparently.
     """
-    if redisConnection.client:
-        cached = redisConnection.client.get(SYLLABUS_REDIS_KEY)
-        if cached:
-            return json.loads(cached)  # pyright: ignore
+    cached = await get_cached_bytes(SYLLABUS_REDIS_KEY)
+    if cached:
+        return json_response(cached)
 
     rows = await prismaConnection.prisma.syllabus.find_many(
         order=[
@@ -73,8 +67,6 @@ async def getSyllabus():
             node = node.setdefault(r.regulation, {})
         node.setdefault(r.category, []).append({"title": r.title, "link": r.link})
 
-    if redisConnection.client:
-        redisConnection.client.set(
-            SYLLABUS_REDIS_KEY, json.dumps(tree), ex=CONTENT_EXPIRY_TIME
-        )
-    return tree
+    return json_response(
+        await set_cached_bytes(SYLLABUS_REDIS_KEY, tree, CONTENT_EXPIRY_TIME)
+    )
@@ -1,10 +1,9 @@
-import json
-from config.redisConnection import getRedisKeyValue, redisConnection
 from config.settings import EXPIRY_TIME
-from database.models import studentAllResultsModel, studentDetailsModel
-from database.operations import get_details
+from database.operations import get_result_view
 from fastapi import FastAPI
 from messaging.publisher import publish_message
+from utils.caching import get_cached_bytes, json_response, set_cached_bytes
+from utils.singleFlight import single_flight
 
 
 async def fetch_all_results(app: FastAPI, roll_number: str):
@@ -17,7 +16,8 @@ async def fetch_all_results(app: FastAPI, roll_number: str):
 
     Do NOT use this for SGPA / CGPA or the effective mark sheet — call
     `fetch_results` (the consolidated view) for that. See `studentAllResultsModel`
-    in database/models.py for the exact response shape.
+    in database/models.py for the exact response shape; the history is read
+    from the student's stored `resultview` row.
 
     Caching: Redis key `<rollNo>ALL` for `EXPIRY_TIME` seconds. On cache+DB miss the
     scrape is queued via RabbitMQ (`publish_message`) and a pending response is
@@ -26,21 +26,19 @@ async def fetch_all_results(app: FastAPI, roll_number: str):
 
     roll_all_key = f"{roll_number}ALL"
 
-    response = getRedisKeyValue(roll_all_key)
+    response = await get_cached_bytes(roll_all_key)
     if response is not None:
-        return json.loads(response)  # pyright: ignore
+        return json_response(response)
 
-    response = await get_details(roll_number)
+    async def rebuild():
+        view = await get_result_view(roll_number)
 
-    if response:
-        studentDetail, marks = response
-        result = {
-            "details": studentDetailsModel(studentDetail),
-            "results": studentAllResultsModel(marks),
-        }
-        if redisConnection.client:
-            redisConnection.client.set(roll_all_key, json.dumps(result), ex=EXPIRY_TIME)
+        if view:
+            result = {"details": view["details"], "results": view["allResults"]}
+            return json_response(
+                await set_cached_bytes(roll_all_key, result, EXPIRY_TIME)
+            )
 
-        return result
+        return await publish_message(app, roll_number)
 
-    return await publish_message(app, roll_number)
+    return await single_flight(roll_all_key, rebuild)
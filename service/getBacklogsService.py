@@ -1,14 +1,9 @@
-import json
 from fastapi import FastAPI
-from config.redisConnection import getRedisKeyValue, redisConnection
 from config.settings import EXPIRY_TIME
-from database.models import (
-    studentBacklogs,
-    studentDetailsModel,
-)
-from database.operations import get_details
+from database.operations import get_result_view
 from messaging.publisher import publish_message
-from utils.helpers import isbpharmacyr22
+from utils.caching import get_cached_bytes, json_response, set_cached_bytes
+from utils.singleFlight import single_flight
 
 
 async def fetch_backlogs(app: FastAPI, roll_number: str):
@@ -23,30 +18,26 @@ async def fetch_backlogs(app: FastAPI, roll_number: str):
     `grace_marks_service.check_eligibility` (which uses the backlog list as input
     to decide grace eligibility). Honors B.Pharm R22 grading via `isbpharmacyr22`.
 
-    Caching: Redis key `<rollNo>Backlogs` for `EXPIRY_TIME` seconds; queues a
-    scrape via `publish_message` on cache+DB miss.
+    The summary is computed when marks are written and read from the
+    student's `resultview` row. Caching: Redis key `<rollNo>Backlogs` for
+    `EXPIRY_TIME` seconds; queues a scrape via `publish_message` on cache+DB
+    miss.
     """
 
     roll_backlogs_key = f"{roll_number}Backlogs"
 
-    response = getRedisKeyValue(roll_backlogs_key)
+    response = await get_cached_bytes(roll_backlogs_key)
     if response is not None:
-        return json.loads(response)  # pyright: ignore
-
-    response = await get_details(roll_number)
-    if response:
-        student, marks = response
-        details = studentDetailsModel(student)
-        result = {
-            "details": details,
-            "results": studentBacklogs(marks, isbpharmacyr22(details["rollNumber"])),
-        }
-
-        if redisConnection.client:
-            redisConnection.client.set(
-                roll_backlogs_key, json.dumps(result), ex=EXPIRY_TIME
+        return json_response(response)
+
+    async def rebuild():
+        view = await get_result_view(roll_number)
+        if view:
+            result = {"details": view["details"], "results": view["backlogs"]}
+            return json_response(
+                await set_cached_bytes(roll_backlogs_key, result, EXPIRY_TIME)
             )
 
-        return result
+        return await publish_message(app, roll_number)
 
-    return await publish_message(app, roll_number)
+    return await single_flight(roll_backlogs_key, rebuild)
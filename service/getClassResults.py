@@ -1,23 +1,120 @@
-import json
 import time
+from uuid import uuid4
+
+import orjson
 from fastapi import FastAPI, status
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 from config.redisConnection import redisConnection
 from config.settings import QUEUE_NAME, RABBITMQ_CLASS_PUBLISH_MAX_MESSAGES
 from utils.logger import logger
-from utils.helpers import isbpharmacyr22
-from database.models import (
-    studentAllResultsModel,
-    studentBacklogs,
-    studentDetailsModel,
-    studentResultsModel,
-)
-from database.operations import get_students_details
+from database.operations import get_class_result_views, iter_class_result_views
 from config.settings import RABBITMQ_CLASS_MAX_MESSAGES
+from messaging.classResults import class_results_progress_key, get_class_prefixes
 from messaging.publisher import publish_class_results_message
+from utils.caching import encode, json_response
+from utils.compression import compress, decompress, stream_compressor
+from utils.singleFlight import single_flight
+
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+def calculate_alt_roll_number(roll_number: str) -> str:
+    if roll_number[4] != "5" and roll_number[5] == "A":
+        first_two = str(int(roll_number[0:2]) + 1).zfill(2)
+        return first_two + roll_number[2:4] + "5" + roll_number[5:8]
+    else:
+        first_two = str(int(roll_number[0:2]) - 1).zfill(2)
+        return first_two + roll_number[2:4] + "1" + roll_number[5:8]
+
+
+def class_result(view: dict, type: str) -> dict:
+    """One student's entry in the class response, from their stored view."""
+    result = {"details": view["details"], "results": []}
+    if view["markCount"]:
+        if type == "academicresult":
+            result["results"] = view["results"]
+        elif type == "allresult":
+            result["results"] = view["allResults"]
+        elif type == "backlog":
+            result["results"] = view["backlogs"]
+    return result
+
+
+async def _publish_class_refresh(app: FastAPI, roll_number: str):
+    publisher = app.state.rabbitmq_publisher
+    if publisher.queue_depth(QUEUE_NAME) >= RABBITMQ_CLASS_PUBLISH_MAX_MESSAGES:
+        return
+    try:
+        await publish_class_results_message(app, roll_number)
+    except Exception as error:
+        # The new background class scrape must not break the existing
+        # database-backed class-results response.
+        logger.error(
+            f"Failed to publish class results request for {roll_number}: {error}"
+        )
+
+
+async def _stream_class_results(
+    app: FastAPI, roll_number: str, type: str, roll_results_key: str, cached_data
+):
+    """Yield the class response one student per line, a chunk of students at a time.
+
+    A cached response is replayed line by line. Otherwise each chunk from
+    `iter_class_result_views` is sent as soon as it is built and appended to
+    a temporary Redis key, which becomes `<class>Results+<type>` once the
+    last chunk is in, so the stream fills the same cache the JSON mode reads.
+    The cached copy is compressed chunk by chunk into one gzip stream as it
+    is appended. A stream that is cut short leaves no cache entry behind.
+    """
+    if cached_data:
+        for result in orjson.loads(decompress(cached_data)):
+            yield encode(result) + b"\n"
+        return
+
+    start_time = time.perf_counter()
+    building_key = f"{roll_results_key}:building:{uuid4().hex}"
+    compressor = stream_compressor()
+    students = 0
+    complete = False
+    try:
+        async for views in iter_class_result_views(
+            roll_number[:8], calculate_alt_roll_number(roll_number)[:8]
+        ):
+            lines = [encode(class_result(view, type)) for view in views]
+            if redisConnection.aio:
+                pipe = redisConnection.aio.pipeline()
+                head = b"," if students else b"["
+                pipe.append(building_key, compressor.compress(head + b",".join(lines)))
+                pipe.expire(building_key, 600)
+                await pipe.execute()
+            students += len(lines)
+            yield b"\n".join(lines) + b"\n"
+        complete = True
+
+        if redisConnection.aio:
+            if students:
+                pipe = redisConnection.aio.pipeline()
+                tail = compressor.compress(b"]") + compressor.flush()
+                pipe.append(building_key, tail)
+                pipe.rename(building_key, roll_results_key)
+                await pipe.execute()
+            else:
+                await redisConnection.aio.set(roll_results_key, "[]", ex=600)
+    finally:
+        if not complete and redisConnection.aio:
+            await redisConnection.aio.delete(building_key)
+
+    if students:
+        await _publish_class_refresh(app, roll_number)
+    logger.info(
+        f"Streamed {students} class results in {time.perf_counter() - start_time:.4f}s"
+    )
 
 
-async def fetch_class_results(app: FastAPI, roll_number: str, type: str):
+async def fetch_class_results(
+    app: FastAPI, roll_number: str, type: str, format: str = "json"
+):
     """Return results for an ENTIRE class section, derived from one roll number.
 
     The class is identified by the first 8 characters of the supplied roll
@@ -31,83 +128,118 @@ async def fetch_class_results(app: FastAPI, roll_number: str, type: str):
     - `allresult` → full per-attempt history (same shape as `fetch_all_results`).
     - `backlog` → backlogs-only (same shape as `fetch_backlogs`).
 
-    Backpressure: if the RabbitMQ scrape queue depth exceeds
+    Each student's view is read from their stored `resultview` row; only
+    students without one have their marks loaded.
+
+    Backpressure: if the scrape queue depth cached by the publisher pool exceeds
     `RABBITMQ_CLASS_MAX_MESSAGES` the response is HTTP 423 LOCKED so a class
     request can't pile a hundred scrapes onto an already-loaded server.
-    Caching: Redis key `<class>Results+<type>` for 600 seconds. Only cache
+    Caching: Redis key `<class>Results+<type>` for 600 seconds, gzip-compressed
+    when large and sent that way to clients that accept gzip. Only cache
     misses with non-empty database results are published to the dedicated
-    class-results queue.
+    class-results queue. Concurrent misses for the same class and view share
+    one rebuild through `single_flight`.
+
+    `format=ndjson` streams one student per line instead (see
+    `_stream_class_results`), starting with the first chunk of
+    `CLASS_RESULTS_STREAM_CHUNK_SIZE` students rather than the whole class.
     """
 
     # --- Step 1: RabbitMQ load check ---
-    async with app.state.rabbitmq_connection.channel() as channel:
-        queue = await channel.declare_queue(QUEUE_NAME, durable=True)
-        if queue.declaration_result.message_count > RABBITMQ_CLASS_MAX_MESSAGES:
-            return JSONResponse(
-                status_code=status.HTTP_423_LOCKED,
-                content={
-                    "status": "failure",
-                    "message": "Server Load is High. Please Try again later!!",
-                },
-            )
+    publisher = app.state.rabbitmq_publisher
+    if publisher.queue_depth(QUEUE_NAME) > RABBITMQ_CLASS_MAX_MESSAGES:
+        return JSONResponse(
+            status_code=status.HTTP_423_LOCKED,
+            content={
+                "status": "failure",
+                "message": "Server Load is High. Please Try again later!!",
+            },
+        )
 
     # --- Step 2: Redis cache lookup ---
     roll_results_key = f"{roll_number[:8]}Results+{type}"
-    if redisConnection.client:
-        cached_data = redisConnection.client.get(roll_results_key)
-        if cached_data:
-            return json.loads(cached_data)  # pyright:ignore
+    cached_data = None
+    if redisConnection.aio:
+        cached_data = await redisConnection.aio.get(roll_results_key)
+    if format == "ndjson":
+        return StreamingResponse(
+            _stream_class_results(
+                app, roll_number, type, roll_results_key, cached_data
+            ),
+            media_type=NDJSON_MEDIA_TYPE,
+        )
+    if cached_data:
+        return json_response(cached_data)
 
     # --- Step 3: Determine roll_number2 ---
-    def calculate_alt_roll_number(roll_number: str) -> str:
-        if roll_number[4] != "5" and roll_number[5] == "A":
-            first_two = str(int(roll_number[0:2]) + 1).zfill(2)
-            return first_two + roll_number[2:4] + "5" + roll_number[5:8]
-        else:
-            first_two = str(int(roll_number[0:2]) - 1).zfill(2)
-            return first_two + roll_number[2:4] + "1" + roll_number[5:8]
-
     roll_number2 = calculate_alt_roll_number(roll_number)
-    is_bpharmacy = isbpharmacyr22(roll_number)
 
-    # --- Step 4: Fetch student results ---
-    start_time = time.perf_counter()
-    students = await get_students_details(roll_number[:8], roll_number2[:8])
-    logger.info(f"DB Query Time: {time.perf_counter() - start_time:.4f}s")
+    async def rebuild():
+        # --- Step 4: Fetch student results ---
+        start_time = time.perf_counter()
+        views = await get_class_result_views(roll_number[:8], roll_number2[:8])
+        logger.info(f"DB Query Time: {time.perf_counter() - start_time:.4f}s")
 
-    results = []
-    if students:
-        for student in students:
-            result = {"details": studentDetailsModel(student), "results": []}
-            if student.marks:
-                if type == "academicresult":
-                    result["results"] = studentResultsModel(student.marks, is_bpharmacy)
-                elif type == "allresult":
-                    result["results"] = studentAllResultsModel(student.marks)
-                elif type == "backlog":
-                    result["results"] = studentBacklogs(student.marks, is_bpharmacy)
-            results.append(result)
-
-    if results:
-        async with app.state.rabbitmq_connection.channel() as channel:
-            queue = await channel.declare_queue(QUEUE_NAME, durable=True)
-            if (
-                queue.declaration_result.message_count
-                < RABBITMQ_CLASS_PUBLISH_MAX_MESSAGES
-            ):
-                try:
-                    await publish_class_results_message(app, roll_number)
-                except Exception as error:
-                    # The new background class scrape must not break the existing
-                    # database-backed class-results response.
-                    logger.error(
-                        f"Failed to publish class results request for {roll_number}: {error}"
-                    )
+        results = [class_result(view, type) for view in views or []]
+
+        if results:
+            await _publish_class_refresh(app, roll_number)
+
+        # --- Step 5: Save to Redis cache ---
+        body = compress(encode(results))
+        if redisConnection.aio:
+            await redisConnection.aio.set(roll_results_key, body, ex=600)
 
-    # --- Step 5: Save to Redis cache ---
-    if redisConnection.client:
-        redisConnection.client.set(roll_results_key, json.dumps(results), ex=600)
+        logger.info(f"Total class results  Time: {time.perf_counter() - start_time:.4f}s")
 
-    logger.info(f"Total class results  Time: {time.perf_counter() - start_time:.4f}s")
+        return json_response(body)
+
+    return await single_flight(roll_results_key, rebuild)
+
+
+async def fetch_class_results_progress(roll_number: str):
+    """Report how far the background class refresh for this class has got.
+
+    The worker records progress under the prefix of the roll number that
+    requested the refresh, so the paired cohort's key is checked as well.
+    """
+    try:
+        class_prefixes = get_class_prefixes(roll_number)
+    except ValueError:
+        class_prefixes = (roll_number[:8],)
+
+    if redisConnection.aio:
+        for prefix in class_prefixes:
+            progress = await redisConnection.aio.hgetall(
+                class_results_progress_key(prefix)
+            )
+            if progress:
+                progress = {
+                    key.decode() if isinstance(key, bytes) else key: (
+                        value.decode() if isinstance(value, bytes) else value
+                    )
+                    for key, value in progress.items()
+                }
+                return {
+                    "classPrefix": prefix,
+                    "status": progress.get("status"),
+                    **{
+                        field: int(progress[field])
+                        for field in (
+                            "total",
+                            "processed",
+                            "withResults",
+                            "startedAt",
+                            "updatedAt",
+                        )
+                        if field in progress
+                    },
+                }
 
-    return results
+    return JSONResponse(
+        status_code=status.HTTP_404_NOT_FOUND,
+        content={
+            "status": "failure",
+            "message": "No class refresh has run for this class recently.",
+        },
+    )
@@ -1,12 +1,12 @@
 from fastapi import FastAPI
-from config.redisConnection import redisConnection
-import json
 
 from config.settings import EXPIRY_TIME
-from database.models import studentCredits, studentDetailsModel
-from database.operations import get_details
+from database.models import creditsFromResults
+from database.operations import get_result_view
 from messaging.publisher import publish_message
-from utils.helpers import get_credit_regulation_details, isbpharmacyr22
+from utils.helpers import get_credit_regulation_details
+from utils.caching import get_cached_bytes, json_response, set_cached_bytes
+from utils.singleFlight import single_flight
 
 
 async def fetch_required_credits(app: FastAPI, roll_number: str):
@@ -26,10 +26,9 @@ async def fetch_required_credits(app: FastAPI, roll_number: str):
     """
     roll_credits_checker_key = f"{roll_number}RequiredCredits"
 
-    if redisConnection.client:
-        cached_data = redisConnection.client.get(roll_credits_checker_key)
-        if cached_data:
-            return json.loads(cached_data)  # pyright: ignore
+    cached_data = await get_cached_bytes(roll_credits_checker_key)
+    if cached_data:
+        return json_response(cached_data)
 
     credits = get_credit_regulation_details(roll_number)
     if credits is None:
@@ -38,24 +37,21 @@ async def fetch_required_credits(app: FastAPI, roll_number: str):
             "message": "This feature is only applicable for btech students currently!!",
         }
 
-    response = await get_details(roll_number)
-    if response:
-        student, marks = response
-        details = studentDetailsModel(student)
-        result = {
-            "details": details,
-            "results": studentCredits(
-                marks, credits, isbpharmacyr22(details["rollNumber"])
-            ),
-        }
+    async def rebuild():
+        view = await get_result_view(roll_number)
+        if view:
+            # Obtained credits come from the stored consolidated sheet.
+            result = {
+                "details": view["details"],
+                "results": creditsFromResults(view["results"], credits),
+            }
 
-        if redisConnection.client:
-            redisConnection.client.set(
-                roll_credits_checker_key, json.dumps(result), ex=EXPIRY_TIME
-            )
+            # await publish_message(app, roll_number)
 
-        # await publish_message(app, roll_number)
+            return json_response(
+                await set_cached_bytes(roll_credits_checker_key, result, EXPIRY_TIME)
+            )
 
-        return result
+        return await publish_message(app, roll_number)
 
-    return await publish_message(app, roll_number)
+    return await single_flight(roll_credits_checker_key, rebuild)
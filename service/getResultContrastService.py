@@ -1,6 +1,4 @@
 from fastapi import FastAPI
-from config.redisConnection import redisConnection
-import json
 
 from config.settings import EXPIRY_TIME
 from database.models import (
@@ -10,6 +8,7 @@ from database.models import (
 )
 from database.operations import get_details
 from messaging.publisher import publish_message
+from utils.caching import get_cached_bytes, json_response, set_cached_bytes
 
 
 async def fetch_result_contrast(app: FastAPI, roll_number_1: str, roll_number_2: str):
@@ -30,10 +29,9 @@ async def fetch_result_contrast(app: FastAPI, roll_number_1: str, roll_number_2:
     """
     roll_result_contrast_key = f"{roll_number_1}{roll_number_2}ResultContrast"
 
-    if redisConnection.client:
-        cached_data = redisConnection.client.get(roll_result_contrast_key)
-        if cached_data:
-            return json.loads(cached_data)  # pyright: ignore
+    cached_data = await get_cached_bytes(roll_result_contrast_key)
+    if cached_data:
+        return json_response(cached_data)
 
     response1 = await get_details(roll_number_1)
     response2 = await get_details(roll_number_2)
@@ -55,9 +53,6 @@ async def fetch_result_contrast(app: FastAPI, roll_number_1: str, roll_number_2:
             "results": studentResultsModel(marks2),
         }
         finalResult = studentResultContrast(result1, result2)
-        if redisConnection.client:
-            redisConnection.client.set(
-                roll_result_contrast_key, json.dumps(finalResult), ex=EXPIRY_TIME
-            )
-
-        return finalResult
+        return json_response(
+            await set_cached_bytes(roll_result_contrast_key, finalResult, EXPIRY_TIME)
+        )
@@ -1,19 +1,54 @@
-import json
-from fastapi import FastAPI, status
-from fastapi.responses import JSONResponse
+from fastapi import FastAPI
 from config.redisConnection import redisConnection
 from scrapers.serverChecker import check_valid_url_in_redis
-from utils.helpers import isbpharmacyr22
-from utils.logger import redis_logger
-from config.settings import EXPIRY_TIME
-from database.models import (
-    studentDetailsModel,
-    studentResultsModel,
+from utils.caching import (
+    get_cached_swr,
+    json_response,
+    refresh_in_background,
+    set_cached_swr,
 )
-from database.operations import get_details
+from utils.singleFlight import single_flight
+from config.settings import (
+    RESULTS_HARD_TTL_SECONDS,
+    RESULTS_REFRESH_WINDOW_SECONDS,
+    RESULTS_SOFT_TTL_SECONDS,
+)
+from database.operations import get_result_view
+from messaging.lanes import REFRESH
 from messaging.publisher import publish_message
 
 
+async def cache_results(roll_number: str) -> bytes | None:
+    """Build the consolidated result from PostgreSQL and cache it under `<rollNo>Results`.
+
+    Returns the encoded result, or None when the student is not stored. The
+    release-day warm-up calls this after saving a subscribed student's new marks.
+    """
+    view = await get_result_view(roll_number)
+    if not view:
+        return None
+
+    return await set_cached_swr(
+        f"{roll_number}Results",
+        {"details": view["details"], "results": view["results"]},
+        RESULTS_SOFT_TTL_SECONDS,
+        RESULTS_HARD_TTL_SECONDS,
+    )
+
+
+def with_server_status(body: bytes, server_up: bool) -> bytes:
+    """Add the live `serverStatus` flag to an encoded result without decoding it."""
+    return body[:-1] + (
+        b',"serverStatus":true}' if server_up else b',"serverStatus":false}'
+    )
+
+
+async def refresh_results(app: FastAPI, roll_number: str) -> None:
+    """Rebuild a stale `<rollNo>Results` entry and queue a freshness scrape."""
+    await cache_results(roll_number)
+    await publish_message(app, roll_number, lane=REFRESH)
+
+
 async def fetch_results(app: FastAPI, roll_number: str):
     """Return the CONSOLIDATED final mark sheet for a single student.
 
@@ -27,43 +62,46 @@ async def fetch_results(app: FastAPI, roll_number: str):
     For the raw per-attempt history use `fetch_all_results`; for only the still-
     failing subjects use `fetch_backlogs`. See `processResults` /
     `studentResultsModel` in database/models.py for the exact response shape.
+    The sheet is read from the `resultview` row the worker stores with the
+    marks, so a cache miss is one primary-key fetch.
 
-    Caching: Redis key `<rollNo>Results` for `EXPIRY_TIME` seconds. The cached
-    payload is augmented with a live `serverStatus` flag derived from
-    `check_valid_url_in_redis` before returning. Falls back to a queued scrape
-    via `publish_message` on cache+DB miss.
+    Caching: Redis key `<rollNo>Results`, stale-while-revalidate. The entry is
+    fresh for `RESULTS_SOFT_TTL_SECONDS`. After that it is still served, and
+    `refresh_results` runs in the background at most once per
+    `RESULTS_REFRESH_WINDOW_SECONDS`. After `RESULTS_HARD_TTL_SECONDS` the
+    entry is gone and the request rebuilds from PostgreSQL. The cached bytes are
+    sent as they are, with a live `serverStatus` flag derived from
+    `check_valid_url_in_redis` spliced onto the end. Falls back to a queued scrape
+    via `publish_message` on cache+DB miss. Concurrent misses for the same
+    student share one rebuild and one publish through `single_flight`.
     """
 
     roll_results_key = f"{roll_number}Results"
 
     url = "."
-    if redisConnection.client:
-        cached_data = redisConnection.client.get(roll_results_key)
-        url = check_valid_url_in_redis()
-
-        if cached_data:
-            data = json.loads(cached_data)
-            data["serverStatus"] = url != "."
-            return data
-
-    response = await get_details(roll_number)
-    if response:
-        student, marks = response
-        result = {
-            "details": studentDetailsModel(student),
-            "results": studentResultsModel(marks, isbpharmacyr22(roll_number)),
-        }
-        if redisConnection.client:
-            redisConnection.client.set(
-                roll_results_key, json.dumps(result), ex=EXPIRY_TIME
+    if redisConnection.aio:
+        url = await check_valid_url_in_redis()
+
+    cached = await get_cached_swr(roll_results_key)
+    if cached:
+        cached_data, stale = cached
+        if stale:
+            await refresh_in_background(
+                roll_results_key,
+                lambda: refresh_results(app, roll_number),
+                RESULTS_REFRESH_WINDOW_SECONDS,
             )
-        else:
-            redis_logger.warning(f"Unable to connect to redis {roll_number}")
+        return json_response(with_server_status(cached_data, url != "."))
 
-        result["serverStatus"] = url != "."
+    async def rebuild():
+        result = await cache_results(roll_number)
+        if result:
+            # The student is answered from the database; the scrape only
+            # checks for newer results.
+            await publish_message(app, roll_number, lane=REFRESH)
 
-        await publish_message(app, roll_number)
+            return json_response(with_server_status(result, url != "."))
 
-        return JSONResponse(status_code=status.HTTP_200_OK, content=result)
+        return await publish_message(app, roll_number)
 
-    return await publish_message(app, roll_number)
+    return await single_flight(roll_results_key, rebuild)
@@ -21,11 +21,14 @@ from database.operations import (
     get_latest_mark_for_subject,
     get_pending_grace_marks_proofs,
     list_grace_marks_proofs,
+    outdate_result_views,
+    refresh_result_view,
     save_grace_marks_proof,
     update_grace_marks_proof_status,
     upsert_grace_mark,
 )
 from utils.caching import invalidate_all_cache
+from utils.compression import decompress
 from utils.logger import database_logger, logger
 from utils.s3 import generate_get_url, generate_get_urls, upload_bytes
 from service.cmm_classifier import (
@@ -290,7 +293,7 @@ async def get_proof_with_backlogs(app, proof_id: str, admin_key):
     backlogs = await fetch_backlogs(app, row.rollNumber)
 
     if isinstance(backlogs, Response):
-        backlogs = json.loads(backlogs.body)
+        backlogs = json.loads(decompress(backlogs.body))
 
     return JSONResponse(
         status_code=status.HTTP_200_OK,
@@ -309,8 +312,8 @@ async def apply_grace_marks(app, payload: GraceMarksPayload):
     the DB before any insert runs. If the student is unknown, any subject is
     unknown, or any subject has no prior mark to anchor `semesterCode` /
     `examCode` from, the request fails with 404 and nothing is written. On
-    success the student's read caches are invalidated so the next read shows
-    the new grace rows immediately.
+    success the student's stored result views are rebuilt and the read caches
+    invalidated, so the next read shows the new grace rows immediately.
     """
     roll_no = payload.rollNumber.strip().upper()
     if len(roll_no) != 10 or not roll_no.isalnum():
@@ -385,8 +388,12 @@ async def apply_grace_marks(app, payload: GraceMarksPayload):
                 "message": "Failed to record grace marks. Please try again.",
             },
         )
+    finally:
+        # Even a partial write changes the marks the stored view was built from.
+        await outdate_result_views([roll_no])
 
-    invalidate_all_cache(roll_no)
+    await refresh_result_view(roll_no)
+    await invalidate_all_cache(roll_no)
 
     return JSONResponse(
         status_code=status.HTTP_200_OK,
@@ -1,7 +1,5 @@
-import json
 from fastapi import FastAPI, status
 from fastapi.responses import JSONResponse
-from config.redisConnection import redisConnection
 from config.settings import (
     FIVE_MINUTE_EXPIRY,
     LATEST_NOTIFICATIONS_REDIS_KEY,
@@ -9,6 +7,7 @@ from config.settings import (
 )
 from database.operations import get_latest_notifications, get_notifications
 from messaging.publisher import publish_message
+from utils.caching import get_cached_bytes, json_response, set_cached_bytes
 
 
 async def notification(
@@ -34,18 +33,12 @@ async def notification(
                 content=[],
             )
         key = NOTIFICATIONS_REDIS_KEY + str(page) + regulation + degree + year + title
-        if redisConnection.client:
-            cached_data = redisConnection.client.get(key)
-            if cached_data:
-                return json.loads(cached_data)  # pyright: ignore
+        cached_data = await get_cached_bytes(key)
+        if cached_data:
+            return json_response(cached_data)
 
         results = await get_notifications(page, regulation, degree, year, title)
-        if redisConnection.client:
-            redisConnection.client.set(key, json.dumps(results), ex=FIVE_MINUTE_EXPIRY)
-        return JSONResponse(
-            status_code=status.HTTP_200_OK,
-            content=results,
-        )
+        return json_response(await set_cached_bytes(key, results, FIVE_MINUTE_EXPIRY))
 
     except Exception:
         return JSONResponse(
@@ -65,15 +58,12 @@ async def getLatestNotifications():
     """
     try:
         key = LATEST_NOTIFICATIONS_REDIS_KEY
-        if redisConnection.client:
-            cached_data = redisConnection.client.get(key)
-            if cached_data:
-                return json.loads(cached_data)  # pyright: ignore
+        cached_data = await get_cached_bytes(key)
+        if cached_data:
+            return json_response(cached_data)
 
         results = await get_latest_notifications()
-        if redisConnection.client:
-            redisConnection.client.set(key, json.dumps(results), ex=FIVE_MINUTE_EXPIRY)
-        return results
+        return json_response(await set_cached_bytes(key, results, FIVE_MINUTE_EXPIRY))
 
     except Exception:
         return JSONResponse(
@@ -0,0 +1,217 @@
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
+
+from config.settings import NOTIFICATIONS_REDIS_KEY
+from messaging.consumer import (
+    _consume_default_queue_in_batches,
+    _process_message_batch,
+    process_message_batch,
+)
+
+
+def _scrape(roll_number):
+    return {"details": {"rollNo": roll_number}, "results": []}
+
+
+def test_batch_scrapes_concurrently_and_saves_once():
+    scrape = AsyncMock(
+        side_effect=lambda roll: None if roll.endswith("2") else _scrape(roll)
+    )
+    save_many = AsyncMock(return_value={"18E51A0401": 3, "18E51A0403": 0})
+    notify = AsyncMock()
+
+    with (
+        patch("messaging.consumer.scrape_roll_number", new=scrape),
+        patch("messaging.consumer.save_many_to_database", new=save_many),
+        patch("messaging.consumer._notify_saved", new=notify),
+    ):
+        outcomes = asyncio.run(
+            process_message_batch(
+                ["18E51A0401", "18E51A0402", "18E51A0403", "18E51A0401"]
+            )
+        )
+
+    assert outcomes == {"18E51A0401": True, "18E51A0402": False, "18E51A0403": True}
+    assert scrape.await_count == 3
+    save_many.assert_awaited_once_with([_scrape("18E51A0401"), _scrape("18E51A0403")])
+    assert [c.args for c in notify.await_args_list] == [
+        ("18E51A0401", 3),
+        ("18E51A0403", 0),
+    ]
+
+
+def test_failed_batch_save_falls_back_to_one_student_at_a_time():
+    save = AsyncMock(return_value=1)
+
+    with (
+        patch(
+            "messaging.consumer.scrape_roll_number", new=AsyncMock(side_effect=_scrape)
+        ),
+        patch(
+            "messaging.consumer.save_many_to_database",
+            new=AsyncMock(side_effect=RuntimeError("deadlock detected")),
+        ),
+        patch("messaging.consumer.save_to_database", new=save),
+        patch("messaging.consumer._notify_saved", new=AsyncMock()),
+    ):
+        outcomes = asyncio.run(process_message_batch(["18E51A0401", "18E51A0402"]))
+
+    assert outcomes == {"18E51A0401": True, "18E51A0402": True}
+    assert save.await_count == 2
+
+
+def test_students_that_save_are_notified_when_another_fallback_save_fails():
+    save = AsyncMock(side_effect=[RuntimeError("bad record"), 2])
+    notify = AsyncMock()
+
+    with (
+        patch(
+            "messaging.consumer.scrape_roll_number", new=AsyncMock(side_effect=_scrape)
+        ),
+        patch(
+            "messaging.consumer.save_many_to_database",
+            new=AsyncMock(side_effect=RuntimeError("deadlock detected")),
+        ),
+        patch("messaging.consumer.save_to_database", new=save),
+        patch("messaging.consumer._notify_saved", new=notify),
+    ):
+        outcomes = asyncio.run(process_message_batch(["18E51A0401", "18E51A0402"]))
+
+    assert outcomes == {"18E51A0401": False, "18E51A0402": True}
+    notify.assert_awaited_once_with("18E51A0402", 2)
+
+
+class _Queue:
+    def __init__(self, messages):
+        self.messages = messages
+
+    async def consume(self, callback):
+        for message in self.messages:
+            await callback(message)
+        return "consumer-tag"
+
+    async def cancel(self, consumer_tag):
+        self.cancelled = consumer_tag
+
+
+def _message(body):
+    return SimpleNamespace(body=body.encode(), ack=AsyncMock(), reject=AsyncMock())
+
+
+def test_batched_consumer_acks_once_the_batch_is_saved():
+    messages = [_message(f"18E51A040{index}") for index in range(1, 6)]
+    flushed = []
+
+    async def process_batch(roll_numbers):
+        # Acks for this batch may only follow its write.
+        assert sum(message.ack.await_count for message in messages) == sum(
+            map(len, flushed)
+        )
+        flushed.append(roll_numbers)
+        return dict.fromkeys(roll_numbers, True)
+
+    async def run():
+        consumer = asyncio.create_task(
+            _consume_default_queue_in_batches(_Queue(messages), None, "interactive", 3)
+        )
+        await asyncio.sleep(0.1)
+        consumer.cancel()
+
+    with (
+        patch("messaging.consumer.process_message_batch", new=process_batch),
+        patch("messaging.consumer._record_scrape", new=AsyncMock()),
+        patch("messaging.consumer.CONSUMER_BATCH_WAIT_SECONDS", 0.01),
+    ):
+        try:
+            asyncio.run(run())
+        except asyncio.CancelledError:
+            pass
+
+    assert flushed == [
+        ["18E51A0401", "18E51A0402", "18E51A0403"],
+        ["18E51A0404", "18E51A0405"],
+    ]
+    for message in messages:
+        message.ack.assert_awaited_once_with()
+    assert not any(message.reject.await_count for message in messages)
+
+
+def test_batched_consumer_finishes_its_batch_and_requeues_the_rest_on_stop():
+    messages = [_message(f"18E51A040{index}") for index in range(1, 6)]
+    queue = _Queue(messages)
+    flushed = []
+
+    async def run():
+        stopping = asyncio.Event()
+
+        async def process_batch(roll_numbers):
+            stopping.set()
+            await asyncio.sleep(0.01)
+            flushed.append(roll_numbers)
+            return dict.fromkeys(roll_numbers, True)
+
+        with patch("messaging.consumer.process_message_batch", new=process_batch):
+            await asyncio.wait_for(
+                _consume_default_queue_in_batches(
+                    queue, None, "interactive", 3, stopping
+                ),
+                timeout=1,
+            )
+
+    with (
+        patch("messaging.consumer._record_scrape", new=AsyncMock()),
+        patch("messaging.consumer.CONSUMER_BATCH_WAIT_SECONDS", 0.01),
+    ):
+        asyncio.run(run())
+
+    assert queue.cancelled == "consumer-tag"
+    assert flushed == [["18E51A0401", "18E51A0402", "18E51A0403"]]
+    for message in messages[:3]:
+        message.ack.assert_awaited_once_with()
+    for message in messages[3:]:
+        message.reject.assert_awaited_once_with(requeue=True)
+
+
+def test_a_failing_notification_refresh_does_not_drop_the_batch():
+    notification = _message(NOTIFICATIONS_REDIS_KEY)
+    saved, unsaved = _message("18E51A0401"), _message("18E51A0402")
+    record = AsyncMock(side_effect=[RuntimeError("redis down"), None])
+
+    with (
+        patch(
+            "messaging.consumer.refresh_notifications",
+            new=AsyncMock(side_effect=RuntimeError("upstream down")),
+        ),
+        patch(
+            "messaging.consumer.process_message_batch",
+            new=AsyncMock(return_value={"18E51A0401": True, "18E51A0402": False}),
+        ),
+        patch("messaging.consumer._record_scrape", new=record),
+    ):
+        asyncio.run(_process_message_batch([notification, saved, unsaved], None))
+
+    notification.reject.assert_awaited_once_with(requeue=False)
+    assert record.await_count == 2
+    for message in (saved, unsaved):
+        message.ack.assert_awaited_once_with()
+        message.reject.assert_not_awaited()
+
+
+def test_a_failed_batch_is_requeued():
+    messages = [_message("18E51A0401"), _message("18E51A0402")]
+    record = AsyncMock()
+
+    with (
+        patch(
+            "messaging.consumer.process_message_batch",
+            new=AsyncMock(side_effect=RuntimeError("event loop closed")),
+        ),
+        patch("messaging.consumer._record_scrape", new=record),
+    ):
+        asyncio.run(_process_message_batch(messages, None))
+
+    record.assert_not_awaited()
+    for message in messages:
+        message.reject.assert_awaited_once_with(requeue=True)
+        message.ack.assert_not_awaited()
@@ -0,0 +1,181 @@
+import asyncio
+import json
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from config.connection import prismaConnection
+from database.operations import (
+    BULK_INSERT_BATCH_MARKS_QUERY,
+    BULK_INSERT_MARKS_QUERY,
+    BULK_UPSERT_STUDENTS_QUERY,
+    BULK_UPSERT_SUBJECTS_QUERY,
+    RESULT_VIEWS_OUTDATED_QUERY,
+    save_many_to_database,
+    save_to_database_bulk,
+)
+
+
+class _TransactionContext:
+    def __init__(self, transaction):
+        self.transaction = transaction
+
+    async def __aenter__(self):
+        return self.transaction
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        return None
+
+
+def _subject(code, name="Maths"):
+    return {
+        "subjectCode": code,
+        "subjectName": name,
+        "subjectInternal": "20",
+        "subjectExternal": "40",
+        "subjectTotal": "60",
+        "subjectGrade": "B",
+        "subjectCredits": "3",
+    }
+
+
+def _scrape(roll_number="20J21A0101"):
+    return {
+        "details": {
+            "name": "STUDENT",
+            "rollNo": roll_number,
+            "collegeCode": "J2",
+            "fatherName": "FATHER",
+        },
+        "results": [
+            {
+                "examCode": "1500",
+                "semesterCode": "1-1",
+                "rcrv": False,
+                "subjects": [_subject("A101", ""), _subject("A102")],
+            },
+            {
+                "examCode": "1510",
+                "semesterCode": "1-1",
+                "rcrv": True,
+                "subjects": [_subject("A101")],
+            },
+            # Exam codes the scraper could not map to a semester are skipped.
+            {"examCode": "9999", "rcrv": False, "subjects": [_subject("Z999")]},
+        ],
+    }
+
+
+def _transaction(query_results):
+    return SimpleNamespace(
+        student=SimpleNamespace(upsert=AsyncMock(return_value=SimpleNamespace(id="s1"))),
+        query_raw=AsyncMock(side_effect=query_results),
+        execute_raw=AsyncMock(),
+    )
+
+
+def test_bulk_save_counts_only_rows_returned_by_the_insert():
+    transaction = _transaction(
+        [
+            [
+                {"id": "sub-1", "subjectCode": "A101"},
+                {"id": "sub-2", "subjectCode": "A102"},
+            ],
+            [{"id": "mark-1"}],
+        ]
+    )
+    prisma = SimpleNamespace(tx=MagicMock(return_value=_TransactionContext(transaction)))
+
+    with patch.object(prismaConnection, "prisma", prisma):
+        inserted = asyncio.run(save_to_database_bulk(_scrape()))
+
+    assert inserted == 1
+    prisma.tx.assert_called_once()
+    subjects_call, marks_call = transaction.query_raw.await_args_list
+    assert subjects_call.args[0] == BULK_UPSERT_SUBJECTS_QUERY
+    # Duplicate codes collapse to one row and keep the first non-empty name.
+    assert json.loads(subjects_call.args[1]) == [
+        {"subjectCode": "A101", "subjectName": "Maths"},
+        {"subjectCode": "A102", "subjectName": "Maths"},
+    ]
+    assert marks_call.args[0] == BULK_INSERT_MARKS_QUERY
+    assert marks_call.args[2] == "s1"
+    marks = json.loads(marks_call.args[1])
+    assert [(m["subjectId"], m["examCode"], m["rcrv"]) for m in marks] == [
+        ("sub-1", "1500", False),
+        ("sub-2", "1500", False),
+        ("sub-1", "1510", True),
+    ]
+    assert marks[0]["credits"] == 3.0
+    # The stored view goes with the marks it no longer matches.
+    transaction.execute_raw.assert_awaited_once_with(
+        RESULT_VIEWS_OUTDATED_QUERY, '["20J21A0101"]'
+    )
+
+
+def test_bulk_save_resolves_subjects_inserted_by_a_concurrent_worker():
+    transaction = _transaction(
+        [
+            [{"id": "sub-1", "subjectCode": "A101"}],
+            [{"id": "sub-2", "subjectCode": "A102"}],
+            [],
+        ]
+    )
+    prisma = SimpleNamespace(tx=MagicMock(return_value=_TransactionContext(transaction)))
+
+    with patch.object(prismaConnection, "prisma", prisma):
+        inserted = asyncio.run(save_to_database_bulk(_scrape()))
+
+    assert inserted == 0
+    transaction.execute_raw.assert_not_awaited()
+    lookup_call = transaction.query_raw.await_args_list[1]
+    assert json.loads(lookup_call.args[1]) == ["A102"]
+
+
+def test_bulk_save_raises_when_the_transaction_fails():
+    transaction = _transaction(RuntimeError("connection reset"))
+    prisma = SimpleNamespace(tx=MagicMock(return_value=_TransactionContext(transaction)))
+
+    with patch.object(prismaConnection, "prisma", prisma):
+        with pytest.raises(RuntimeError):
+            asyncio.run(save_to_database_bulk(_scrape()))
+
+
+def test_batch_save_writes_every_student_in_one_transaction():
+    transaction = _transaction(
+        [
+            [
+                {"id": "s1", "rollNumber": "20J21A0101"},
+                {"id": "s2", "rollNumber": "20J21A0102"},
+            ],
+            [
+                {"id": "sub-1", "subjectCode": "A101"},
+                {"id": "sub-2", "subjectCode": "A102"},
+            ],
+            [{"studentId": "s2"}, {"studentId": "s2"}],
+        ]
+    )
+    prisma = SimpleNamespace(tx=MagicMock(return_value=_TransactionContext(transaction)))
+
+    with patch.object(prismaConnection, "prisma", prisma):
+        inserted = asyncio.run(
+            save_many_to_database([_scrape("20J21A0101"), _scrape("20J21A0102")])
+        )
+
+    assert inserted == {"20J21A0101": 0, "20J21A0102": 2}
+    prisma.tx.assert_called_once()
+    students_call, subjects_call, marks_call = transaction.query_raw.await_args_list
+    assert students_call.args[0] == BULK_UPSERT_STUDENTS_QUERY
+    assert [s["rollNumber"] for s in json.loads(students_call.args[1])] == [
+        "20J21A0101",
+        "20J21A0102",
+    ]
+    assert subjects_call.args[0] == BULK_UPSERT_SUBJECTS_QUERY
+    assert len(json.loads(subjects_call.args[1])) == 2
+    assert marks_call.args[0] == BULK_INSERT_BATCH_MARKS_QUERY
+    marks = json.loads(marks_call.args[1])
+    assert [m["studentId"] for m in marks] == ["s1"] * 3 + ["s2"] * 3
+    transaction.execute_raw.assert_awaited_once_with(
+        RESULT_VIEWS_OUTDATED_QUERY, '["20J21A0102"]'
+    )
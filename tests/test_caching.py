@@ -0,0 +1,214 @@
+import asyncio
+import json
+import time
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from config.redisConnection import redisConnection
+from service.getResultsService import fetch_results
+from utils.caching import (
+    L1_CACHE_EVICTIONS,
+    LocalCache,
+    get_cached,
+    get_cached_swr,
+    invalidate_all_cache,
+    listen_for_cache_invalidations,
+    localCache,
+    set_cached_swr,
+)
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+def _evictions(reason):
+    return L1_CACHE_EVICTIONS.labels(reason)._value.get()
+
+
+def test_local_cache_evicts_the_least_recently_used_entry():
+    cache = LocalCache(max_entries=2, ttl_seconds=60, clock=_Clock())
+    before = _evictions("capacity")
+
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert (cache.get("a"), cache.get("c")) == (1, 3)
+    assert _evictions("capacity") == before + 1
+
+
+def test_local_cache_entries_expire_no_later_than_redis_would():
+    clock = _Clock()
+    cache = LocalCache(max_entries=10, ttl_seconds=30, clock=clock)
+
+    cache.set("short", "x", ttl_seconds=5)
+    cache.set("long", "y", ttl_seconds=600)
+    clock.now += 6
+
+    assert cache.get("short") is None
+    assert cache.get("long") == "y"
+    clock.now += 25
+    assert cache.get("long") is None
+
+
+def test_get_cached_fills_l1_from_redis_once():
+    client = SimpleNamespace(get=MagicMock(return_value=json.dumps({"a": 1})))
+
+    with (
+        patch.object(redisConnection, "client", client),
+        patch("utils.caching.localCache", LocalCache(clock=_Clock())),
+    ):
+        first = asyncio.run(get_cached("18E51A0401Results"))
+        second = asyncio.run(get_cached("18E51A0401Results"))
+
+    assert first == second == {"a": 1}
+    client.get.assert_called_once_with("18E51A0401Results")
+
+
+def test_invalidation_evicts_local_entries_and_notifies_other_processes():
+    client = SimpleNamespace(unlink=MagicMock(), publish=MagicMock())
+    localCache.set("18E51A0401Results", {"a": 1})
+
+    with patch.object(redisConnection, "client", client):
+        asyncio.run(invalidate_all_cache("18E51A0401"))
+
+    assert localCache.get("18E51A0401Results") is None
+    channel, keys = client.publish.call_args.args
+    assert channel == "cache_invalidation"
+    assert "18E51A0401ALL" in json.loads(keys)
+
+
+class _PubSub:
+    def __init__(self, messages):
+        self.messages = messages
+        self.subscribe = MagicMock(side_effect=self._subscribe)
+
+    async def _subscribe(self, channel):
+        return None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+    async def listen(self):
+        for message in self.messages:
+            yield message
+        raise asyncio.CancelledError
+
+
+def test_listener_evicts_keys_published_by_other_processes():
+    cache = LocalCache(clock=_Clock())
+    cache.set("18E51A0401ALL", {"a": 1})
+    cache.set("18E51A0402ALL", {"b": 2})
+    pubsub = _PubSub(
+        [
+            {"type": "subscribe", "data": 1},
+            {"type": "message", "data": json.dumps(["18E51A0401ALL"])},
+        ]
+    )
+
+    with (
+        patch.object(
+            redisConnection,
+            "async_client",
+            SimpleNamespace(pubsub=MagicMock(return_value=pubsub)),
+        ),
+        patch("utils.caching.localCache", cache),
+    ):
+        try:
+            asyncio.run(listen_for_cache_invalidations())
+        except asyncio.CancelledError:
+            pass
+
+    pubsub.subscribe.assert_called_once_with("cache_invalidation")
+    assert cache.get("18E51A0401ALL") is None
+    assert cache.get("18E51A0402ALL") == {"b": 2}
+
+
+class _Redis:
+    """Just enough of a Redis client for get / set NX."""
+
+    def __init__(self, values=None):
+        self.values = dict(values or {})
+
+    def get(self, key):
+        return self.values.get(key)
+
+    def set(self, key, value, ex=None, nx=False):
+        if nx and key in self.values:
+            return None
+        self.values[key] = value
+        return True
+
+
+def _fetch_results_twice(envelope, refresh):
+    client = _Redis({"18E51A0401Results": json.dumps(envelope)})
+
+    async def run():
+        responses = [await fetch_results(None, "18E51A0401") for _ in range(2)]
+        await asyncio.sleep(0)
+        return responses
+
+    with (
+        patch.object(redisConnection, "client", client),
+        patch("utils.caching.localCache", LocalCache(clock=_Clock())),
+        patch("service.getResultsService.check_valid_url_in_redis", return_value="."),
+        patch("service.getResultsService.refresh_results", refresh),
+    ):
+        return asyncio.run(run())
+
+
+def test_fresh_result_entries_are_served_without_a_refresh():
+    refresh = AsyncMock()
+    envelope = {"value": {"details": {}}, "softExpiresAt": time.time() + 60}
+
+    responses = _fetch_results_twice(envelope, refresh)
+
+    assert json.loads(responses[0].body) == {"details": {}, "serverStatus": False}
+    refresh.assert_not_awaited()
+
+
+def test_stale_result_entries_are_served_and_refreshed_once_per_window():
+    refresh = AsyncMock()
+    envelope = {"value": {"details": {}}, "softExpiresAt": time.time() - 1}
+
+    responses = _fetch_results_twice(envelope, refresh)
+
+    assert [json.loads(response.body) for response in responses] == [
+        {"details": {}, "serverStatus": False}
+    ] * 2
+    refresh.assert_awaited_once_with(None, "18E51A0401")
+
+
+def test_result_entries_are_sent_as_stored_bytes():
+    client = _Redis()
+    sheet = {"details": {"rollNumber": "18E51A0401"}, "results": {"CGPA": "8.10"}}
+
+    async def run():
+        body = await set_cached_swr("18E51A0401Results", sheet, 60, 600)
+        with patch("utils.caching.orjson.loads") as loads:
+            cached, stale = await get_cached_swr("18E51A0401Results")
+            response = await fetch_results(None, "18E51A0401")
+        loads.assert_not_called()
+        return body, cached, stale, response
+
+    with (
+        patch.object(redisConnection, "client", client),
+        patch("utils.caching.localCache", LocalCache(clock=_Clock())),
+        patch("service.getResultsService.check_valid_url_in_redis", return_value="x"),
+    ):
+        body, cached, stale, response = asyncio.run(run())
+
+    assert cached == body and not stale
+    assert json.loads(client.values["18E51A0401Results"])["value"] == sheet
+    assert response.media_type == "application/json"
+    assert json.loads(response.body) == {**sheet, "serverStatus": True}
@@ -7,6 +7,7 @@ from messaging.consumer import (
     iter_class_roll_numbers,
     process_class_results_message,
 )
+from service.getClassResults import fetch_class_results_progress
 
 
 def test_iter_class_roll_numbers_increments_year_for_regular_cohort():
@@ -41,6 +42,8 @@ def test_process_class_results_message_processes_roll_numbers_in_order():
     redis_client = SimpleNamespace(
         exists=MagicMock(return_value=False),
         set=MagicMock(),
+        hset=MagicMock(),
+        expire=MagicMock(),
     )
 
     with (
@@ -69,8 +72,10 @@ def test_process_class_results_message_skips_recently_processed_class():
     process = AsyncMock()
     redis_client = SimpleNamespace(
         # The paired cohort was processed, so this request represents the same class.
-        exists=MagicMock(side_effect=[False, True]),
+        exists=MagicMock(return_value=1),
         set=MagicMock(),
+        hset=MagicMock(),
+        expire=MagicMock(),
     )
 
     with (
@@ -80,6 +85,9 @@ def test_process_class_results_message_skips_recently_processed_class():
         asyncio.run(process_class_results_message("18E51A0479"))
 
     process.assert_not_awaited()
+    redis_client.exists.assert_called_once_with(
+        "class_results_processed:18E51A04", "class_results_processed:19E55A04"
+    )
     redis_client.set.assert_not_called()
 
 
@@ -88,11 +96,14 @@ def test_process_class_results_message_stops_after_twenty_consecutive_empty_roll
     redis_client = SimpleNamespace(
         exists=MagicMock(return_value=False),
         set=MagicMock(),
+        hset=MagicMock(),
+        expire=MagicMock(),
     )
 
     with (
         patch("messaging.consumer.process_message", new=process),
         patch.object(redisConnection, "client", redis_client),
+        patch("messaging.consumer.CLASS_RESULTS_WINDOW_SIZE", 1),
     ):
         asyncio.run(process_class_results_message("18E51A0479"))
 
@@ -109,13 +120,88 @@ def test_non_empty_result_resets_consecutive_empty_roll_count():
     redis_client = SimpleNamespace(
         exists=MagicMock(return_value=False),
         set=MagicMock(),
+        hset=MagicMock(),
+        expire=MagicMock(),
     )
 
     with (
         patch("messaging.consumer.process_message", new=process),
         patch.object(redisConnection, "client", redis_client),
+        patch("messaging.consumer.CLASS_RESULTS_WINDOW_SIZE", 1),
     ):
         asyncio.run(process_class_results_message("18E51A0479"))
 
     assert process.await_count == 40
     assert process.await_args_list[-1] == call("18E51A0440")
+
+
+def test_windowed_sweep_stops_at_the_same_roll_number_when_results_arrive_out_of_order():
+    found = {"18E51A0403"}
+
+    async def process(roll_number):
+        # Later roll numbers finish first, so outcomes arrive out of order.
+        await asyncio.sleep((100 - int(roll_number[-2:])) / 10000)
+        return roll_number in found
+
+    redis_client = SimpleNamespace(
+        exists=MagicMock(return_value=False),
+        set=MagicMock(),
+        hset=MagicMock(),
+        expire=MagicMock(),
+    )
+    process_mock = AsyncMock(side_effect=process)
+
+    with (
+        patch("messaging.consumer.process_message", new=process_mock),
+        patch.object(redisConnection, "client", redis_client),
+        patch("messaging.consumer.CLASS_RESULTS_WINDOW_SIZE", 6),
+    ):
+        asyncio.run(process_class_results_message("18E51A0479"))
+
+    # 18E51A0423 is the 20th empty result after 18E51A0403. Scrapes already
+    # in flight behind it may finish, but never more than a window's worth.
+    assert 23 <= process_mock.await_count <= 28
+    assert process_mock.await_args_list == [
+        call(f"18E51A04{number:02d}")
+        for number in range(1, process_mock.await_count + 1)
+    ]
+    assert redis_client.set.call_count == 2
+    progress = [c.kwargs["mapping"] for c in redis_client.hset.call_args_list]
+    assert progress[0]["status"] == "running"
+    assert progress[0]["total"] == 718
+    assert any(
+        update.get("processed") == 23 and update.get("withResults") == 1
+        for update in progress
+    )
+    assert progress[-1]["status"] == "completed"
+    assert all(
+        c.args[0] == "class_results_progress:18E51A04"
+        for c in redis_client.hset.call_args_list
+    )
+
+
+def test_class_results_progress_falls_back_to_the_paired_cohort():
+    progress = {
+        b"status": b"running",
+        b"total": b"718",
+        b"processed": b"40",
+        b"withResults": b"31",
+    }
+    redis_client = SimpleNamespace(
+        hgetall=MagicMock(
+            side_effect=lambda key: progress
+            if key == "class_results_progress:18E51A04"
+            else {}
+        )
+    )
+
+    with patch.object(redisConnection, "client", redis_client):
+        response = asyncio.run(fetch_class_results_progress("19E55A0410"))
+
+    assert response == {
+        "classPrefix": "18E51A04",
+        "status": "running",
+        "total": 718,
+        "processed": 40,
+        "withResults": 31,
+    }
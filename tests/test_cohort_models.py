@@ -0,0 +1,161 @@
+import asyncio
+import json
+import random
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from config.connection import prismaConnection
+from database.cohortModels import cohortResultViews
+from database.models import studentResultViews
+from database.operations import get_class_result_views, iter_class_result_views
+from utils.helpers import isbpharmacyr22
+
+GRADES = ["O", "A+", "A", "B+", "B", "C", "D", "P", "F", "Ab", "S", "", None]
+
+
+def _student(roll_number):
+    return SimpleNamespace(
+        id=f"id-{roll_number}",
+        name=f"NAME {roll_number}",
+        rollNumber=roll_number,
+        collegeCode=roll_number[2:4],
+        fatherName=f"FATHER {roll_number}",
+        marksVersion=1,
+    )
+
+
+def _rows(roll_number, rng):
+    rows = []
+    for semester in rng.sample(["1-1", "1-2", "2-1", "2-2", "5-1"], 3):
+        for subject in range(4):
+            for exam_code in sorted(rng.sample(["1500", "1562", "1600"], 2)):
+                rows.append(
+                    {
+                        "rollNumber": roll_number,
+                        "semesterCode": semester,
+                        "examCode": exam_code,
+                        "rcrv": rng.random() < 0.2,
+                        "graceMarks": rng.random() < 0.1,
+                        "subjectCode": f"{semester}-{subject}",
+                        "subjectName": f"Subject {subject}",
+                        "internalMarks": rng.choice(["20", "07", "-", "ABSENT"]),
+                        "externalMarks": str(rng.randint(0, 70)),
+                        "totalMarks": rng.choice(["60", ""]),
+                        "grades": rng.choice(GRADES),
+                        "credits": rng.choice([3.0, 1.5, 0.0, None]),
+                    }
+                )
+    return sorted(
+        rows,
+        key=lambda row: (
+            row["semesterCode"],
+            row["examCode"],
+            row["rcrv"],
+            row["graceMarks"],
+        ),
+    )
+
+
+def _mark(row):
+    return SimpleNamespace(
+        subject=SimpleNamespace(
+            subjectCode=row["subjectCode"], subjectName=row["subjectName"]
+        ),
+        **{
+            key: value
+            for key, value in row.items()
+            if key not in ("rollNumber", "subjectCode", "subjectName")
+        },
+    )
+
+
+def test_cohort_views_match_per_student_views():
+    rng = random.Random(22)
+    students = [_student(roll) for roll in ("20J21A0501", "23J21R0001", "21J25A0502")]
+    rows_by_student = {s.rollNumber: _rows(s.rollNumber, rng) for s in students}
+    students.append(_student("20J21A0599"))
+    assert isbpharmacyr22("23J21R0001")
+
+    views = cohortResultViews(
+        students, [row for rows in rows_by_student.values() for row in rows]
+    )
+
+    assert [view["rollNumber"] for view in views] == [s.rollNumber for s in students]
+    for student, view in zip(students, views):
+        marks = [_mark(row) for row in rows_by_student.get(student.rollNumber, [])]
+        expected = studentResultViews(
+            student, marks, isbpharmacyr22(student.rollNumber)
+        )
+        assert json.dumps(view) == json.dumps(expected)
+
+
+def test_later_attempt_with_an_equal_grade_is_kept():
+    student = _student("20J21A0501")
+    first, retake = _rows("20J21A0501", random.Random(1))[:2]
+    for row, exam_code in ((first, "1500"), (retake, "1600")):
+        row.update(
+            subjectCode="A101",
+            semesterCode="1-1",
+            examCode=exam_code,
+            grades="B",
+            rcrv=False,
+            graceMarks=False,
+        )
+
+    (view,) = cohortResultViews([student], [first, retake])
+
+    (semester,) = view["results"]["semesters"]
+    assert semester["subjects"][0]["externalMarks"] == int(retake["externalMarks"])
+    assert [exam["examCode"] for exam in view["allResults"][0]["exams"]] == [
+        "1500",
+        "1600",
+    ]
+
+
+def test_class_views_are_built_from_one_mark_row_query():
+    students = [_student("20J21A0501"), _student("20J21A0502")]
+    row = _rows("20J21A0502", random.Random(3))[0]
+    query_raw = AsyncMock(side_effect=[[], [row], []])
+    prisma = SimpleNamespace(
+        query_raw=query_raw,
+        student=SimpleNamespace(find_many=AsyncMock(return_value=students)),
+        mark=MagicMock(),
+    )
+
+    with patch.object(prismaConnection, "prisma", prisma):
+        views = asyncio.run(get_class_result_views("20J21A05", "21J25A05"))
+
+    assert [view["markCount"] for view in views] == [0, 1]
+    assert json.loads(query_raw.await_args_list[1].args[1]) == [
+        "id-20J21A0501",
+        "id-20J21A0502",
+    ]
+    prisma.mark.find_many.assert_not_called()
+
+
+def test_class_views_are_paged_by_roll_number():
+    pages = [
+        [_student("20J21A0501"), _student("20J21A0502")],
+        [_student("21J25A0501")],
+    ]
+    find_many = AsyncMock(side_effect=pages)
+    prisma = SimpleNamespace(
+        query_raw=AsyncMock(return_value=[]),
+        student=SimpleNamespace(find_many=find_many),
+    )
+
+    async def collect():
+        return [
+            [view["rollNumber"] for view in chunk]
+            async for chunk in iter_class_result_views("20J21A05", "21J25A05", 2)
+        ]
+
+    with patch.object(prismaConnection, "prisma", prisma):
+        chunks = asyncio.run(collect())
+
+    assert chunks == [["20J21A0501", "20J21A0502"], ["21J25A0501"]]
+    # A short page is the last one.
+    assert [c.kwargs["where"]["rollNumber"] for c in find_many.await_args_list] == [
+        {"gt": ""},
+        {"gt": "20J21A0502"},
+    ]
@@ -0,0 +1,87 @@
+import asyncio
+import gzip
+import json
+from unittest.mock import patch
+
+from config.redisConnection import redisConnection
+from config.settings import CACHE_COMPRESSION_MIN_BYTES
+from utils.caching import LocalCache, get_cached_bytes, json_response, set_cached_bytes
+from utils.compression import PrecompressedResponseMiddleware, accepts_gzip
+
+HISTORY = {"details": {}, "results": [{"subjectCode": "A101"}] * 500}
+
+
+class _Redis:
+    def __init__(self):
+        self.values = {}
+
+    def get(self, key):
+        return self.values.get(key)
+
+    def set(self, key, value, ex=None):
+        self.values[key] = value
+
+
+def _serve(response, accept_encoding):
+    messages = []
+
+    async def receive():
+        return {"type": "http.request"}
+
+    async def send(message):
+        messages.append(message)
+
+    scope = {
+        "type": "http",
+        "headers": [(b"accept-encoding", accept_encoding.encode())],
+    }
+    asyncio.run(PrecompressedResponseMiddleware(response)(scope, receive, send))
+    start, body = messages
+    return dict(start["headers"]), body["body"]
+
+
+def test_large_payloads_are_stored_and_sent_compressed():
+    client = _Redis()
+    cache = LocalCache()
+
+    async def run():
+        stored = await set_cached_bytes("20J21A0501ALL", HISTORY, 60)
+        small = await set_cached_bytes("20J21A0501Credits", {"credits": 1}, 60)
+        cache.clear()
+        return stored, small, await get_cached_bytes("20J21A0501ALL")
+
+    with (
+        patch.object(redisConnection, "client", client),
+        patch("utils.caching.localCache", cache),
+    ):
+        stored, small, cached = asyncio.run(run())
+
+    assert len(json.dumps(HISTORY)) >= CACHE_COMPRESSION_MIN_BYTES
+    assert cached == stored == client.values["20J21A0501ALL"]
+    assert json.loads(gzip.decompress(stored)) == HISTORY
+    assert small == b'{"credits":1}'
+    assert json_response(small).headers.get("content-encoding") is None
+    assert json_response(stored).headers["content-encoding"] == "gzip"
+
+
+def test_compressed_bodies_are_decoded_only_for_clients_without_gzip():
+    body = gzip.compress(json.dumps(HISTORY).encode())
+
+    headers, sent = _serve(json_response(body), "gzip, deflate, br")
+    assert headers[b"content-encoding"] == b"gzip"
+    assert sent == body
+
+    headers, sent = _serve(json_response(body), "identity")
+    assert b"content-encoding" not in headers
+    assert json.loads(sent) == HISTORY
+    assert headers[b"content-length"] == str(len(sent)).encode()
+
+
+def test_accept_encoding_is_negotiated():
+    assert accepts_gzip("gzip, deflate, br")
+    assert accepts_gzip("br;q=1.0, gzip;q=0.8")
+    assert accepts_gzip("*")
+    assert not accepts_gzip(None)
+    assert not accepts_gzip("br")
+    assert not accepts_gzip("gzip;q=0, *")
+    assert not accepts_gzip("*;q=0")
@@ -0,0 +1,46 @@
+import asyncio
+
+from config.httpConnection import httpConnection
+from scrapers.resultScraper import ResultScraper
+
+
+def test_scrapes_reuse_the_worker_session_until_it_is_closed():
+    async def scenario():
+        await httpConnection.connect()
+        shared = httpConnection.session
+        try:
+            scraper = ResultScraper("20J21A0101", set(), set())
+            async with scraper._client_session() as first:
+                pass
+            async with scraper._client_session() as second:
+                pass
+            await httpConnection.connect()
+            assert httpConnection.session is shared
+            return first, second, shared
+        finally:
+            await httpConnection.disconnect()
+
+    first, second, shared = asyncio.run(scenario())
+
+    assert first is shared and second is shared
+    assert shared.closed
+    assert httpConnection.session is None
+
+
+def test_pool_stats_are_zero_without_an_open_session():
+    assert httpConnection.stats() == {"open": 0, "idle": 0, "waiting": 0}
+
+
+def test_pool_stats_report_configured_connector_state():
+    async def scenario():
+        await httpConnection.connect()
+        try:
+            connector = httpConnection.session.connector
+            return connector.limit_per_host, httpConnection.stats()
+        finally:
+            await httpConnection.disconnect()
+
+    limit_per_host, stats = asyncio.run(scenario())
+
+    assert limit_per_host == 30
+    assert stats == {"open": 0, "idle": 0, "waiting": 0}
@@ -0,0 +1,194 @@
+import asyncio
+import json
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from messaging.consumer import process_incremental_results_message
+from scrapers.incrementalResults import plan_incremental_work_items
+from scrapers.resultScraper import ResultScraper
+
+FIXTURES = Path(__file__).parent / "fixtures" / "results"
+HOSTS = [{"url": "http://jntuh", "up": True, "latency": 0.1, "successRate": 1.0}]
+
+
+def _exam(**overrides):
+    exam = {
+        "title": "B.Tech II Year II Semester (R22) Regular Examinations",
+        "degree": "btech",
+        "regulation": "R22",
+        "semesterCode": "2-2",
+        "examCode": "1900",
+        "rcrv": False,
+    }
+    exam.update(overrides)
+    return exam
+
+
+def test_regular_release_targets_same_regulation_cohorts_in_chunks():
+    prefixes = [f"23J21A{index:02d}" for index in range(25)] + ["21J21A05"]
+    semester_prefixes = AsyncMock(return_value=prefixes)
+
+    with (
+        patch("scrapers.incrementalResults.get_semester_cohort_prefixes", semester_prefixes),
+        patch("scrapers.incrementalResults.INCREMENTAL_PREFIXES_PER_MESSAGE", 20),
+        patch("scrapers.incrementalResults.WARMUP_MAX_STUDENTS", 0),
+    ):
+        work_items = asyncio.run(plan_incremental_work_items([_exam()]))
+
+    semester_prefixes.assert_awaited_once_with("A", ["2-2", "2-1"])
+    # 21J21A05 is an R18 cohort, so the R22 release skips it.
+    assert [len(item["prefixes"]) for item in work_items] == [20, 5]
+    assert work_items[0] == {
+        "examCode": "1900",
+        "semesterCode": "2-2",
+        "rcrv": False,
+        "degree": "btech",
+        "prefixes": prefixes[:20],
+    }
+
+
+def test_rcrv_release_targets_cohorts_that_sat_the_exam():
+    exam_prefixes = AsyncMock(return_value=["23J21A05"])
+
+    with (
+        patch("scrapers.incrementalResults.get_exam_code_cohort_prefixes", exam_prefixes),
+        patch("scrapers.incrementalResults.WARMUP_MAX_STUDENTS", 0),
+    ):
+        work_items = asyncio.run(
+            plan_incremental_work_items(
+                [_exam(rcrv=True), _exam(examCode="1901", regulation=None)]
+            )
+        )
+
+    exam_prefixes.assert_awaited_once_with("1900")
+    assert work_items == [
+        {
+            "examCode": "1900",
+            "semesterCode": "2-2",
+            "rcrv": True,
+            "degree": "btech",
+            "prefixes": ["23J21A05"],
+        }
+    ]
+
+
+def test_subscribed_students_are_warmed_up_before_the_cohorts():
+    subscribed = AsyncMock(return_value=["23J21A0507", "21J21A0501", "23J21A0412"])
+
+    with (
+        patch("scrapers.incrementalResults.get_subscribed_roll_numbers", subscribed),
+        patch(
+            "scrapers.incrementalResults.get_semester_cohort_prefixes",
+            AsyncMock(return_value=["23J21A05"]),
+        ),
+        patch("scrapers.incrementalResults.WARMUP_MAX_STUDENTS", 500),
+        patch("scrapers.incrementalResults.WARMUP_ROLL_NUMBERS_PER_MESSAGE", 1),
+    ):
+        work_items = asyncio.run(plan_incremental_work_items([_exam()]))
+
+    subscribed.assert_awaited_once_with("A", "1900", False, 500)
+    # Subscription order is kept; the R18 roll number is left out.
+    assert [item.get("rollNumbers") for item in work_items] == [
+        ["23J21A0507"],
+        ["23J21A0412"],
+        None,
+    ]
+    assert work_items[-1]["prefixes"] == ["23J21A05"]
+
+
+def test_scrape_exam_code_returns_one_semester_of_results():
+    page = (FIXTURES / "btech_regular.html").read_text()
+    scraper = ResultScraper("20J21A0501", [], [], "http://jntuh")
+    breaker = SimpleNamespace(record=AsyncMock(), is_open=AsyncMock(return_value=False))
+
+    with (
+        patch.object(scraper, "fetch_result", new=AsyncMock(return_value=page)),
+        patch("scrapers.resultScraper.upstreamCircuitBreaker", breaker),
+    ):
+        results = asyncio.run(scraper.scrape_exam_code("1900", "2-1"))
+
+    assert results["details"]["rollNo"] == "20J21A0501"
+    assert [(r["examCode"], r["semesterCode"]) for r in results["results"]] == [
+        ("1900", "2-1")
+    ]
+    assert len(results["results"][0]["subjects"]) == 9
+
+
+def test_incremental_message_saves_only_students_with_new_results():
+    scraped = {
+        "20J21A0501": {"details": {"rollNo": "20J21A0501"}, "results": [{"examCode": "1900"}]},
+        "20J21A0502": {"details": {}, "results": []},
+        "20J21A0503": None,
+    }
+
+    async def scrape_exam_code(self, exam_code, semester_code, rcrv=False):
+        return scraped[self.roll_number]
+
+    missing = AsyncMock(return_value=list(scraped))
+    save = AsyncMock(return_value=0)
+    breaker = SimpleNamespace(is_open=AsyncMock(return_value=False))
+    work_item = {
+        "examCode": "1900",
+        "semesterCode": "2-1",
+        "rcrv": False,
+        "degree": "btech",
+        "prefixes": ["20J21A05"],
+    }
+
+    with (
+        patch("messaging.consumer.get_upstream_hosts", AsyncMock(return_value=HOSTS)),
+        patch("messaging.consumer.get_students_missing_exam_code", missing),
+        patch("messaging.consumer.upstreamCircuitBreaker", breaker),
+        patch("messaging.consumer.save_to_database", save),
+        patch("messaging.consumer.invalidate_all_cache"),
+        patch.object(ResultScraper, "scrape_exam_code", new=scrape_exam_code),
+    ):
+        asyncio.run(process_incremental_results_message(json.dumps(work_item)))
+
+    missing.assert_awaited_once_with("20J21A05", "1900", False)
+    save.assert_awaited_once_with(scraped["20J21A0501"])
+
+
+def test_warmup_message_paces_scrapes_and_caches_saved_results():
+    scraped = {
+        "20J21A0501": {"details": {"rollNo": "20J21A0501"}, "results": [{"examCode": "1900"}]},
+        "20J21A0502": {"details": {}, "results": []},
+    }
+
+    async def scrape_exam_code(self, exam_code, semester_code, rcrv=False):
+        return scraped[self.roll_number]
+
+    sleep = AsyncMock()
+    cache = AsyncMock(return_value={})
+    missing = AsyncMock()
+    work_item = {
+        "examCode": "1900",
+        "semesterCode": "2-1",
+        "rcrv": False,
+        "degree": "btech",
+        "rollNumbers": list(scraped),
+    }
+
+    with (
+        patch("messaging.consumer.get_upstream_hosts", AsyncMock(return_value=HOSTS)),
+        patch("messaging.consumer.get_students_missing_exam_code", missing),
+        patch(
+            "messaging.consumer.upstreamCircuitBreaker",
+            SimpleNamespace(is_open=AsyncMock(return_value=False)),
+        ),
+        patch("messaging.consumer.save_to_database", AsyncMock(return_value=3)),
+        patch("messaging.consumer.refresh_result_view", AsyncMock()),
+        patch("messaging.consumer.invalidate_all_cache"),
+        patch("messaging.consumer.send_push_notification_to_particular_user", AsyncMock()),
+        patch("messaging.consumer.notify_student_result_updated", AsyncMock()),
+        patch("messaging.consumer.cache_results", cache),
+        patch("messaging.consumer.WARMUP_RATE_PER_SECOND", 4),
+        patch("messaging.consumer.asyncio.sleep", sleep),
+        patch.object(ResultScraper, "scrape_exam_code", new=scrape_exam_code),
+    ):
+        asyncio.run(process_incremental_results_message(json.dumps(work_item)))
+
+    missing.assert_not_awaited()
+    assert [c.args for c in sleep.await_args_list] == [(0.25,), (0.25,)]
+    cache.assert_awaited_once_with("20J21A0501")
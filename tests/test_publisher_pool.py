@@ -0,0 +1,94 @@
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+import aio_pika
+
+from messaging.publisherPool import PublisherPool
+
+
+def _channel(depths=None):
+    async def declare_queue(name, durable):
+        return SimpleNamespace(
+            declaration_result=SimpleNamespace(message_count=depths[name])
+        )
+
+    return SimpleNamespace(
+        declare_queue=AsyncMock(side_effect=declare_queue),
+        default_exchange=SimpleNamespace(publish=AsyncMock()),
+        is_closed=False,
+        close=AsyncMock(),
+    )
+
+
+def _connection(depths):
+    monitor = _channel(depths)
+    publishers = [_channel() for _ in range(2)]
+    connection = SimpleNamespace(
+        channel=AsyncMock(side_effect=[monitor, *publishers])
+    )
+    return connection, monitor, publishers
+
+
+def test_publishes_reuse_pooled_channels_without_declaring_queues():
+    connection, monitor, publishers = _connection({"results": 7})
+
+    async def run():
+        pool = PublisherPool(connection, size=2, queue_names=("results",))
+        await pool.start()
+        for roll_number in ("18E51A0401", "18E51A0402", "18E51A0403"):
+            await pool.publish("results", aio_pika.Message(body=roll_number.encode()))
+        depth = pool.queue_depth("results")
+        await pool.close()
+        return depth
+
+    # The first reading plus the three messages published since.
+    assert asyncio.run(run()) == 10
+    assert connection.channel.await_count == 3
+    monitor.declare_queue.assert_awaited_once_with("results", durable=True)
+    published = [
+        channel.default_exchange.publish.await_count for channel in publishers
+    ]
+    assert sorted(published) == [1, 2]
+
+
+def test_queue_depths_are_refreshed_in_the_background():
+    depths = {"results": 7}
+    connection, monitor, _ = _connection(depths)
+
+    async def run():
+        pool = PublisherPool(
+            connection, size=2, refresh_seconds=0.01, queue_names=("results",)
+        )
+        await pool.start()
+        depths["results"] = 4001
+        await asyncio.sleep(0.05)
+        depth = pool.queue_depth("results")
+        monitor.declare_queue.side_effect = RuntimeError("channel closed")
+        await asyncio.sleep(0.05)
+        stale_depth = pool.queue_depth("results")
+        await pool.close()
+        return depth, stale_depth
+
+    # A failed refresh keeps serving the last reading.
+    assert asyncio.run(run()) == (4001, 4001)
+
+
+def test_closed_channels_are_replaced_before_publishing():
+    closed, replacement = _channel(), _channel()
+    closed.is_closed = True
+    connection = SimpleNamespace(
+        channel=AsyncMock(side_effect=[_channel({"results": 0}), closed, replacement])
+    )
+
+    async def run():
+        pool = PublisherPool(connection, size=1, queue_names=("results",))
+        await pool.start()
+        await pool.publish("results", aio_pika.Message(body=b"18E51A0401"))
+        await pool.close()
+
+    asyncio.run(run())
+
+    closed.default_exchange.publish.assert_not_awaited()
+    replacement.default_exchange.publish.assert_awaited_once()
+    replacement.close.assert_awaited_once()
@@ -1,75 +1,48 @@
 import asyncio
+import gzip
+import json
 from types import SimpleNamespace
-from unittest.mock import ANY, AsyncMock, MagicMock, patch
+from unittest.mock import ANY, AsyncMock, MagicMock, call, patch
 
 from config.redisConnection import redisConnection
-from messaging.publisher import publish_class_results_message
+from config.settings import QUEUE_NAME, REFRESH_RESULTS_QUEUE_NAME
+from messaging.consumer import _record_scrape, process_message
+from messaging.lanes import REFRESH
+from messaging.publisher import publish_class_results_message, publish_message
 from service.getClassResults import fetch_class_results
 
 
-class _ChannelContext:
-    def __init__(self, channel):
-        self.channel = channel
-
-    async def __aenter__(self):
-        return self.channel
-
-    async def __aexit__(self, exc_type, exc_value, traceback):
-        return None
+def _publisher_app(depth=0):
+    publisher = SimpleNamespace(
+        queue_depth=MagicMock(return_value=depth), publish=AsyncMock()
+    )
+    app = SimpleNamespace(state=SimpleNamespace(rabbitmq_publisher=publisher))
+    return app, publisher
 
 
 def test_publish_class_results_message_uses_dedicated_queue():
-    exchange = SimpleNamespace(publish=AsyncMock())
-    queue = SimpleNamespace(
-        declaration_result=SimpleNamespace(message_count=4),
-    )
-    channel = SimpleNamespace(
-        declare_queue=AsyncMock(return_value=queue),
-        default_exchange=exchange,
-    )
-    connection = SimpleNamespace(
-        channel=MagicMock(return_value=_ChannelContext(channel))
-    )
-    app = SimpleNamespace(state=SimpleNamespace(rabbitmq_connection=connection))
+    app, publisher = _publisher_app(depth=4)
 
     published = asyncio.run(publish_class_results_message(app, "20J21A0101"))
 
     assert published is True
-    channel.declare_queue.assert_awaited_once_with("classresults", durable=True)
-    message = exchange.publish.await_args.args[0]
+    publisher.queue_depth.assert_called_once_with("classresults")
+    routing_key, message = publisher.publish.await_args.args
     assert message.body == b"20J21A0101"
-    assert exchange.publish.await_args.kwargs["routing_key"] == "classresults"
+    assert routing_key == "classresults"
 
 
 def test_class_results_message_is_not_published_when_queue_has_five_messages():
-    exchange = SimpleNamespace(publish=AsyncMock())
-    queue = SimpleNamespace(
-        declaration_result=SimpleNamespace(message_count=5),
-    )
-    channel = SimpleNamespace(
-        declare_queue=AsyncMock(return_value=queue),
-        default_exchange=exchange,
-    )
-    connection = SimpleNamespace(
-        channel=MagicMock(return_value=_ChannelContext(channel))
-    )
-    app = SimpleNamespace(state=SimpleNamespace(rabbitmq_connection=connection))
+    app, publisher = _publisher_app(depth=5)
 
     published = asyncio.run(publish_class_results_message(app, "20J21A0101"))
 
     assert published is False
-    exchange.publish.assert_not_awaited()
+    publisher.publish.assert_not_awaited()
 
 
 def _class_results_app():
-    queue = SimpleNamespace(
-        declaration_result=SimpleNamespace(message_count=0),
-    )
-    channel = SimpleNamespace(declare_queue=AsyncMock(return_value=queue))
-    connection = SimpleNamespace(
-        channel=MagicMock(return_value=_ChannelContext(channel))
-    )
-    return SimpleNamespace(state=SimpleNamespace(rabbitmq_connection=connection))
+    return _publisher_app()[0]
 
 
 def test_cached_class_results_are_not_published():
@@ -85,7 +58,7 @@ def test_cached_class_results_are_not_published():
             fetch_class_results(_class_results_app(), "20J21A0101", "academicresult")
         )
 
-    assert result == [{"cached": True}]
+    assert result.body == cached_results
     publish.assert_not_awaited()
 
 
@@ -100,7 +73,7 @@ def test_empty_class_results_cache_miss_is_not_published():
         patch.object(redisConnection, "client", redis_client),
         patch("service.getClassResults.publish_class_results_message", new=publish),
         patch(
-            "service.getClassResults.get_students_details",
+            "service.getClassResults.get_class_result_views",
             new=AsyncMock(return_value=[]),
         ),
     ):
@@ -108,7 +81,7 @@ def test_empty_class_results_cache_miss_is_not_published():
             fetch_class_results(_class_results_app(), "20J21A0101", "academicresult")
         )
 
-    assert result == []
+    assert json.loads(result.body) == []
     publish.assert_not_awaited()
 
 
@@ -118,25 +91,21 @@ def test_non_empty_database_class_results_are_published():
         set=MagicMock(),
     )
     publish = AsyncMock()
-    student = SimpleNamespace(marks=[])
+    view = {"details": {"rollNo": "20J21A0101"}, "markCount": 0}
 
     with (
         patch.object(redisConnection, "client", redis_client),
         patch("service.getClassResults.publish_class_results_message", new=publish),
         patch(
-            "service.getClassResults.get_students_details",
-            new=AsyncMock(return_value=[student]),
-        ),
-        patch(
-            "service.getClassResults.studentDetailsModel",
-            return_value={"rollNo": "20J21A0101"},
+            "service.getClassResults.get_class_result_views",
+            new=AsyncMock(return_value=[view]),
         ),
     ):
         result = asyncio.run(
             fetch_class_results(_class_results_app(), "20J21A0101", "academicresult")
         )
 
-    assert result == [
+    assert json.loads(result.body) == [
         {
             "details": {"rollNo": "20J21A0101"},
             "results": [],
@@ -151,28 +120,251 @@ def test_class_results_response_survives_publish_failure():
         set=MagicMock(),
     )
     publish = AsyncMock(side_effect=RuntimeError("RabbitMQ publish failed"))
-    student = SimpleNamespace(marks=[])
+    view = {"details": {"rollNo": "20J21A0101"}, "markCount": 0}
 
     with (
         patch.object(redisConnection, "client", redis_client),
         patch("service.getClassResults.publish_class_results_message", new=publish),
         patch(
-            "service.getClassResults.get_students_details",
-            new=AsyncMock(return_value=[student]),
-        ),
-        patch(
-            "service.getClassResults.studentDetailsModel",
-            return_value={"rollNo": "20J21A0101"},
+            "service.getClassResults.get_class_result_views",
+            new=AsyncMock(return_value=[view]),
         ),
     ):
         result = asyncio.run(
             fetch_class_results(_class_results_app(), "20J21A0101", "academicresult")
         )
 
-    assert result == [
+    assert json.loads(result.body) == [
         {
             "details": {"rollNo": "20J21A0101"},
             "results": [],
         }
     ]
-    redis_client.set.assert_called_once()
+    # The other set call is the single-flight lock.
+    assert [
+        c for c in redis_client.set.call_args_list
+        if c.args[0] == "20J21A01Results+academicresult"
+    ] == [call("20J21A01Results+academicresult", ANY, ex=600)]
+
+
+class _StreamRedis:
+    """Just enough of a Redis client to build a cache entry by appending."""
+
+    def __init__(self, values=None):
+        self.values = dict(values or {})
+
+    def get(self, key):
+        return self.values.get(key)
+
+    def set(self, key, value, ex=None, nx=False):
+        self.values[key] = value
+        return True
+
+    def append(self, key, value):
+        self.values[key] = self.values.get(key, b"") + value
+
+    def expire(self, key, seconds):
+        return key in self.values
+
+    def rename(self, key, new_key):
+        self.values[new_key] = self.values.pop(key)
+
+    def delete(self, key):
+        self.values.pop(key, None)
+
+
+def _stream(response):
+    async def read():
+        return [chunk async for chunk in response.body_iterator]
+
+    return asyncio.run(read())
+
+
+def test_streamed_class_results_fill_the_json_cache():
+    client = _StreamRedis()
+    publish = AsyncMock()
+    chunks = [
+        [
+            {"details": {"rollNo": "20J21A0101"}, "markCount": 1, "backlogs": {"a": 1}},
+            {"details": {"rollNo": "20J21A0102"}, "markCount": 0},
+        ],
+        [{"details": {"rollNo": "20J21A0103"}, "markCount": 1, "backlogs": {"b": 2}}],
+    ]
+
+    async def iter_views(*args):
+        for chunk in chunks:
+            yield chunk
+
+    with (
+        patch.object(redisConnection, "client", client),
+        patch("service.getClassResults.publish_class_results_message", new=publish),
+        patch("service.getClassResults.iter_class_result_views", new=iter_views),
+    ):
+        response = asyncio.run(
+            fetch_class_results(_class_results_app(), "20J21A0101", "backlog", "ndjson")
+        )
+        body = _stream(response)
+
+    assert response.media_type == "application/x-ndjson"
+    assert len(body) == 2
+    lines = [json.loads(line) for line in b"".join(body).splitlines()]
+    assert lines == [
+        {"details": {"rollNo": "20J21A0101"}, "results": {"a": 1}},
+        {"details": {"rollNo": "20J21A0102"}, "results": []},
+        {"details": {"rollNo": "20J21A0103"}, "results": {"b": 2}},
+    ]
+    assert list(client.values) == ["20J21A01Results+backlog"]
+    # The cached copy is a single gzip stream, sent as is to gzip clients.
+    cached = client.values["20J21A01Results+backlog"]
+    assert json.loads(gzip.decompress(cached)) == lines
+    publish.assert_awaited_once_with(ANY, "20J21A0101")
+
+
+def test_cut_short_class_result_stream_leaves_no_cache_entry():
+    client = _StreamRedis()
+
+    async def iter_views(*args):
+        yield [{"details": {"rollNo": "20J21A0101"}, "markCount": 0}]
+        raise RuntimeError("database went away")
+
+    with (
+        patch.object(redisConnection, "client", client),
+        patch("service.getClassResults.iter_class_result_views", new=iter_views),
+    ):
+        response = asyncio.run(
+            fetch_class_results(_class_results_app(), "20J21A0101", "backlog", "ndjson")
+        )
+        try:
+            _stream(response)
+        except RuntimeError:
+            pass
+
+    assert client.values == {}
+
+
+def test_cached_class_results_are_streamed_line_by_line():
+    client = _StreamRedis({"20J21A01Results+backlog": b'[{"a": 1}, {"b": 2}]'})
+
+    with patch.object(redisConnection, "client", client):
+        response = asyncio.run(
+            fetch_class_results(_class_results_app(), "20J21A0101", "backlog", "ndjson")
+        )
+        body = _stream(response)
+
+    assert body == [b'{"a":1}\n', b'{"b":2}\n']
+
+
+def _publish_roll_number(client, message_count=0, force=False):
+    app, publisher = _publisher_app(message_count)
+    with (
+        patch.object(redisConnection, "client", client),
+        patch("messaging.publisher.check_valid_url_in_redis", return_value="url"),
+    ):
+        response = asyncio.run(publish_message(app, "18E51A0401", force=force))
+    return response, publisher.publish
+
+
+def test_roll_number_in_progress_is_not_queued_again():
+    # Third in line; workers finished 120 scrapes in the last minute.
+    client = SimpleNamespace(
+        eval=MagicMock(return_value=[1, 2]), get=MagicMock(return_value=b"120")
+    )
+
+    response, publish = _publish_roll_number(client)
+
+    publish.assert_not_awaited()
+    assert response.status_code == 202
+    assert json.loads(response.body) == {
+        "status": "success",
+        "message": "Your roll number is already being processed.",
+        "position": 3,
+        "etaSeconds": 2,
+    }
+
+
+def test_recently_scraped_roll_number_is_not_rescraped_until_forced():
+    client = SimpleNamespace(
+        eval=MagicMock(return_value=[2, -1]), get=MagicMock(return_value=None)
+    )
+
+    response, publish = _publish_roll_number(client)
+
+    # The last scrape stored the results, so this is not a "not found".
+    publish.assert_not_awaited()
+    assert response.status_code == 202
+    assert json.loads(response.body)["position"] is None
+
+    client.eval.return_value = [0, 0]
+    response, publish = _publish_roll_number(client, force=True)
+
+    publish.assert_awaited_once()
+    assert response.status_code == 202
+    assert client.eval.call_args.args[-1] == "0"
+
+
+def test_each_lane_publishes_to_its_own_queue_within_its_own_limit():
+    client = SimpleNamespace(eval=MagicMock(return_value=[0, 0]), zrem=MagicMock())
+    app, publisher = _publisher_app(depth=1500)
+
+    with (
+        patch.object(redisConnection, "client", client),
+        patch("messaging.publisher.check_valid_url_in_redis", return_value="url"),
+    ):
+        interactive = asyncio.run(publish_message(app, "18E51A0401"))
+        refresh = asyncio.run(publish_message(app, "18E51A0402", lane=REFRESH))
+
+    assert interactive.status_code == 202
+    assert refresh.status_code == 429
+    assert [c.args[0] for c in publisher.queue_depth.call_args_list] == [
+        QUEUE_NAME,
+        REFRESH_RESULTS_QUEUE_NAME,
+    ]
+    assert publisher.publish.await_args.args[0] == QUEUE_NAME
+
+
+def test_roll_number_claim_is_released_when_the_queue_is_full():
+    client = SimpleNamespace(eval=MagicMock(return_value=[0, 0]), zrem=MagicMock())
+
+    response, publish = _publish_roll_number(client, message_count=4001)
+
+    assert response.status_code == 429
+    client.zrem.assert_called_once_with("rabbitmq_roll_numbers", "18E51A0401")
+
+
+def test_successful_scrape_releases_the_claim_and_marks_the_roll_number():
+    client = SimpleNamespace(
+        get=MagicMock(return_value=b"3"),
+        zrem=MagicMock(),
+        incr=MagicMock(),
+        expire=MagicMock(),
+        set=MagicMock(),
+    )
+
+    with patch.object(redisConnection, "client", client):
+        asyncio.run(_record_scrape("18E51A0401", scraped=True))
+
+    client.zrem.assert_called_once_with("rabbitmq_roll_numbers", "18E51A0401")
+    client.set.assert_called_once_with(
+        "recently_scraped:18E51A0401", b"3", ex=900
+    )
+    client.get.assert_called_once_with("results_release_generation")
+
+
+def test_a_scrape_whose_save_fails_is_not_marked_recently_scraped():
+    scrape = {"details": {"rollNo": "18E51A0401"}, "results": []}
+
+    with (
+        patch(
+            "messaging.consumer.scrape_roll_number", new=AsyncMock(return_value=scrape)
+        ),
+        patch(
+            "messaging.consumer.save_to_database",
+            new=AsyncMock(side_effect=RuntimeError("connection reset")),
+        ),
+        patch("messaging.consumer._notify_saved", new=AsyncMock()) as notify,
+    ):
+        scraped = asyncio.run(process_message("18E51A0401"))
+
+    # _record_scrape only writes the marker for a scrape reported as saved.
+    assert scraped is False
+    notify.assert_not_awaited()
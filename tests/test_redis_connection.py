@@ -0,0 +1,79 @@
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, call, patch
+
+import redis.asyncio as aioredis
+
+from config.redisConnection import RedisConnection, redisConnection
+from config.settings import REDIS_MAX_CONNECTIONS, REDIS_POOL_TIMEOUT_SECONDS
+from utils.caching import invalidate_all_cache
+
+
+def test_aio_prefers_the_asyncio_pool():
+    connection = RedisConnection()
+    connection.client = SimpleNamespace(get=MagicMock())
+    connection.async_client = SimpleNamespace(get=AsyncMock(return_value=b"1"))
+
+    assert asyncio.run(connection.aio.get("key")) == b"1"
+    connection.client.get.assert_not_called()
+
+
+def test_a_full_asyncio_pool_makes_commands_wait_for_a_connection():
+    connection = RedisConnection()
+    connection.redis_url = "redis://localhost:6379/0"
+
+    with patch("config.redisConnection.redis.Redis.from_url"):
+        connection.connect()
+
+    pool = connection.async_client.connection_pool
+    assert isinstance(pool, aioredis.BlockingConnectionPool)
+    assert pool.max_connections == REDIS_MAX_CONNECTIONS
+    assert pool.timeout == REDIS_POOL_TIMEOUT_SECONDS
+
+
+def test_aio_falls_back_to_the_blocking_client_until_the_pool_exists():
+    connection = RedisConnection()
+    assert not connection.aio
+
+    connection.client = SimpleNamespace(
+        get=MagicMock(return_value=b"1"), hset=MagicMock(), expire=MagicMock()
+    )
+
+    async def run():
+        value = await connection.aio.get("key")
+        results = await (
+            connection.aio.pipeline()
+            .hset("progress", mapping={"status": "running"})
+            .expire("progress", 60)
+            .execute()
+        )
+        return value, results
+
+    value, results = asyncio.run(run())
+
+    assert value == b"1"
+    assert len(results) == 2
+    connection.client.hset.assert_called_once_with(
+        "progress", mapping={"status": "running"}
+    )
+    connection.client.expire.assert_called_once_with("progress", 60)
+
+
+def test_invalidate_all_cache_unlinks_every_view_in_one_call():
+    client = SimpleNamespace(
+        unlink=MagicMock(), delete=MagicMock(), publish=MagicMock()
+    )
+
+    with patch.object(redisConnection, "client", client):
+        asyncio.run(invalidate_all_cache("18E51A0401"))
+
+    assert client.unlink.call_args_list == [
+        call(
+            "18E51A0401RequiredCredits",
+            "18E51A0401Backlogs",
+            "18E51A0401ALL",
+            "18E51A0401Results",
+        )
+    ]
+    client.delete.assert_not_called()
+    client.publish.assert_called_once()
@@ -0,0 +1,44 @@
+import asyncio
+import json
+from pathlib import Path
+
+import pytest
+
+from scrapers.resultParser import parse_result_page
+from scrapers.resultScraper import ResultScraper
+
+FIXTURES = Path(__file__).parent / "fixtures" / "results"
+PAGES = sorted(FIXTURES.glob("*.html"))
+
+
+@pytest.mark.parametrize("page", PAGES, ids=[page.stem for page in PAGES])
+def test_scrape_results_matches_the_beautifulsoup_snapshot(page):
+    # Snapshots were recorded from the BeautifulSoup implementation this
+    # parser replaced, including its quirks on malformed pages.
+    expected = json.loads(page.with_suffix(".json").read_text())
+    scraper = ResultScraper("20J21A0501", [], [])
+
+    asyncio.run(scraper.scrape_results("1500", page.read_text()))
+
+    assert {
+        "details": scraper.results["details"],
+        "examCodeResults": scraper.exam_code_results,
+        "failedExamCodes": scraper.failed_exam_codes,
+    } == expected
+
+
+def test_parse_result_page_reports_errors_instead_of_raising():
+    page = parse_result_page("")
+
+    assert page["details"] is None
+    assert page["error"]
+
+
+def test_parse_result_page_accepts_an_xml_encoding_declaration():
+    html = (FIXTURES / "rcrv_change_in_grade.html").read_text()
+
+    page = parse_result_page('<?xml version="1.0" encoding="UTF-8"?>\n' + html)
+
+    assert page["error"] is None
+    assert page["rcrv"] is True
+    assert [s["subjectCode"] for s in page["subjects"]] == ["MA201BS", "CH202BS"]
@@ -0,0 +1,111 @@
+import asyncio
+import json
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
+
+from config.connection import prismaConnection
+from config.redisConnection import redisConnection
+from database.models import (
+    RESULT_VIEW_VERSION,
+    studentBacklogs,
+    studentResultViews,
+    studentResultsModel,
+)
+from database.operations import get_result_view
+from service.getBacklogsService import fetch_backlogs
+
+STUDENT = SimpleNamespace(
+    name="A STUDENT",
+    rollNumber="20J21A0501",
+    collegeCode="J2",
+    fatherName="A FATHER",
+    marksVersion=3,
+)
+
+
+def _mark(code, grade, examCode="1500", credits=3.0):
+    return SimpleNamespace(
+        subject=SimpleNamespace(subjectCode=code, subjectName=f"Subject {code}"),
+        semesterCode="1-1",
+        examCode=examCode,
+        internalMarks="20",
+        externalMarks="40",
+        totalMarks="60",
+        grades=grade,
+        credits=credits,
+        rcrv=False,
+        graceMarks=False,
+    )
+
+
+def test_views_match_the_models_they_replace():
+    marks = [_mark("A101", "F"), _mark("A102", "B"), _mark("A101", "C", "1600")]
+
+    view = studentResultViews(STUDENT, marks)
+
+    assert view["version"] == RESULT_VIEW_VERSION
+    assert view["markCount"] == 3
+    assert view["results"] == studentResultsModel(marks)
+    assert view["backlogs"] == studentBacklogs(marks, False)
+    assert len(view["allResults"][0]["exams"]) == 2
+
+
+def test_backlog_summary_leaves_the_consolidated_sheet_whole():
+    view = studentResultViews(STUDENT, [_mark("A101", "F"), _mark("A102", "B")])
+
+    assert len(view["results"]["semesters"][0]["subjects"]) == 2
+    assert [s["subjectCode"] for s in view["backlogs"]["semesters"][0]["subjects"]] == [
+        "A101"
+    ]
+
+
+def test_missing_views_are_rebuilt_from_marks_and_stored():
+    query_raw = AsyncMock(return_value=[])
+    marks = [_mark("A101", "F")]
+
+    with (
+        patch.object(
+            prismaConnection, "prisma", SimpleNamespace(query_raw=query_raw)
+        ),
+        patch(
+            "database.operations.get_details",
+            AsyncMock(return_value=[STUDENT, marks]),
+        ),
+    ):
+        view = asyncio.run(get_result_view("20J21A0501"))
+
+    assert view["backlogs"]["totalBacklogs"] == 1
+    (stored,) = json.loads(query_raw.await_args_list[1].args[1])
+    assert stored["rollNumber"] == "20J21A0501"
+    # Stored only if the student's marks are still at the version it was built from.
+    assert stored["marksVersion"] == 3
+    assert stored["backlogs"] == view["backlogs"]
+
+
+def test_read_endpoints_serve_stored_views_without_loading_marks():
+    row = {
+        "rollNumber": "20J21A0501",
+        "markCount": 1,
+        "details": json.dumps({"rollNumber": "20J21A0501"}),
+        "results": "{}",
+        "allResults": "[]",
+        "backlogs": json.dumps({"semesters": [], "totalBacklogs": 0}),
+    }
+    get_details = AsyncMock()
+
+    with (
+        patch.object(
+            prismaConnection,
+            "prisma",
+            SimpleNamespace(query_raw=AsyncMock(return_value=[row])),
+        ),
+        patch("database.operations.get_details", get_details),
+        patch.object(redisConnection, "client", None),
+    ):
+        result = asyncio.run(fetch_backlogs(None, "20J21A0501"))
+
+    assert json.loads(result.body) == {
+        "details": {"rollNumber": "20J21A0501"},
+        "results": {"semesters": [], "totalBacklogs": 0},
+    }
+    get_details.assert_not_awaited()
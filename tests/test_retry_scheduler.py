@@ -0,0 +1,188 @@
+import asyncio
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from config.redisConnection import redisConnection
+from messaging.consumer import process_class_results_message
+from scrapers.resultScraper import ResultScraper
+from scrapers.retryScheduler import RetryScheduler, UpstreamCircuitBreaker
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+def _full_jitter(low, high):
+    return high
+
+
+def test_scheduler_backs_off_exponentially_up_to_the_cap():
+    clock = _Clock()
+    scheduler = RetryScheduler(
+        budget=10, max_attempts=10, base_delay=1, max_delay=5,
+        clock=clock, jitter=_full_jitter,
+    )
+
+    delays = []
+    for _ in range(4):
+        assert scheduler.schedule(["1500"]) == []
+        delays.append(scheduler.next_delay())
+        clock.now += delays[-1]
+        assert scheduler.pop_due() == ["1500"]
+
+    assert delays == [1, 2, 4, 5]
+    assert scheduler.request_timeout("1500") > scheduler.request_timeout("1510")
+
+
+def test_scheduler_only_releases_codes_whose_delay_has_elapsed():
+    clock = _Clock()
+    jitters = iter([0.5, 3.0])
+    scheduler = RetryScheduler(
+        clock=clock, jitter=lambda low, high: next(jitters)
+    )
+    scheduler.schedule(["1500", "1510"])
+
+    assert scheduler.next_delay() == 0.5
+    clock.now += 0.5
+    assert scheduler.pop_due() == ["1500"]
+    assert scheduler.pending
+
+
+def test_scheduler_reports_codes_once_attempts_or_budget_run_out():
+    scheduler = RetryScheduler(budget=3, max_attempts=2, clock=_Clock())
+
+    assert scheduler.schedule(["1500", "1510"]) == []
+    scheduler.pop_due()
+    assert scheduler.schedule(["1500", "1510"]) == ["1510"]
+    scheduler.pop_due()
+    assert scheduler.schedule(["1500"]) == ["1500"]
+
+
+def _breaker_client(requests, errors):
+    return SimpleNamespace(
+        incrby=MagicMock(side_effect=[requests, errors]),
+        expire=MagicMock(return_value=True),
+        set=MagicMock(return_value=True),
+    )
+
+
+def test_breaker_opens_once_the_window_error_rate_crosses_the_threshold():
+    breaker = UpstreamCircuitBreaker(
+        error_rate=0.5, min_requests=40, window_seconds=30, cooldown_seconds=60
+    )
+
+    quiet = _breaker_client(requests=39, errors=39)
+    with patch.object(redisConnection, "client", quiet):
+        asyncio.run(breaker.record(0, 5))
+    quiet.set.assert_not_called()
+
+    failing = _breaker_client(requests=40, errors=20)
+    with patch.object(redisConnection, "client", failing):
+        asyncio.run(breaker.record(2, 3))
+    failing.set.assert_called_once_with(
+        UpstreamCircuitBreaker.OPEN_KEY, "1", ex=60, nx=True
+    )
+
+
+def _scraper():
+    scraper = ResultScraper("20J21A0101", [], [], "results.jntuh.ac.in")
+    scraper.retry_scheduler = RetryScheduler(jitter=lambda low, high: 0)
+    return scraper
+
+
+def test_breaker_counts_requests_sent_and_not_exam_codes():
+    # 1500 is stored in both forms, so it sends no request at all.
+    scraper = ResultScraper("20J21A0101", ["1500"], ["1500"])
+
+    async def fetch_result(session, exam_code, payload):
+        if exam_code == "1510" and payload == scraper.payloads["btech"][1]:
+            raise TimeoutError("upstream timed out")
+        return "Enter HallTicket Number"
+
+    @asynccontextmanager
+    async def session():
+        yield None
+
+    breaker = SimpleNamespace(record=AsyncMock())
+    with (
+        patch(
+            "scrapers.resultScraper.load_exam_codes",
+            new=AsyncMock(return_value={"1-1": ["1500", "1510"], "1-2": ["1520"]}),
+        ),
+        patch.object(scraper, "fetch_result", new=fetch_result),
+        patch.object(scraper, "_client_session", new=session),
+        patch("scrapers.resultScraper.upstreamCircuitBreaker", breaker),
+    ):
+        asyncio.run(scraper.scrape_all_results())
+
+    breaker.record.assert_awaited_once_with(3, 1)
+    assert scraper.failed_exam_codes == ["1510"]
+
+
+def test_run_retries_failed_codes_until_they_succeed():
+    scraper = _scraper()
+    rounds = [["1500", "1510"], ["1510"], []]
+
+    async def scrape(failed_exam_codes=[]):
+        scraper.failed_exam_codes = rounds.pop(0)
+        scraper.results["details"] = {"rollNo": scraper.roll_number}
+
+    scrape_all = AsyncMock(side_effect=scrape)
+    breaker = SimpleNamespace(is_open=AsyncMock(return_value=False))
+    with (
+        patch.object(scraper, "scrape_all_results", new=scrape_all),
+        patch("scrapers.resultScraper.upstreamCircuitBreaker", breaker),
+    ):
+        results = asyncio.run(scraper.run())
+
+    assert results is scraper.results
+    assert [c.args for c in scrape_all.await_args_list] == [
+        (),
+        (["1500", "1510"],),
+        (["1510"],),
+    ]
+
+
+def test_run_gives_up_when_the_breaker_is_open():
+    scraper = _scraper()
+
+    async def scrape(failed_exam_codes=[]):
+        scraper.failed_exam_codes = ["1500"]
+
+    scrape_all = AsyncMock(side_effect=scrape)
+    breaker = SimpleNamespace(is_open=AsyncMock(return_value=True))
+    with (
+        patch.object(scraper, "scrape_all_results", new=scrape_all),
+        patch("scrapers.resultScraper.upstreamCircuitBreaker", breaker),
+    ):
+        assert asyncio.run(scraper.run()) is None
+
+    scrape_all.assert_awaited_once()
+
+
+def test_class_results_are_left_unmarked_when_the_breaker_opens():
+    process = AsyncMock(return_value=False)
+    redis_client = SimpleNamespace(
+        exists=MagicMock(return_value=False),
+        set=MagicMock(),
+        hset=MagicMock(),
+        expire=MagicMock(),
+    )
+    breaker = SimpleNamespace(is_open=AsyncMock(side_effect=[False, False, True]))
+
+    with (
+        patch("messaging.consumer.process_message", new=process),
+        patch("messaging.consumer.upstreamCircuitBreaker", breaker),
+        patch.object(redisConnection, "client", redis_client),
+        patch("messaging.consumer.CLASS_RESULTS_WINDOW_SIZE", 1),
+    ):
+        asyncio.run(process_class_results_message("18E51A0479"))
+
+    assert process.await_count == 2
+    redis_client.set.assert_not_called()
+    assert redis_client.hset.call_args.kwargs["mapping"]["status"] == "aborted"
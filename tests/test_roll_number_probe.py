@@ -0,0 +1,142 @@
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from config.redisConnection import redisConnection
+from scrapers.resultScraper import ResultScraper
+from scrapers.rollNumberProbe import (
+    ClassCohort,
+    load_class_cohort,
+    scrape_class_roll_number,
+)
+
+HOSTS = [{"url": "http://jntuh", "up": True, "latency": 0.1, "successRate": 1.0}]
+
+
+def _redis_client(gaps=()):
+    return SimpleNamespace(
+        smembers=MagicMock(return_value=set(gaps)),
+        sadd=MagicMock(),
+        expire=MagicMock(),
+    )
+
+
+def _scrape(roll_number, cohort, process, probe_result=None):
+    probe = AsyncMock(return_value=probe_result)
+    with (
+        patch(
+            "scrapers.rollNumberProbe.get_upstream_hosts",
+            AsyncMock(return_value=HOSTS),
+        ),
+        patch.object(ResultScraper, "probe", new=probe),
+    ):
+        has_results = asyncio.run(scrape_class_roll_number(roll_number, cohort, process))
+    return has_results, probe
+
+
+def test_known_students_are_scraped_without_a_probe():
+    cohort = ClassCohort("18E51A04", {"18E51A0401"}, probe_exam_code="1500")
+    process = AsyncMock(return_value=True)
+
+    has_results, probe = _scrape("18E51A0401", cohort, process)
+
+    assert has_results is True
+    probe.assert_not_awaited()
+    process.assert_awaited_once_with("18E51A0401")
+
+
+def test_missing_roll_numbers_are_recorded_as_gaps_and_skipped_next_time():
+    cohort = ClassCohort("18E51A04", probe_exam_code="1500")
+    process = AsyncMock(return_value=True)
+    redis_client = _redis_client()
+
+    with patch.object(redisConnection, "client", redis_client):
+        first, probe = _scrape("18E51A04Z9", cohort, process, probe_result=False)
+        second, second_probe = _scrape("18E51A04Z9", cohort, process)
+
+    assert (first, second) == (False, False)
+    probe.assert_awaited_once_with("1500")
+    second_probe.assert_not_awaited()
+    process.assert_not_awaited()
+    redis_client.sadd.assert_called_once_with(
+        "class_results_gaps:18E51A04", "18E51A04Z9"
+    )
+
+
+def test_unanswered_probe_falls_back_to_a_full_scrape():
+    cohort = ClassCohort("18E51A04", probe_exam_code="1500")
+    process = AsyncMock(return_value=False)
+
+    has_results, _ = _scrape("18E51A0450", cohort, process, probe_result=None)
+
+    assert has_results is False
+    process.assert_awaited_once_with("18E51A0450")
+    assert cohort.gaps == set()
+
+
+def test_first_student_found_teaches_the_cohort_its_probe_exam_code():
+    cohort = ClassCohort("18E51A04")
+    process = AsyncMock(return_value=True)
+
+    with patch(
+        "scrapers.rollNumberProbe.get_cohort_probe_exam_code",
+        new=AsyncMock(return_value="1500"),
+    ):
+        _, probe = _scrape("18E51A0401", cohort, process)
+
+    probe.assert_not_awaited()
+    assert cohort.probe_exam_code == "1500"
+
+
+def test_load_class_cohort_forgets_gaps_that_have_since_been_scraped():
+    redis_client = _redis_client({b"18E51A0402", b"18E51A0403"})
+
+    with (
+        patch.object(redisConnection, "client", redis_client),
+        patch(
+            "scrapers.rollNumberProbe.get_cohort_roll_numbers",
+            new=AsyncMock(return_value={"18E51A0401", "18E51A0402"}),
+        ),
+        patch(
+            "scrapers.rollNumberProbe.get_cohort_probe_exam_code",
+            new=AsyncMock(return_value="1500"),
+        ),
+    ):
+        cohort = asyncio.run(load_class_cohort("18E51A04"))
+
+    assert cohort.gaps == {"18E51A0403"}
+    assert cohort.probe_exam_code == "1500"
+
+
+def test_probe_reads_a_single_result_page():
+    scraper = ResultScraper("18E51A04Z9", [], [], "http://jntuh")
+    fetch = AsyncMock(return_value="<h3>Enter HallTicket Number</h3>")
+    breaker = SimpleNamespace(record=AsyncMock())
+
+    with (
+        patch.object(scraper, "fetch_result", new=fetch),
+        patch("scrapers.resultScraper.upstreamCircuitBreaker", breaker),
+    ):
+        assert asyncio.run(scraper.probe("1500")) is False
+
+    fetch.assert_awaited_once()
+    assert fetch.await_args.args[1] == "1500"
+    breaker.record.assert_awaited_once_with(1, 0)
+
+
+def test_probe_only_reports_missing_for_the_not_found_form():
+    scraper = ResultScraper("18E51A0401", [], [], "http://jntuh")
+    pages = [
+        "<th>SUBJECT CODE</th>",
+        "<h1>Server is busy, please try again</h1>",
+        "<html><body><table>",
+    ]
+    breaker = SimpleNamespace(record=AsyncMock())
+
+    with (
+        patch.object(scraper, "fetch_result", new=AsyncMock(side_effect=pages)),
+        patch("scrapers.resultScraper.upstreamCircuitBreaker", breaker),
+    ):
+        answers = [asyncio.run(scraper.probe("1500")) for _ in pages]
+
+    assert answers == [True, None, None]
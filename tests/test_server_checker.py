@@ -0,0 +1,90 @@
+import asyncio
+import json
+import random
+from collections import Counter
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from config.redisConnection import redisConnection
+from config.settings import REDIS_URL_KEY, UPSTREAM_HOSTS_KEY
+from scrapers.serverChecker import (
+    RESULT_HOSTS,
+    check_valid_url_in_redis,
+    choose_host,
+    get_upstream_hosts,
+    rank_hosts,
+)
+
+PRIMARY, MIRROR = RESULT_HOSTS
+
+
+class _Redis:
+    """Just enough of a Redis client for get / set."""
+
+    def __init__(self, values=None):
+        self.values = dict(values or {})
+
+    def get(self, key):
+        return self.values.get(key)
+
+    def set(self, key, value, ex=None, px=None, nx=False):
+        if nx and key in self.values:
+            return None
+        self.values[key] = value
+        return True
+
+
+def test_probe_rounds_update_moving_averages_and_rank_hosts():
+    first = rank_hosts([], {PRIMARY: 0.4, MIRROR: 0.1})
+    assert [host["url"] for host in first] == [MIRROR, PRIMARY]
+
+    second = rank_hosts(first, {PRIMARY: 0.4, MIRROR: None})
+    mirror = next(host for host in second if host["url"] == MIRROR)
+
+    # A failed probe takes the host out and counts as a timeout-long response.
+    assert [host["url"] for host in second] == [PRIMARY, MIRROR]
+    assert mirror == {"url": MIRROR, "up": False, "latency": 1.57, "successRate": 0.7}
+
+
+def test_requests_are_spread_by_success_rate_over_latency():
+    hosts = [
+        {"url": PRIMARY, "up": True, "latency": 0.1, "successRate": 1.0},
+        {"url": MIRROR, "up": True, "latency": 0.3, "successRate": 1.0},
+    ]
+    random.seed(7)
+
+    picks = Counter(choose_host(hosts) for _ in range(4000))
+
+    assert 2.5 < picks[PRIMARY] / picks[MIRROR] < 3.5
+
+
+def test_scrapes_read_the_published_ranking_and_probe_only_without_one():
+    client = _Redis()
+    latencies = {PRIMARY: None, MIRROR: 0.2}
+    probe = AsyncMock(side_effect=lambda session, url: latencies[url])
+
+    with (
+        patch.object(redisConnection, "client", client),
+        patch("scrapers.serverChecker._probe", probe),
+    ):
+        cold = asyncio.run(get_upstream_hosts())
+        warm = asyncio.run(get_upstream_hosts())
+
+    assert [host["url"] for host in cold] == [host["url"] for host in warm] == [MIRROR]
+    assert probe.await_count == 2
+    assert client.values[REDIS_URL_KEY] == MIRROR
+    assert len(json.loads(client.values[UPSTREAM_HOSTS_KEY])) == 2
+
+
+def test_the_cached_url_is_read_from_the_asyncio_pool():
+    blocking_client = SimpleNamespace(get=MagicMock())
+    async_client = SimpleNamespace(get=AsyncMock(return_value=PRIMARY.encode()))
+
+    with (
+        patch.object(redisConnection, "client", blocking_client),
+        patch.object(redisConnection, "async_client", async_client),
+    ):
+        assert asyncio.run(check_valid_url_in_redis()) == PRIMARY
+
+    async_client.get.assert_awaited_once_with(REDIS_URL_KEY)
+    blocking_client.get.assert_not_called()
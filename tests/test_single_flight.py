@@ -0,0 +1,83 @@
+import asyncio
+import json
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from fastapi.responses import JSONResponse
+
+from config.redisConnection import redisConnection
+from utils.singleFlight import single_flight
+
+
+def test_concurrent_misses_in_a_process_share_one_rebuild():
+    rebuild = AsyncMock(return_value={"details": {"rollNo": "18E51A0401"}})
+
+    async def run():
+        return await asyncio.gather(
+            *(single_flight("18E51A0401ALL", rebuild) for _ in range(20))
+        )
+
+    with patch.object(redisConnection, "client", None):
+        results = asyncio.run(run())
+
+    rebuild.assert_awaited_once()
+    assert results[0] == results[-1] == {"details": {"rollNo": "18E51A0401"}}
+    # Every caller gets its own copy to mutate.
+    assert results[0] is not results[-1]
+
+
+def _lock_held_client(result=None):
+    return SimpleNamespace(
+        set=MagicMock(return_value=False),
+        get=MagicMock(return_value=result),
+        exists=MagicMock(return_value=1),
+    )
+
+
+def test_follower_process_returns_the_leaders_result():
+    envelope = json.dumps({"statusCode": 202, "content": {"status": "success"}})
+    client = _lock_held_client(result=envelope)
+    rebuild = AsyncMock()
+
+    with (
+        patch.object(redisConnection, "client", client),
+        patch("utils.singleFlight.SINGLE_FLIGHT_POLL_SECONDS", 0),
+    ):
+        response = asyncio.run(single_flight("18E51A0401Results", rebuild))
+
+    rebuild.assert_not_awaited()
+    assert isinstance(response, JSONResponse)
+    assert response.status_code == 202
+    assert json.loads(response.body) == {"status": "success"}
+
+
+def test_follower_rebuilds_itself_when_the_leader_is_too_slow():
+    client = _lock_held_client()
+    rebuild = AsyncMock(return_value=[])
+
+    with (
+        patch.object(redisConnection, "client", client),
+        patch("utils.singleFlight.SINGLE_FLIGHT_POLL_SECONDS", 0),
+        patch("utils.singleFlight.SINGLE_FLIGHT_WAIT_SECONDS", 0.01),
+    ):
+        assert asyncio.run(single_flight("18E51A04Results+backlog", rebuild)) == []
+
+    rebuild.assert_awaited_once()
+
+
+def test_leader_publishes_its_result_and_releases_the_lock():
+    client = SimpleNamespace(
+        set=MagicMock(return_value=True), delete=MagicMock(), eval=MagicMock()
+    )
+
+    with patch.object(redisConnection, "client", client):
+        asyncio.run(single_flight("18E51A0401Backlogs", AsyncMock(return_value={"a": 1})))
+
+    lock_call, result_call = client.set.call_args_list
+    assert lock_call.args[0] == "singleflight:lock:18E51A0401Backlogs"
+    assert lock_call.kwargs == {"ex": 10, "nx": True}
+    assert result_call.args == (
+        "singleflight:result:18E51A0401Backlogs",
+        json.dumps({"content": {"a": 1}}),
+    )
+    assert client.eval.call_args.args[2] == "singleflight:lock:18E51A0401Backlogs"
@@ -0,0 +1,116 @@
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from config.redisConnection import redisConnection
+from messaging.lanes import BACKGROUND, scrape_lane
+from scrapers.upstreamGovernor import ACQUIRE_SCRIPT, UpstreamGovernor
+
+
+def _redis_client(script):
+    return SimpleNamespace(
+        register_script=MagicMock(return_value=script),
+        zrem=MagicMock(),
+        hset=MagicMock(),
+    )
+
+
+def test_slot_waits_for_the_governor_and_releases_its_lease():
+    script = MagicMock(side_effect=[120, 0])
+    client = _redis_client(script)
+    governor = UpstreamGovernor(rate=5, burst=10, concurrency=2, lease_seconds=30)
+    sleep = AsyncMock()
+
+    async def run():
+        async with governor.slot("http://results.jntuh.ac.in/resultAction"):
+            client.zrem.assert_not_called()
+
+    with (
+        patch.object(redisConnection, "client", client),
+        patch("scrapers.upstreamGovernor.asyncio.sleep", new=sleep),
+    ):
+        asyncio.run(run())
+
+    client.register_script.assert_called_once_with(ACQUIRE_SCRIPT)
+    assert script.call_count == 2
+    keys = script.call_args.kwargs["keys"]
+    args = script.call_args.kwargs["args"]
+    assert keys == [
+        "upstream_governor:results.jntuh.ac.in:tokens",
+        "upstream_governor:results.jntuh.ac.in:leases",
+        "upstream_governor:limits",
+    ]
+    assert args[:3] == [5, 10, 2]
+    assert args[4] == 30000
+    assert 0.12 <= sleep.await_args.args[0] <= 0.18
+    client.zrem.assert_called_once_with(
+        "upstream_governor:results.jntuh.ac.in:leases", args[3]
+    )
+
+
+def test_background_scrapes_leave_headroom_for_higher_lanes():
+    script = MagicMock(return_value=0)
+    client = _redis_client(script)
+    governor = UpstreamGovernor()
+
+    async def run():
+        async with governor.slot("http://results.jntuh.ac.in/resultAction"):
+            pass
+        scrape_lane.set(BACKGROUND)
+        async with governor.slot("http://results.jntuh.ac.in/resultAction"):
+            pass
+
+    with patch.object(redisConnection, "client", client):
+        asyncio.run(run())
+
+    interactive, background = script.call_args_list
+    assert interactive.kwargs["args"][5] == 0.0
+    assert background.kwargs["args"][5] == 0.3
+
+
+def test_governor_lets_requests_through_when_redis_fails():
+    script = MagicMock(side_effect=ConnectionError("redis down"))
+    client = _redis_client(script)
+    governor = UpstreamGovernor()
+
+    with patch.object(redisConnection, "client", client):
+        lease = asyncio.run(governor.acquire("results.jntuh.ac.in"))
+
+    assert lease is None
+    asyncio.run(governor.release("results.jntuh.ac.in", lease))
+    client.zrem.assert_not_called()
+
+
+def test_governor_runs_on_the_asyncio_pool_once_it_exists():
+    script = AsyncMock(return_value=0)
+    async_client = SimpleNamespace(
+        register_script=MagicMock(return_value=script), zrem=AsyncMock()
+    )
+    blocking_client = _redis_client(MagicMock())
+    governor = UpstreamGovernor()
+
+    async def run():
+        async with governor.slot("http://results.jntuh.ac.in/resultAction"):
+            pass
+
+    with (
+        patch.object(redisConnection, "client", blocking_client),
+        patch.object(redisConnection, "async_client", async_client),
+    ):
+        asyncio.run(run())
+
+    script.assert_awaited_once()
+    async_client.zrem.assert_awaited_once()
+    blocking_client.register_script.assert_not_called()
+    blocking_client.zrem.assert_not_called()
+
+
+def test_set_limits_only_writes_the_given_fields():
+    client = _redis_client(MagicMock())
+
+    with patch.object(redisConnection, "client", client):
+        asyncio.run(UpstreamGovernor().set_limits(rate=12.5, concurrency=8))
+
+    client.hset.assert_called_once_with(
+        UpstreamGovernor.LIMITS_KEY, mapping={"rate": 12.5, "concurrency": 8}
+    )
@@ -0,0 +1,133 @@
+import asyncio
+import multiprocessing
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from messaging.supervisor import (
+    WorkerSupervisor,
+    desired_processes,
+    wanted_processes,
+)
+from messaging.workerStats import WorkerStats
+
+
+def test_backlog_and_upstream_health_decide_the_wanted_processes():
+    # One process per 200 waiting roll numbers plus one per background message.
+    assert wanted_processes(0, 0, True, minimum=1, backlog_per_process=200) == 1
+    assert wanted_processes(401, 2, True, minimum=1, backlog_per_process=200) == 5
+    assert wanted_processes(5000, 2, False, minimum=2, backlog_per_process=200) == 2
+
+
+def test_pool_grows_at_once_and_shrinks_one_process_at_a_time():
+    assert desired_processes(12, current=1, minimum=1, maximum=8) == 8
+    assert desired_processes(1, current=8, minimum=1, maximum=8) == 7
+    assert desired_processes(3, current=3, minimum=1, maximum=8) == 3
+
+
+class _Process:
+    def __init__(self, target, args, name, daemon):
+        self.args = args
+        self.alive = False
+        self.exitcode = None
+        self.pid = 1000 + args[0]
+
+    def start(self):
+        self.alive = True
+
+    def is_alive(self):
+        return self.alive
+
+    def terminate(self):
+        self.alive = False
+
+    def join(self, timeout=None):
+        pass
+
+    kill = terminate
+
+
+def _supervisor():
+    context = SimpleNamespace(
+        Process=_Process, RawValue=multiprocessing.get_context("spawn").RawValue
+    )
+    return WorkerSupervisor(minimum=1, maximum=4, interval=1, context=context)
+
+
+def test_supervisor_scales_and_restarts_worker_processes():
+    supervisor = _supervisor()
+
+    async def run():
+        await supervisor.scale_to(3)
+        started = {slot: w.process for slot, w in supervisor._workers.items()}
+        started[1].alive = False
+        supervisor.restart_exited()
+        await supervisor.scale_to(2)
+        return started
+
+    started = asyncio.run(run())
+
+    assert sorted(supervisor._workers) == [0, 1]
+    assert supervisor._workers[0].process is started[0]
+    assert supervisor._workers[1].process is not started[1]
+    assert not started[2].is_alive()
+
+
+def test_report_reads_throughput_and_utilisation_from_worker_counters():
+    supervisor = _supervisor()
+    asyncio.run(supervisor.scale_to(1))
+    stats = WorkerStats()
+    worker = supervisor._workers[0]
+    stats.attach(
+        worker.processed,
+        worker.busy_seconds,
+        worker.in_flight,
+        worker.background_in_flight,
+    )
+
+    with patch("messaging.workerStats.time.monotonic", side_effect=[0.0, 2.0]):
+        with stats.track(messages=10):
+            pass
+    with patch("messaging.supervisor.time.monotonic", return_value=10.0):
+        supervisor._last_report = 0.0
+        throughput = supervisor.report()
+
+    # Ten messages in ten seconds, with one of four loops busy for two of them.
+    assert throughput == 1.0
+    gauge = MagicMock()
+    with patch("messaging.supervisor.WORKER_PROCESS_UTILISATION", gauge):
+        worker.busy_seconds.value += 20.0
+        with patch("messaging.supervisor.time.monotonic", return_value=20.0):
+            supervisor.report()
+    gauge.labels.return_value.set.assert_called_once_with(0.5)
+
+
+def test_running_sweeps_keep_their_processes_and_count_as_backlog():
+    supervisor = _supervisor()
+    asyncio.run(supervisor.scale_to(3))
+    stats = WorkerStats()
+    worker = supervisor._workers[2]
+    stats.attach(
+        worker.processed,
+        worker.busy_seconds,
+        worker.in_flight,
+        worker.background_in_flight,
+    )
+    # Picked up sweeps are unacked, so the queue reports no background depth.
+    depths = SimpleNamespace(queue_depth=lambda queue_name: 0)
+
+    with (
+        patch(
+            "messaging.supervisor.upstream_is_healthy", new=AsyncMock(return_value=True)
+        ),
+        patch("messaging.supervisor.WORKER_BACKLOG_PER_PROCESS", 200),
+    ):
+        with stats.track(background=True):
+            asyncio.run(supervisor.tick(depths))
+            # The sweep is counted, so the pool shrinks only to 2, and by
+            # retiring slot 1: slot 2 is the one running it.
+            assert sorted(supervisor._workers) == [0, 2]
+            asyncio.run(supervisor.scale_to(1))
+            assert sorted(supervisor._workers) == [2]
+            asyncio.run(supervisor.scale_to(0))
+
+    assert supervisor.size == 0
@@ -1,14 +1,293 @@
+"""Two-tier caching for read-mostly payloads.
+
+L1 is a size-bounded LRU with a short TTL in each process. L2 is Redis, which
+stores the payloads shared by every process as JSON encoded once with orjson.
+`get_cached` checks L1 first, then falls back to Redis and fills L1 on a hit.
+`set_cached` writes both tiers. Both hold decoded payloads in L1.
+
+Endpoints that only send a cached payload back use `get_cached_bytes` /
+`set_cached_bytes` instead, which keep the encoded bytes in both tiers. A
+hit is then returned as `json_response(body)` with no decode and no
+re-encode by FastAPI. A key is read through one of the two pairs, never both.
+Those bytes are gzip-compressed once they reach `CACHE_COMPRESSION_MIN_BYTES`
+and sent that way (see `utils.compression`).
+
+`invalidate_all_cache` deletes a student's views from Redis and publishes the
+keys on `CACHE_INVALIDATION_CHANNEL`. Every API process runs
+`listen_for_cache_invalidations`, which evicts those keys from its L1, so a
+worker's scrape is visible everywhere without waiting out the L1 TTL. Values
+returned from L1 are shared between requests and must not be mutated.
+
+Stale-while-revalidate entries (`get_cached_swr` / `set_cached_swr`) wrap the
+encoded payload as `{"softExpiresAt", "value"}` and live in Redis until a hard
+TTL. The payload is cut out of the envelope without decoding it. Past the soft
+expiry the payload is still served, and `refresh_in_background` starts at
+most one refresh per key per window across every process.
+"""
+
+import asyncio
+import json
+import time
+from collections import OrderedDict
+
+import orjson
+from fastapi.responses import Response
+from prometheus_client import Counter
+
 from config.redisConnection import redisConnection
+from config.settings import (
+    CACHE_INVALIDATION_CHANNEL,
+    L1_CACHE_MAX_ENTRIES,
+    L1_CACHE_TTL_SECONDS,
+)
+from utils.compression import compress, is_compressed
+from utils.logger import logger, redis_logger
+
+L1_CACHE_REQUESTS = Counter(
+    "l1_cache_requests_total",
+    "In-process cache lookups, by result.",
+    ["result"],
+)
+L1_CACHE_EVICTIONS = Counter(
+    "l1_cache_evictions_total",
+    "Entries dropped from the in-process cache, by reason.",
+    ["reason"],
+)
+
+
+class LocalCache:
+    """Size-bounded LRU cache whose entries also expire after a TTL."""
+
+    def __init__(
+        self,
+        max_entries: int = L1_CACHE_MAX_ENTRIES,
+        ttl_seconds: float = L1_CACHE_TTL_SECONDS,
+        clock=time.monotonic,
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.clock = clock
+        self._entries: OrderedDict[str, tuple[float, object]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str):
+        entry = self._entries.get(key)
+        if entry is None:
+            L1_CACHE_REQUESTS.labels("miss").inc()
+            return None
+
+        expires_at, value = entry
+        if expires_at <= self.clock():
+            del self._entries[key]
+            L1_CACHE_EVICTIONS.labels("expired").inc()
+            L1_CACHE_REQUESTS.labels("miss").inc()
+            return None
+
+        self._entries.move_to_end(key)
+        L1_CACHE_REQUESTS.labels("hit").inc()
+        return value
+
+    def set(self, key: str, value, ttl_seconds: float | None = None) -> None:
+        if self.max_entries <= 0:
+            return
+        ttl = self.ttl_seconds if ttl_seconds is None else min(ttl_seconds, self.ttl_seconds)
+        self._entries[key] = (self.clock() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            L1_CACHE_EVICTIONS.labels("capacity").inc()
+
+    def evict(self, *keys: str) -> None:
+        for key in keys:
+            if self._entries.pop(key, None) is not None:
+                L1_CACHE_EVICTIONS.labels("invalidated").inc()
+
+    def clear(self) -> None:
+        if self._entries:
+            L1_CACHE_EVICTIONS.labels("invalidated").inc(len(self._entries))
+        self._entries.clear()
+
+
+localCache = LocalCache()
+
+
+def encode(value) -> bytes:
+    """JSON-encode a payload once, for Redis and for the response body."""
+    return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS)
+
+
+def json_response(body: bytes, status_code: int = 200) -> Response:
+    """Send an already encoded JSON payload as is, gzip-compressed or not."""
+    headers = None
+    if is_compressed(body):
+        headers = {"Content-Encoding": "gzip", "Vary": "Accept-Encoding"}
+    return Response(
+        content=body,
+        status_code=status_code,
+        headers=headers,
+        media_type="application/json",
+    )
+
+
+async def get_cached(key: str):
+    """Return a decoded payload from L1, else from Redis, or None on a miss."""
+    value = localCache.get(key)
+    if value is not None:
+        return value
+
+    if redisConnection.aio:
+        cached_data = await redisConnection.aio.get(key)
+        if cached_data:
+            value = orjson.loads(cached_data)
+            localCache.set(key, value)
+            return value
+    return None
+
+
+async def set_cached(key: str, value, ex: int) -> None:
+    """Store a payload in L1 and, JSON-encoded, in Redis for `ex` seconds."""
+    localCache.set(key, value, ex)
+    if redisConnection.aio:
+        await redisConnection.aio.set(key, encode(value), ex=ex)
+
+
+async def get_cached_bytes(key: str) -> bytes | None:
+    """Return an encoded payload from L1, else from Redis, without decoding it."""
+    body = localCache.get(key)
+    if body is not None:
+        return body
+
+    if redisConnection.aio:
+        cached_data = await redisConnection.aio.get(key)
+        if cached_data:
+            if isinstance(cached_data, str):
+                cached_data = cached_data.encode()
+            localCache.set(key, cached_data)
+            return cached_data
+    return None
+
+
+async def set_cached_bytes(key: str, value, ex: int) -> bytes:
+    """Encode a payload once, store it in L1 and Redis for `ex` seconds, return it.
+
+    Large payloads are stored, and returned, gzip-compressed (`utils.compression`).
+    """
+    body = compress(encode(value))
+    await _set_encoded(key, body, ex)
+    return body
+
+
+async def _set_encoded(key: str, body: bytes, ex: int) -> None:
+    localCache.set(key, body, ex)
+    if redisConnection.aio:
+        await redisConnection.aio.set(key, body, ex=ex)
+
+
+_SWR_HEAD = b'{"softExpiresAt":'
+_SWR_VALUE = b',"value":'
+
+
+def _split_swr_envelope(envelope: bytes) -> tuple[bytes, float]:
+    """Return `(encoded payload, soft expiry)` of a stale-while-revalidate entry."""
+    if envelope.startswith(_SWR_HEAD):
+        head, found, body = envelope.partition(_SWR_VALUE)
+        if found:
+            return body[:-1], float(head[len(_SWR_HEAD) :])
+
+    # Envelopes in the older key order, and entries from before envelopes.
+    decoded = orjson.loads(envelope)
+    if isinstance(decoded, dict) and "softExpiresAt" in decoded:
+        return encode(decoded["value"]), decoded["softExpiresAt"]
+    return envelope, 0.0
+
+
+async def get_cached_swr(key: str) -> tuple[bytes, bool] | None:
+    """Return `(encoded payload, is_stale)` for a stale-while-revalidate entry."""
+    envelope = await get_cached_bytes(key)
+    if envelope is None:
+        return None
+    body, soft_expires_at = _split_swr_envelope(envelope)
+    return body, soft_expires_at <= time.time()
+
+
+async def set_cached_swr(key: str, value, soft_ttl: int, hard_ttl: int) -> bytes:
+    """Store a payload that turns stale after `soft_ttl` and expires after `hard_ttl`.
+
+    Returns the encoded payload, ready to send.
+    """
+    body = encode(value)
+    soft_expires_at = encode(time.time() + soft_ttl)
+    await _set_encoded(
+        key, _SWR_HEAD + soft_expires_at + _SWR_VALUE + body + b"}", hard_ttl
+    )
+    return body
+
+
+_background_refreshes: dict[str, asyncio.Task] = {}
+
+
+def _log_refresh_failure(task: asyncio.Task) -> None:
+    if not task.cancelled() and task.exception() is not None:
+        logger.error(f"Background cache refresh failed: {task.exception()}")
+
+
+async def refresh_in_background(key: str, refresh, window_seconds: int) -> bool:
+    """Start `refresh()` unless any process already started one for `key` in the window."""
+    if key in _background_refreshes:
+        return False
+    if redisConnection.aio:
+        try:
+            claimed = await redisConnection.aio.set(
+                f"swr:refresh:{key}", "1", ex=window_seconds, nx=True
+            )
+        except Exception as error:
+            redis_logger.warning(f"Unable to claim refresh of {key}: {error}")
+            claimed = False
+        if not claimed:
+            return False
+
+    task = asyncio.ensure_future(refresh())
+    _background_refreshes[key] = task
+    task.add_done_callback(lambda _: _background_refreshes.pop(key, None))
+    task.add_done_callback(_log_refresh_failure)
+    return True
+
+
+def student_cache_keys(roll_number: str) -> tuple[str, ...]:
+    return (
+        f"{roll_number}RequiredCredits",
+        f"{roll_number}Backlogs",
+        f"{roll_number}ALL",
+        f"{roll_number}Results",
+    )
+
 
+async def invalidate_all_cache(roll_number: str):
+    """Drop every cached view of a student in a single UNLINK, in every process."""
+    keys = student_cache_keys(roll_number)
+    localCache.evict(*keys)
+    if redisConnection.aio:
+        await redisConnection.aio.unlink(*keys)
+        await redisConnection.aio.publish(CACHE_INVALIDATION_CHANNEL, json.dumps(keys))
 
-def invalidate_all_cache(roll_number: str):
-    roll_credits_checker_key = f"{roll_number}RequiredCredits"
-    roll_backlogs_key = f"{roll_number}Backlogs"
-    roll_all_key = f"{roll_number}ALL"
-    roll_results_key = f"{roll_number}Results"
 
-    if redisConnection.client:
-        redisConnection.client.delete(roll_credits_checker_key)
-        redisConnection.client.delete(roll_backlogs_key)
-        redisConnection.client.delete(roll_all_key)
-        redisConnection.client.delete(roll_results_key)
+async def listen_for_cache_invalidations(retry_seconds: float = 1.0):
+    """Evict keys published by other processes from this process's L1."""
+    while True:
+        if redisConnection.async_client is None:
+            return
+        try:
+            async with redisConnection.async_client.pubsub() as pubsub:
+                await pubsub.subscribe(CACHE_INVALIDATION_CHANNEL)
+                async for message in pubsub.listen():
+                    if message["type"] == "message":
+                        localCache.evict(*json.loads(message["data"]))
+        except asyncio.CancelledError:
+            raise
+        except Exception as error:
+            redis_logger.error(f"Cache invalidation listener failed: {error}")
+        # Invalidations sent while unsubscribed are lost, so start from empty.
+        localCache.clear()
+        await asyncio.sleep(retry_seconds)
@@ -0,0 +1,103 @@
+"""gzip for large cached responses, compressed once and sent as stored.
+
+Payloads of at least `CACHE_COMPRESSION_MIN_BYTES` are gzip-compressed when
+they are written to the cache (`utils.caching.set_cached_bytes` and the class
+results). The same bytes are the HTTP body: `json_response` labels them
+`Content-Encoding: gzip`, so a hit costs no compression and Redis, L1 and the
+network all carry the smaller copy. Readers tell the two forms apart by the
+gzip magic number, since encoded JSON never starts with it.
+
+Clients that do not accept gzip get the body decompressed on the way out by
+`PrecompressedResponseMiddleware`.
+"""
+
+import gzip
+import zlib
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from config.settings import CACHE_COMPRESSION_LEVEL, CACHE_COMPRESSION_MIN_BYTES
+
+GZIP_MAGIC = b"\x1f\x8b"
+
+
+def compress(body: bytes) -> bytes:
+    """gzip `body` if it is at least `CACHE_COMPRESSION_MIN_BYTES` long."""
+    if len(body) < CACHE_COMPRESSION_MIN_BYTES:
+        return body
+    return gzip.compress(body, compresslevel=CACHE_COMPRESSION_LEVEL, mtime=0)
+
+
+def stream_compressor():
+    """A zlib compressor writing one gzip stream, for payloads built in chunks."""
+    return zlib.compressobj(CACHE_COMPRESSION_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+
+def is_compressed(body: bytes) -> bool:
+    return body[:2] == GZIP_MAGIC
+
+
+def decompress(body: bytes) -> bytes:
+    """Return `body` as plain bytes, whether or not it was stored compressed."""
+    return gzip.decompress(body) if is_compressed(body) else body
+
+
+def accepts_gzip(accept_encoding: str | None) -> bool:
+    """Whether an `Accept-Encoding` header allows a gzip response."""
+    wildcard = False
+    for coding in (accept_encoding or "").lower().split(","):
+        name, _, params = coding.partition(";")
+        name = name.strip()
+        if name not in ("gzip", "*"):
+            continue
+        quality = params.strip()
+        accepted = not quality.startswith("q=") or _quality(quality[2:]) > 0
+        if name == "gzip":
+            return accepted
+        wildcard = accepted
+    return wildcard
+
+
+def _quality(value: str) -> float:
+    try:
+        return float(value)
+    except ValueError:
+        return 0.0
+
+
+class PrecompressedResponseMiddleware:
+    """Decompress gzip response bodies for clients that do not accept gzip."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or accepts_gzip(
+            Headers(scope=scope).get("accept-encoding")
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        start: Message | None = None
+        parts: list[bytes] = []
+
+        async def send_decompressed(message: Message) -> None:
+            nonlocal start
+            if message["type"] == "http.response.start":
+                if Headers(raw=message["headers"]).get("content-encoding") == "gzip":
+                    start = message
+                    return
+            elif message["type"] == "http.response.body" and start is not None:
+                parts.append(message.get("body", b""))
+                if message.get("more_body", False):
+                    return
+                body = gzip.decompress(b"".join(parts))
+                headers = MutableHeaders(raw=start["headers"])
+                del headers["content-encoding"]
+                headers["content-length"] = str(len(body))
+                await send(start)
+                message = {"type": "http.response.body", "body": body}
+            await send(message)
+
+        await self.app(scope, receive, send_decompressed)
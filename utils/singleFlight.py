@@ -0,0 +1,168 @@
+"""Coalesce concurrent rebuilds of the same cache key into one.
+
+When a popular key misses, every request would otherwise load the student
+from PostgreSQL, build the view and queue a scrape. `single_flight` lets one
+caller (the leader) do that work while the others wait for its result:
+
+- within a process, callers for the same key await one shared task;
+- across processes, the leader holds `singleflight:lock:<key>` (SET NX with a
+  short TTL) and writes its result to `singleflight:result:<key>`, which the
+  other processes poll.
+
+Results are shared as a JSON envelope, and each caller decodes its own copy.
+A follower that has not seen a result after `SINGLE_FLIGHT_WAIT_SECONDS` does
+the rebuild itself, so a stuck or crashed leader only costs latency. Without
+Redis, coalescing is per process.
+"""
+
+import asyncio
+import json
+import time
+import uuid
+from collections.abc import Awaitable, Callable
+
+from fastapi.responses import JSONResponse, Response
+from prometheus_client import Counter
+
+from config.redisConnection import redisConnection
+from config.settings import (
+    SINGLE_FLIGHT_LOCK_SECONDS,
+    SINGLE_FLIGHT_POLL_SECONDS,
+    SINGLE_FLIGHT_RESULT_SECONDS,
+    SINGLE_FLIGHT_WAIT_SECONDS,
+)
+from utils.compression import decompress
+from utils.logger import redis_logger
+
+SINGLE_FLIGHT_CALLS = Counter(
+    "single_flight_calls_total",
+    "Cache rebuild requests, by how they were served.",
+    ["role"],
+)
+
+RELEASE_LOCK_SCRIPT = """
+if redis.call("GET", KEYS[1]) == ARGV[1] then
+  return redis.call("DEL", KEYS[1])
+end
+return 0
+"""
+
+_in_flight: dict[str, asyncio.Task] = {}
+
+
+def _lock_key(key: str) -> str:
+    return f"singleflight:lock:{key}"
+
+
+def _result_key(key: str) -> str:
+    return f"singleflight:result:{key}"
+
+
+def _encode(value) -> str:
+    if isinstance(value, Response):
+        return json.dumps(
+            {
+                "statusCode": value.status_code,
+                "content": json.loads(decompress(value.body)),
+            }
+        )
+    return json.dumps({"content": value})
+
+
+def _decode(envelope: str | bytes):
+    decoded = json.loads(envelope)
+    if "statusCode" in decoded:
+        return JSONResponse(
+            status_code=decoded["statusCode"], content=decoded["content"]
+        )
+    return decoded["content"]
+
+
+async def _try_lock(key: str, token: str) -> bool | None:
+    """Return whether this process leads the rebuild, or None without Redis."""
+    if not redisConnection.aio:
+        return None
+    try:
+        acquired = await redisConnection.aio.set(
+            _lock_key(key), token, ex=SINGLE_FLIGHT_LOCK_SECONDS, nx=True
+        )
+        if acquired:
+            # A result left by an earlier burst must not satisfy this one.
+            await redisConnection.aio.delete(_result_key(key))
+        return bool(acquired)
+    except Exception as error:
+        redis_logger.warning(f"Single-flight lock failed for {key}: {error}")
+        return None
+
+
+async def _release(key: str, token: str, envelope: str | None) -> None:
+    try:
+        if envelope is not None:
+            await redisConnection.aio.set(
+                _result_key(key), envelope, ex=SINGLE_FLIGHT_RESULT_SECONDS
+            )
+        await redisConnection.aio.eval(RELEASE_LOCK_SCRIPT, 1, _lock_key(key), token)
+    except Exception as error:
+        redis_logger.warning(f"Single-flight release failed for {key}: {error}")
+
+
+async def _wait_for_remote_result(key: str) -> str | bytes | None:
+    """Poll for another process's result until it lands, the lock goes, or time runs out."""
+    deadline = time.monotonic() + SINGLE_FLIGHT_WAIT_SECONDS
+    while time.monotonic() < deadline:
+        await asyncio.sleep(SINGLE_FLIGHT_POLL_SECONDS)
+        try:
+            envelope = await redisConnection.aio.get(_result_key(key))
+            if envelope:
+                return envelope
+            if not await redisConnection.aio.exists(_lock_key(key)):
+                return None
+        except Exception as error:
+            redis_logger.warning(f"Single-flight wait failed for {key}: {error}")
+            return None
+    return None
+
+
+async def _lead(key: str, rebuild: Callable[[], Awaitable]) -> str:
+    token = uuid.uuid4().hex
+    for _ in range(2):
+        locked = await _try_lock(key, token)
+        if locked is False:
+            envelope = await _wait_for_remote_result(key)
+            if envelope is not None:
+                SINGLE_FLIGHT_CALLS.labels("remote").inc()
+                return envelope
+            # The other leader finished without a result or is too slow; try
+            # once more to lead, then rebuild regardless.
+            continue
+
+        SINGLE_FLIGHT_CALLS.labels("leader").inc()
+        try:
+            envelope = _encode(await rebuild())
+        except BaseException:
+            if locked:
+                await _release(key, token, None)
+            raise
+        if locked:
+            await _release(key, token, envelope)
+        return envelope
+
+    SINGLE_FLIGHT_CALLS.labels("fallback").inc()
+    return _encode(await rebuild())
+
+
+async def single_flight(key: str, rebuild: Callable[[], Awaitable]):
+    """Run `rebuild` once per key per burst and give every caller its result.
+
+    `rebuild` must return a JSON-serializable value or a `JSONResponse`.
+    """
+    task = _in_flight.get(key)
+    if task is None:
+        task = asyncio.ensure_future(_lead(key, rebuild))
+        _in_flight[key] = task
+        task.add_done_callback(
+            lambda done: _in_flight.pop(key) if _in_flight.get(key) is done else None
+        )
+    else:
+        SINGLE_FLIGHT_CALLS.labels("follower").inc()
+    return _decode(await asyncio.shield(task))